@@ -1,15 +1,61 @@
 import asyncio
 from dotenv import load_dotenv
 import os
+from typing import Any, Dict, List
 from google.adk.agents import LlmAgent
-from google.adk.tools.mcp_tool.mcp_toolset import (
-    MCPToolset, 
-    StreamableHTTPConnectionParams
-)
+from google.adk.tools.mcp_tool.mcp_toolset import StreamableHTTPConnectionParams
+
+from news_tools.dispatch import default_ledger, dispatch
+from news_tools.mcp_pool import PooledMCPToolset, get_pooled_session
 
 # Load environment variables
 load_dotenv()
 
+WHATSAPP_TOOL = "whatsapp_notifications_send_message"
+REPLY_LINK = "https://tusitio.com/responder"
+ZAPIER_MCP = StreamableHTTPConnectionParams(
+    url="https://mcp.zapier.com/api/mcp/s/OGQyNjAxNTYtYmY5My00OTg2LWEwY2UtZjA4OTU3ZGI3ZDIxOjE5ZTNmMjU5LWQ1YTctNDMzNy04NjAwLTc1NWU0MGEwNDhjMg==/mcp",
+)
+
+
+def whatsapp_arguments(to: str, message: str) -> Dict[str, str]:
+    """Arguments for the Zapier WhatsApp action; Zapier maps the instructions onto the template fields."""
+    return {
+        "instructions": (
+            f"Envía el template 'New Message' (message_reminder) al número {to}. "
+            f"Cuerpo del mensaje: {message} "
+            f"Establece el campo 'Link to reply' a '{REPLY_LINK}'."
+        ),
+    }
+
+
+async def _send_whatsapp(to: str, message: str, idempotency_key: str):
+    # Direct MCP call over the shared session: no LLM turn per message.
+    # The Zapier action has no idempotency field, so the key cannot be passed on:
+    # a retry after an ambiguous timeout may deliver the message twice.
+    session = await get_pooled_session(ZAPIER_MCP).create_session()
+    return await session.call_tool(WHATSAPP_TOOL, arguments=whatsapp_arguments(to, message))
+
+
+async def send_bulk_whatsapp(recipients: List[str], message: str, campaign: str) -> Dict[str, Any]:
+    """
+    Sends the same WhatsApp message to many recipients at a controlled rate.
+
+    Args:
+        recipients: Phone numbers to notify.
+        message: Message body. `{to}` is replaced with each recipient's number; any other text is sent as is.
+        campaign: Unique ID for this send, e.g. 'reporte-2026-10-18'. Use a new ID for every new send; reuse
+            one only to resume an interrupted send, which then skips recipients that already got the message.
+
+    Returns:
+        A delivery report with sent, duplicate and failed counts, throughput and latency.
+    """
+    try:
+        return await dispatch(recipients, message, _send_whatsapp, campaign=campaign, ledger=default_ledger())
+    except Exception as e:
+        return {"status": "error", "message": f"Bulk send failed: {str(e)[:200]}"}
+
+
 root_agent = LlmAgent(
     model="gemini-2.0-flash",
     name="zapier_agent",
@@ -21,15 +67,19 @@ root_agent = LlmAgent(
         "Siempre que el usuario te pida enviar un mensaje, DEBES llamar a esa herramienta "
         "con el template 'New Message' (message_reminder) y establecer el campo "
         "'Link to reply' a 'https://tusitio.com/responder'. "
-        "Usa exactamente el texto que el usuario te pida como cuerpo principal del mensaje."
+        "Usa exactamente el texto que el usuario te pida como cuerpo principal del mensaje. "
+        "Si el usuario te pide enviar el mismo mensaje a varios números, llama una sola vez a "
+        "'send_bulk_whatsapp' con la lista completa de números en lugar de enviarlos uno por uno, "
+        "y un `campaign` nuevo que incluya la fecha y el tema (por ejemplo 'reporte-2026-10-18'). "
+        "Reutiliza un `campaign` solo si el usuario pide reanudar un envío interrumpido."
     ),
     tools=[
-        MCPToolset(
-            connection_params=StreamableHTTPConnectionParams(
-                url="https://mcp.zapier.com/api/mcp/s/OGQyNjAxNTYtYmY5My00OTg2LWEwY2UtZjA4OTU3ZGI3ZDIxOjE5ZTNmMjU5LWQ1YTctNDMzNy04NjAwLTc1NWU0MGEwNDhjMg==/mcp",
-            ),
+        # Comparte una sola sesión MCP y el manifiesto de tools entre todas las instancias del agente
+        PooledMCPToolset(
+            connection_params=ZAPIER_MCP,
             # Deja solo la tool de WhatsApp de Zapier disponible para este agente
-            tool_filter=["whatsapp_notifications_send_message"],
-        )
+            tool_filter=[WHATSAPP_TOOL],
+        ),
+        send_bulk_whatsapp,
     ],
 )
\ No newline at end of file
@@ -0,0 +1 @@
+"""Reproducible benchmarks for the performance work in `news_tools`. Run each with `python -m benchmarks.<name>`."""
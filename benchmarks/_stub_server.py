@@ -0,0 +1,92 @@
+"""
+A local HTTP server standing in for a remote API.
+
+Every request sleeps for a fixed delay, standing in for the network round
+trip, and then answers with whatever the handler function returns. The
+server runs on a daemon thread and serves requests concurrently, like the
+real services do.
+"""
+import contextlib
+import json
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Any, Callable, Dict, Iterator
+
+# (method, path, request body) -> JSON-serialisable response
+Handler = Callable[[str, str, bytes], Dict[str, Any]]
+
+
+class _StubServer(ThreadingHTTPServer):
+    daemon_threads = True
+    # A burst of connections must not overflow the listen queue
+    request_queue_size = 256
+
+    def __init__(self, handler: Handler, delay: float):
+        super().__init__(("127.0.0.1", 0), _RequestHandler)
+        self.handler = handler
+        self.delay = delay
+        self.requests = 0
+        self.connections = 0
+        self.in_flight = 0
+        self.peak_in_flight = 0
+        self._count_lock = threading.Lock()
+
+    def connected(self) -> None:
+        with self._count_lock:
+            self.connections += 1
+
+    @contextlib.contextmanager
+    def track(self) -> Iterator[None]:
+        """Counts a request, and how many are being answered at once."""
+        with self._count_lock:
+            self.requests += 1
+            self.in_flight += 1
+            self.peak_in_flight = max(self.peak_in_flight, self.in_flight)
+        try:
+            yield
+        finally:
+            with self._count_lock:
+                self.in_flight -= 1
+
+
+class _RequestHandler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"  # Keep-alive, as clients with a connection pool expect
+    # Headers and body go out in separate writes; Nagle would hold the body back for an ACK
+    disable_nagle_algorithm = True
+
+    def setup(self) -> None:
+        super().setup()
+        self.server.connected()
+
+    def _respond(self) -> None:
+        server = self.server
+        body = self.rfile.read(int(self.headers.get("Content-Length") or 0))
+        with server.track():
+            time.sleep(server.delay)
+            payload = json.dumps(server.handler(self.command, self.path, body)).encode("utf-8")
+        self.send_response(200)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(payload)))
+        self.end_headers()
+        self.wfile.write(payload)
+
+    do_GET = _respond
+    do_POST = _respond
+
+    def log_message(self, format, *args):  # noqa: A002 - the base class signature
+        pass
+
+
+@contextlib.contextmanager
+def stub_server(handler: Handler, delay: float = 0.0) -> Iterator[_StubServer]:
+    """Runs a stub server for the duration of the block. Its URL is `server.url`."""
+    server = _StubServer(handler, delay)
+    server.url = f"http://127.0.0.1:{server.server_address[1]}"
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    try:
+        yield server
+    finally:
+        server.shutdown()
+        server.server_close()
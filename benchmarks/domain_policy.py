@@ -0,0 +1,145 @@
+"""
+Compiled domain lists versus the per-call loops they replaced (request user-017).
+
+For lists of 10, 1k and 10k generated domains the benchmark measures the
+time per query of:
+
+*   `mention`: finding a blocked domain or its bare name in a query.
+    `DomainPolicy.find_mention` against the loop the block callback used to
+    run over every domain.
+*   `site`: spotting `site:` whitelist operators and building the whitelist
+    filter. `site_domains` plus `DomainPolicy.covers` and the precomputed
+    `site_filter` against the per-call `any(...)` scan and `" OR ".join`.
+*   `covers`: checking a host and its parent domains against a naive scan
+    with `endswith`.
+
+Half of the queries and hosts match a listed domain. The other half match
+none, which is the worst case for the loops. The time to compile each
+policy is reported as well.
+
+    python -m benchmarks.domain_policy [--sizes 10 1000 10000] [--queries 2000]
+"""
+import argparse
+import random
+import string
+import time
+from typing import Callable, Iterable, List, Sequence
+
+from news_tools.domain_policy import DomainPolicy, normalize_domain, site_domains
+
+LIST_SIZES = (10, 1000, 10000)
+_TLDS = ("com", "org", "net", "io", "news", "co.uk")
+_TOPICS = ("AI chips", "model launch", "earnings", "data centers", "regulation", "robotics", "cloud growth")
+
+
+def make_domains(count: int, rng: random.Random) -> List[str]:
+    """Returns `count` distinct random domains."""
+    domains = set()
+    while len(domains) < count:
+        name = "".join(rng.choice(string.ascii_lowercase) for _ in range(rng.randint(5, 12)))
+        domains.add(f"{name}.{rng.choice(_TLDS)}")
+    return sorted(domains)
+
+
+def make_queries(domains: Sequence[str], count: int, rng: random.Random, operator: str) -> List[str]:
+    """Returns lower-case queries; every other one names a listed domain."""
+    queries = []
+    for index in range(count):
+        query = f"latest {rng.choice(_TOPICS)} news {rng.randint(2020, 2026)}"
+        if index % 2:
+            query += f" {operator}{rng.choice(domains)}"
+        queries.append(query)
+    return queries
+
+
+def make_hosts(domains: Sequence[str], count: int, rng: random.Random) -> List[str]:
+    """Returns hosts; every other one is a subdomain of a listed domain."""
+    return [
+        f"www.{rng.choice(domains)}" if index % 2 else f"news.unlisted{index}.com"
+        for index in range(count)
+    ]
+
+
+def naive_mention(domains: Sequence[str], query: str) -> str:
+    """The block callback's loop before `DomainPolicy`."""
+    for domain in domains:
+        if f"site:{domain}" in query or domain.replace(".org", "").replace(".com", "") in query:
+            return domain
+    return ""
+
+
+def naive_site(domains: Sequence[str], query: str) -> str:
+    """The whitelist callback's scan and filter before `DomainPolicy`."""
+    if any(f"site:{domain}" in query for domain in domains):
+        return query
+    return f"{query} {' OR '.join([f'site:{domain}' for domain in domains])}"
+
+
+def compiled_site(policy: DomainPolicy, query: str) -> str:
+    if any(policy.covers(host) for host in site_domains(query)):
+        return query
+    return f"{query} {policy.site_filter}"
+
+
+def naive_covers(domains: Sequence[str], host: str) -> bool:
+    host = normalize_domain(host)
+    return any(host == domain or host.endswith("." + domain) for domain in domains)
+
+
+def _per_item(function: Callable[[str], object], items: Iterable[str], budget: float) -> float:
+    """Returns the mean seconds per item, cycling through the items for at least `budget` seconds."""
+    items = list(items)
+    calls = 0
+    started = time.perf_counter()
+    while True:
+        for item in items:
+            function(item)
+        calls += len(items)
+        elapsed = time.perf_counter() - started
+        if elapsed >= budget:
+            return elapsed / calls
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("--sizes", type=int, nargs="+", default=list(LIST_SIZES))
+    parser.add_argument("--queries", type=int, default=2000, help="Distinct queries and hosts per list size.")
+    parser.add_argument("--budget", type=float, default=0.5, help="Minimum seconds per measurement.")
+    args = parser.parse_args()
+
+    print(f"{'domains':>7}  {'compile':>9}  {'check':>7}  {'naive':>11}  {'compiled':>11}  {'speed-up':>8}")
+    for size in args.sizes:
+        rng = random.Random(size)
+        domains = make_domains(size, rng)
+        started = time.perf_counter()
+        blocked = DomainPolicy(domains, match_bare_names=True)
+        whitelist = DomainPolicy(domains)
+        compile_seconds = time.perf_counter() - started
+
+        mention_queries = make_queries(domains, args.queries, rng, "")
+        site_queries = make_queries(domains, args.queries, rng, "site:")
+        hosts = make_hosts(domains, args.queries, rng)
+        # (name, items, naive, compiled, what both must agree on)
+        checks = (
+            ("mention", mention_queries,
+             lambda query: naive_mention(domains, query), blocked.find_mention, bool),
+            ("site", site_queries,
+             lambda query: naive_site(domains, query), lambda query: compiled_site(whitelist, query), str),
+            ("covers", hosts,
+             lambda host: naive_covers(domains, host), whitelist.covers, bool),
+        )
+        for index, (name, items, naive, compiled, agree_on) in enumerate(checks):
+            sample = items[:200]
+            assert [agree_on(naive(item)) for item in sample] == [agree_on(compiled(item)) for item in sample], name
+            naive_seconds = _per_item(naive, items, args.budget)
+            compiled_seconds = _per_item(compiled, items, args.budget)
+            compile_cell = f"{compile_seconds * 1000:>7.1f}ms" if index == 0 else ""
+            print(
+                f"{size if index == 0 else '':>7}  {compile_cell:>9}  {name:>7}"
+                f"  {naive_seconds * 1e6:>9.2f}µs  {compiled_seconds * 1e6:>9.2f}µs"
+                f"  {naive_seconds / compiled_seconds:>7.1f}x"
+            )
+
+
+if __name__ == "__main__":
+    main()
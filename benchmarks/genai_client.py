@@ -0,0 +1,100 @@
+"""
+A new Gemini client per call versus the shared client (request user-010).
+
+`generate_content` calls go to a local HTTP server standing in for the
+Gemini API (`genai.Client(http_options={"base_url": ...})`), which answers
+after a fixed delay. The benchmark compares:
+
+*   `per-call`: a new `genai.Client` for every request, as podcast synthesis
+    used to do.
+*   `shared`: one client wrapped in `SharedGenaiClient`, as
+    `get_genai_client` returns it.
+
+It reports the mean latency and how many TCP connections the stub
+accepted for the sequential calls, then fires a burst of concurrent calls
+through the shared client and reports the peak number of requests the stub
+saw in flight, which `MAX_CONCURRENT_GENAI_REQUESTS` caps.
+
+The stand-in speaks plain HTTP, so the per-call numbers leave out the TLS
+handshake a real client pays on every new connection; against the real
+API the gap is larger.
+
+    python -m benchmarks.genai_client [--calls 50] [--delay 0.02] [--burst 32]
+
+Needs google-genai (`pip install google-genai`).
+"""
+import argparse
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Callable, Dict
+
+from benchmarks._stub_server import stub_server
+from news_tools.genai_client import MAX_CONCURRENT_GENAI_REQUESTS, SharedGenaiClient
+
+MODEL = "gemini-2.5-flash"
+
+
+def _generate_content(method: str, path: str, body: bytes) -> Dict[str, Any]:
+    return {
+        "candidates": [{"content": {"role": "model", "parts": [{"text": "ok"}]}, "finishReason": "STOP"}],
+        "usageMetadata": {"promptTokenCount": 4, "candidatesTokenCount": 1, "totalTokenCount": 5},
+    }
+
+
+def _new_client(url: str) -> Any:
+    from google import genai
+
+    return genai.Client(api_key="benchmark", http_options={"base_url": url})
+
+
+def _call(client: Any) -> str:
+    return client.models.generate_content(model=MODEL, contents="Say ok.").text
+
+
+def _sequential(server: Any, calls: int, get_client: Callable[[], Any]) -> Dict[str, float]:
+    connections = server.connections
+    started = time.perf_counter()
+    for _ in range(calls):
+        assert _call(get_client()) == "ok"
+    elapsed = time.perf_counter() - started
+    return {"latency": elapsed / calls, "connections": server.connections - connections}
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("--calls", type=int, default=50, help="Sequential calls per variant.")
+    parser.add_argument("--delay", type=float, default=0.02, help="Seconds the stub takes per request.")
+    parser.add_argument("--burst", type=int, default=32, help="Concurrent calls through the shared client.")
+    args = parser.parse_args()
+
+    with stub_server(_generate_content, delay=args.delay) as server:
+        _call(_new_client(server.url))  # Imports the SDK outside the timings
+
+        per_call = _sequential(server, args.calls, lambda: _new_client(server.url))
+        shared = SharedGenaiClient(_new_client(server.url), MAX_CONCURRENT_GENAI_REQUESTS)
+        reused = _sequential(server, args.calls, lambda: shared)
+
+        print(f"Stub delay {args.delay * 1000:.0f} ms, {args.calls} sequential calls")
+        print(f"{'client':>9}  {'mean latency':>12}  {'overhead':>9}  {'connections':>11}")
+        for name, result in (("per-call", per_call), ("shared", reused)):
+            overhead = result["latency"] - args.delay
+            print(
+                f"{name:>9}  {result['latency'] * 1000:>10.2f}ms  {overhead * 1000:>7.2f}ms"
+                f"  {result['connections']:>11}"
+            )
+
+        server.peak_in_flight = 0
+        started = time.perf_counter()
+        with ThreadPoolExecutor(max_workers=args.burst) as pool:
+            replies = list(pool.map(lambda _: _call(shared), range(args.burst)))
+        elapsed = time.perf_counter() - started
+        assert replies == ["ok"] * args.burst
+        print(
+            f"Burst of {args.burst} through the shared client: {elapsed * 1000:.0f} ms, "
+            f"peak {server.peak_in_flight} in flight (cap {MAX_CONCURRENT_GENAI_REQUESTS})"
+        )
+        shared.close()
+
+
+if __name__ == "__main__":
+    main()
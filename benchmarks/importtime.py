@@ -0,0 +1,133 @@
+"""
+Import-time profile of the agent packages (request user-023).
+
+Loads each agent package in a fresh interpreter with `-X importtime`, the way
+`adk web` does, and reports the wall time of the import plus the top-level
+distributions that cost the most (summing the self time of every module
+under them). Deferred tool dependencies should not show up here, and
+should appear only after the first tool call.
+
+`--root` profiles another checkout, e.g. a worktree of the commit before
+the imports were deferred, for a before/after comparison. The measured
+report is in `benchmarks/importtime_report.md`.
+
+    python -m benchmarks.importtime                        # every agent package
+    python -m benchmarks.importtime multi-agentet my_agent_voice_yfinance
+    python -m benchmarks.importtime --root ../before --repeat 7 --output before.md
+"""
+import argparse
+import pathlib
+import subprocess
+import sys
+from collections import defaultdict
+from typing import Dict, List, NamedTuple, Optional
+
+REPO_ROOT = pathlib.Path(__file__).resolve().parent.parent
+# Tool dependencies that agent packages are expected to load lazily
+DEFERRED_MODULES = ("yfinance", "vaderSentiment", "pandas", "numpy")
+
+_PROBE = """
+import importlib, sys, time
+started = time.perf_counter()
+importlib.import_module({package!r})
+print(time.perf_counter() - started)
+print(",".join(name for name in {deferred!r} if name in sys.modules))
+"""
+
+
+class ImportProfile(NamedTuple):
+    """Import cost of one agent package."""
+    package: str
+    wall_seconds: float
+    self_us_by_root: Dict[str, int]
+    deferred_loaded: List[str]
+    error: str = ""
+
+
+def agent_packages(root: pathlib.Path = REPO_ROOT) -> List[str]:
+    """Returns the directories that hold an `agent.py`, i.e. what `adk web` would load."""
+    return sorted(path.parent.name for path in root.glob("*/agent.py"))
+
+
+def parse_importtime(stderr: str) -> Dict[str, int]:
+    """Sums `-X importtime` self times (microseconds) by top-level package name."""
+    totals: Dict[str, int] = defaultdict(int)
+    for line in stderr.splitlines():
+        if not line.startswith("import time:") or "self [us]" in line:
+            continue
+        try:
+            self_us, _cumulative, name = line[len("import time:"):].split("|", 2)
+            totals[name.strip().split(".")[0]] += int(self_us)
+        except ValueError:
+            continue
+    return dict(totals)
+
+
+def profile_package(package: str, root: pathlib.Path = REPO_ROOT) -> ImportProfile:
+    """Imports one package in a fresh interpreter and returns its import profile."""
+    probe = _PROBE.format(package=package, deferred=DEFERRED_MODULES)
+    completed = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", probe],
+        cwd=root,
+        capture_output=True,
+        text=True,
+    )
+    totals = parse_importtime(completed.stderr)
+    if completed.returncode != 0:
+        error = completed.stderr.strip().splitlines()[-1] if completed.stderr.strip() else "import failed"
+        return ImportProfile(package, 0.0, totals, [], error)
+    wall, loaded = (completed.stdout.splitlines() + ["", ""])[:2]
+    return ImportProfile(package, float(wall), totals, [name for name in loaded.split(",") if name])
+
+
+def median_profile(package: str, root: pathlib.Path = REPO_ROOT, repeat: int = 1) -> ImportProfile:
+    """Profiles a package `repeat` times and returns the run with the median import time."""
+    profiles = sorted((profile_package(package, root) for _ in range(repeat)), key=lambda profile: profile.wall_seconds)
+    return profiles[len(profiles) // 2]
+
+
+def render(profiles: List[ImportProfile], top: int = 8, repeat: int = 1) -> str:
+    """Renders the profiles as a Markdown report."""
+    runs = f" The median of {repeat} runs is shown." if repeat > 1 else ""
+    lines = [
+        "# Agent package import profile",
+        "",
+        f"Python {sys.version.split()[0]}. Each package is imported in a fresh interpreter.{runs}",
+        "",
+        "| Package | Import (ms) | Deferred deps loaded | Top distributions (self ms) |",
+        "|---|---:|---|---|",
+    ]
+    for profile in profiles:
+        if profile.error:
+            lines.append(f"| {profile.package} | n/a | | {profile.error} |")
+            continue
+        heaviest = sorted(profile.self_us_by_root.items(), key=lambda item: item[1], reverse=True)[:top]
+        lines.append(
+            f"| {profile.package} | {profile.wall_seconds * 1000:.0f} | "
+            f"{', '.join(profile.deferred_loaded) or 'none'} | "
+            f"{', '.join(f'{name} {us / 1000:.0f}' for name, us in heaviest)} |"
+        )
+    return "\n".join(lines) + "\n"
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("packages", nargs="*", help="Agent packages to profile (default: all)")
+    parser.add_argument("--root", type=pathlib.Path, default=REPO_ROOT, help="Checkout to profile")
+    parser.add_argument("--output", help="Write the Markdown report to this file instead of stdout")
+    parser.add_argument("--top", type=int, default=8, help="Distributions listed per package")
+    parser.add_argument("--repeat", type=int, default=1, help="Imports per package; the median run is reported")
+    args = parser.parse_args(argv)
+
+    packages = args.packages or agent_packages(args.root)
+    profiles = [median_profile(package, args.root, args.repeat) for package in packages]
+    report = render(profiles, args.top, args.repeat)
+    if args.output:
+        pathlib.Path(args.output).write_text(report, encoding="utf-8")
+    else:
+        sys.stdout.write(report)
+    return 0 if all(not profile.error for profile in profiles) else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,144 @@
+"""
+A new MCP session per message versus the pooled session (request user-021).
+
+A local MCP server (streamable HTTP) stands in for the Zapier WhatsApp
+server. Every HTTP request it receives waits `--round-trip` seconds,
+standing in for the network, and its send tool takes `--call` seconds.
+The benchmark sends the same number of messages two ways:
+
+*   `cold`: what every `MCPToolset` instance did. It opens a session,
+    requests the tool manifest, calls the tool and closes the session.
+*   `pooled`: `PooledSession`, as `PooledMCPToolset` and `_send_whatsapp`
+    use it. It reuses one session and the cached manifest, after a warm-up
+    message that pays for both.
+
+It reports the mean time per message and the connects and manifest
+requests the pooled session made.
+
+ADK's session manager probes for Google mTLS credentials once per manager,
+which outside Google Cloud can take seconds while `google.auth` looks for
+a metadata server. That cost depends on the host rather than on the
+connection, so the probe is switched off unless `--mtls-probe` is given.
+
+    python -m benchmarks.mcp_pool [--messages 50] [--round-trip 0.03] [--call 0.001]
+
+Needs google-adk with MCP support and uvicorn (`pip install "google-adk[mcp]" uvicorn`).
+"""
+import argparse
+import asyncio
+import logging
+import os
+import socket
+import threading
+import time
+from typing import Any, Awaitable, Callable
+
+TOOL_NAME = "send_whatsapp_message"
+
+
+def _mcp_app(call_seconds: float, round_trip: float) -> Any:
+    """Builds the stand-in server's ASGI app, with the round trip added to every HTTP request."""
+    try:
+        from mcp.server.mcpserver import MCPServer as Server
+    except ImportError:  # mcp < 2
+        from mcp.server.fastmcp import FastMCP as Server
+
+    server = Server("whatsapp-stand-in")
+
+    @server.tool(name=TOOL_NAME)
+    async def send_whatsapp_message(to: str, message: str) -> str:
+        """Pretends to send a WhatsApp message."""
+        await asyncio.sleep(call_seconds)
+        return f"sent to {to}"
+
+    app = server.streamable_http_app()
+
+    async def delayed(scope, receive, send):
+        if scope["type"] == "http":
+            await asyncio.sleep(round_trip)
+        await app(scope, receive, send)
+
+    return delayed
+
+
+def _serve(app: Any) -> str:
+    """Runs the app on a daemon thread and returns its MCP endpoint URL."""
+    import uvicorn
+
+    sock = socket.socket()
+    sock.bind(("127.0.0.1", 0))
+    server = uvicorn.Server(uvicorn.Config(app, log_level="warning", lifespan="on"))
+    threading.Thread(target=server.run, kwargs={"sockets": [sock]}, daemon=True).start()
+    while not server.started:
+        time.sleep(0.01)
+    return f"http://127.0.0.1:{sock.getsockname()[1]}/mcp"
+
+
+async def _cold(connection_params: Any, to: str) -> None:
+    from google.adk.tools.mcp_tool.mcp_session_manager import MCPSessionManager
+
+    manager = MCPSessionManager(connection_params=connection_params)
+    try:
+        session = await manager.create_session()
+        await session.list_tools()
+        await session.call_tool(TOOL_NAME, arguments={"to": to, "message": "hello"})
+    finally:
+        await manager.close()
+
+
+async def _pooled(pooled: Any, to: str) -> None:
+    session = await pooled.create_session()
+    await pooled.list_tools()
+    await session.call_tool(TOOL_NAME, arguments={"to": to, "message": "hello"})
+
+
+async def _per_message(send: Callable[[str], Awaitable[None]], messages: int) -> float:
+    started = time.perf_counter()
+    for index in range(messages):
+        await send(f"+1555{index:07d}")
+    return (time.perf_counter() - started) / messages
+
+
+async def _main(args: argparse.Namespace) -> None:
+    if not args.mtls_probe:
+        os.environ["GOOGLE_API_USE_CLIENT_CERTIFICATE"] = "false"
+    # The MCP client and httpx log every request
+    logging.disable(logging.INFO)
+    from google.adk.tools.mcp_tool.mcp_session_manager import StreamableHTTPConnectionParams
+
+    from news_tools.mcp_pool import PooledSession
+
+    url = _serve(_mcp_app(args.call, args.round_trip))
+    connection_params = StreamableHTTPConnectionParams(url=url)
+
+    cold = await _per_message(lambda to: _cold(connection_params, to), args.messages)
+    pooled = PooledSession(connection_params)
+    await _pooled(pooled, "+15550000000")  # Warm-up: connect and fetch the manifest
+    warm = await _per_message(lambda to: _pooled(pooled, to), args.messages)
+    stats = pooled.stats()
+    await pooled.close()
+
+    print(
+        f"Stand-in MCP server: {args.round_trip * 1000:.0f} ms per HTTP request, "
+        f"{args.call * 1000:.0f} ms per tool call; {args.messages} messages"
+    )
+    print(f"{'session':>7}  {'per message':>11}")
+    print(f"{'cold':>7}  {cold * 1000:>9.1f}ms")
+    print(f"{'pooled':>7}  {warm * 1000:>9.1f}ms")
+    print(
+        f"Pooled session: {stats['connects']} connect(s), {stats['manifest_requests']} manifest request(s) "
+        f"for {args.messages + 1} messages"
+    )
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("--messages", type=int, default=50, help="Messages sent per variant.")
+    parser.add_argument("--round-trip", type=float, default=0.03, help="Seconds added to every HTTP request.")
+    parser.add_argument("--call", type=float, default=0.001, help="Seconds the send tool takes.")
+    parser.add_argument("--mtls-probe", action="store_true", help="Keep ADK's per-session mTLS credential probe.")
+    asyncio.run(_main(parser.parse_args()))
+
+
+if __name__ == "__main__":
+    main()
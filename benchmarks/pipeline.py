@@ -0,0 +1,178 @@
+"""
+Prompt-driven research flow versus the deterministic pipeline (request user-014).
+
+The model is simulated: each model turn sleeps for a fixed time to first
+token plus its output tokens at a fixed decode rate, and a turn that runs
+`google_search` adds the search time. Everything else is real: quotes go
+through `fetch_quotes_async` (against a stubbed `fetch_info` with a fixed
+round trip), sentiment through `analyze_headlines`, and the report is
+rendered and saved by `run_news_pipeline` and `ReportWriter` in a
+temporary directory.
+
+*   `prompt-driven`: the turns `voice_Research_Agent_callback`'s
+    `prompt_driven_agent` takes. The model searches and calls
+    `get_financial_context`, writes the whole report into its
+    `save_news_to_markdown` call, then confirms.
+*   `pipeline`: `pipeline_agent` calls `run_research_pipeline`, whose
+    search worker makes the one model call inside the pipeline, then
+    confirms.
+*   `pipeline, cached search`: the same with the search worker's reply
+    already in `SearchCache`, as for a second session asking for the
+    same topic.
+
+The numbers depend entirely on the simulated latencies; change them to
+match what you measure against the live API.
+
+    python -m benchmarks.pipeline [--first-token 0.6] [--tokens-per-second 100] [--search 1.0]
+
+Needs vaderSentiment (`pip install vaderSentiment`).
+"""
+import argparse
+import asyncio
+import json
+import statistics
+import tempfile
+import time
+from typing import Any, Awaitable, Callable, Dict, List
+
+from news_tools import quotes
+from news_tools.agent_runner import AgentReply
+from news_tools.persistence import ReportWriter
+from news_tools.pipeline import render_report, run_news_pipeline
+from news_tools.search_cache import SearchCache
+from news_tools.symbols import SymbolIndex
+
+REQUEST = "5 recent AI news articles about US-listed companies"
+FILENAME = "ai_research_report.md"
+STORIES = [
+    {"headline": "Nvidia beats estimates on record data center demand", "company": "Nvidia", "ticker": "NVDA",
+     "summary": "Data center revenue rose again as cloud providers kept buying AI accelerators.",
+     "source_domain": "reuters.com"},
+    {"headline": "Microsoft expands Azure AI capacity in Europe", "company": "Microsoft", "ticker": "MSFT",
+     "summary": "New regions will host large model training and inference for enterprise customers.",
+     "source_domain": "bloomberg.com"},
+    {"headline": "Alphabet unveils a faster Gemini model for developers", "company": "Alphabet", "ticker": "GOOGL",
+     "summary": "The model targets lower latency and cost for agent workloads.", "source_domain": "techcrunch.com"},
+    {"headline": "Meta faces scrutiny over AI training data", "company": "Meta", "ticker": "META",
+     "summary": "Regulators asked how user content is used to train its models.", "source_domain": "wsj.com"},
+    {"headline": "Anthropic raises new funding round", "company": "Anthropic", "ticker": "N/A",
+     "summary": "The private lab plans to expand compute and research hiring.", "source_domain": "cnbc.com"},
+]
+STORIES_JSON = json.dumps(STORIES, indent=1)
+SOURCES = sorted(story["source_domain"] for story in STORIES)
+CONFIRMATION = "All done. I've compiled the research report with the latest financial context and saved it to {}."
+
+
+def _tokens(text: str) -> int:
+    return max(1, len(text) // 4)  # The usual rule of thumb for English text
+
+
+class SimulatedModel:
+    """Sleeps like a model turn would and counts the turns and output tokens."""
+
+    def __init__(self, first_token: float, tokens_per_second: float, search: float):
+        self.first_token = first_token
+        self.tokens_per_second = tokens_per_second
+        self.search = search
+        self.calls = 0
+        self.output_tokens = 0
+
+    async def turn(self, output: str, searches: bool = False) -> None:
+        self.calls += 1
+        self.output_tokens += _tokens(output)
+        await asyncio.sleep(
+            self.first_token + (self.search if searches else 0.0) + _tokens(output) / self.tokens_per_second
+        )
+
+
+async def prompt_driven(model: SimulatedModel, writer: ReportWriter) -> Dict[str, str]:
+    tickers = [story["ticker"] for story in STORIES if story["ticker"] != "N/A"]
+    await model.turn(json.dumps({"tickers": tickers}), searches=True)
+    market_data = await quotes.fetch_quotes_async(tickers)
+    # The model writes the whole report as the argument of its save call
+    markdown = render_report(STORIES, market_data, {}, [])
+    await model.turn(json.dumps({"filename": FILENAME, "content": markdown}))
+    result = await writer.save(FILENAME, markdown, "prompt-driven")
+    await model.turn(CONFIRMATION.format(result["file_path"]))
+    return result
+
+
+async def pipeline(
+    model: SimulatedModel, writer: ReportWriter, search: Callable[[str], Awaitable[Any]]
+) -> Dict[str, Any]:
+    await model.turn(json.dumps({"request": REQUEST}))
+    result = await run_news_pipeline(
+        REQUEST, search, lambda filename, content: writer.save(filename, content, "pipeline"), FILENAME
+    )
+    await model.turn(CONFIRMATION.format(result["file_path"]))
+    return result
+
+
+def _search_worker(model: SimulatedModel) -> Callable[[str], Awaitable[AgentReply]]:
+    async def search(request: str) -> AgentReply:
+        calls = model.calls
+        await model.turn(STORIES_JSON, searches=True)
+        return AgentReply(STORIES_JSON, model.calls - calls, SOURCES)
+
+    return search
+
+
+def _stub_fetch_info(round_trip: float) -> Callable[[str], Dict[str, Any]]:
+    def fetch_info(ticker_symbol: str) -> Dict[str, Any]:
+        time.sleep(round_trip)
+        return {"symbol": ticker_symbol, "currentPrice": 100.0, "regularMarketChangePercent": 0.015}
+
+    return fetch_info
+
+
+async def _measure(args: argparse.Namespace, run: Callable[[SimulatedModel], Awaitable[Any]]) -> Dict[str, float]:
+    samples: List[float] = []
+    model = SimulatedModel(args.first_token, args.tokens_per_second, args.search)
+    for _ in range(args.repeat):
+        quotes.quote_cache.clear()
+        model.calls = model.output_tokens = 0
+        started = time.perf_counter()
+        await run(model)
+        samples.append(time.perf_counter() - started)
+    return {"seconds": statistics.median(samples), "calls": model.calls, "tokens": model.output_tokens}
+
+
+async def _main(args: argparse.Namespace) -> None:
+    quotes.symbol_index = SymbolIndex(paths=[])
+    quotes.fetch_info = _stub_fetch_info(args.quote_round_trip)
+    with tempfile.TemporaryDirectory() as directory:
+        writer = ReportWriter(directory)
+        cache = SearchCache()
+
+        async def cached_pipeline(model: SimulatedModel) -> Any:
+            search = _search_worker(model)
+            return await pipeline(model, writer, lambda request: cache.run(request, search))
+
+        results = {
+            "prompt-driven": await _measure(args, lambda model: prompt_driven(model, writer)),
+            "pipeline": await _measure(args, lambda model: pipeline(model, writer, _search_worker(model))),
+        }
+        await cached_pipeline(SimulatedModel(0.0, float("inf"), 0.0))  # Fills the search cache
+        results["pipeline, cached search"] = await _measure(args, cached_pipeline)
+
+    print(
+        f"Simulated model: {args.first_token * 1000:.0f} ms to first token, {args.tokens_per_second:.0f} tokens/s, "
+        f"search {args.search * 1000:.0f} ms; quote round trip {args.quote_round_trip * 1000:.0f} ms"
+    )
+    print(f"{'flow':>24}  {'latency':>8}  {'model calls':>11}  {'output tokens':>13}")
+    for name, result in results.items():
+        print(f"{name:>24}  {result['seconds']:>7.2f}s  {result['calls']:>11}  {result['tokens']:>13}")
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("--first-token", type=float, default=0.6, help="Seconds to the first token of a turn.")
+    parser.add_argument("--tokens-per-second", type=float, default=100.0, help="Output decode rate.")
+    parser.add_argument("--search", type=float, default=1.0, help="Extra seconds for a turn that searches.")
+    parser.add_argument("--quote-round-trip", type=float, default=0.15, help="Seconds per quote lookup.")
+    parser.add_argument("--repeat", type=int, default=3, help="Runs per flow; the median is reported.")
+    asyncio.run(_main(parser.parse_args()))
+
+
+if __name__ == "__main__":
+    main()
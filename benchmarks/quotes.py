@@ -0,0 +1,89 @@
+"""
+Concurrent quote fetching against a stub quote server (request user-001).
+
+`news_tools.quotes.fetch_info` is pointed at a local HTTP server that
+answers every lookup after a fixed delay, standing in for the Yahoo
+Finance round trip. For 1, 5, 10 and 20 tickers the benchmark compares
+the serial loop the agents used to run with `fetch_quotes`, both with
+cold caches, and then `fetch_quotes` again with the quotes cached.
+
+    python -m benchmarks.quotes [--delay 0.15] [--repeat 3]
+
+Expect the serial time to grow with the ticker count and the concurrent
+time to grow in steps of one round trip per `MAX_QUOTE_WORKERS` tickers.
+"""
+import argparse
+import json
+import statistics
+import time
+import urllib.request
+from typing import Any, Callable, Dict, List
+
+from benchmarks._stub_server import stub_server
+from news_tools import quotes
+from news_tools.symbols import SymbolIndex
+
+TICKER_COUNTS = (1, 5, 10, 20)
+
+
+def _quote(method: str, path: str, body: bytes) -> Dict[str, Any]:
+    symbol = path.rsplit("/", 1)[-1]
+    return {"symbol": symbol, "quoteType": "EQUITY", "currentPrice": 100.0, "regularMarketChangePercent": 0.015}
+
+
+def _fetch_info_from(url: str) -> Callable[[str], Dict[str, Any]]:
+    def fetch_info(ticker_symbol: str) -> Dict[str, Any]:
+        with urllib.request.urlopen(f"{url}/quote/{ticker_symbol}", timeout=30) as response:
+            return json.load(response)
+
+    return fetch_info
+
+
+def _serial(tickers: List[str]) -> Dict[str, str]:
+    """The loop `get_financial_context` ran before the quote pool."""
+    return {ticker: quotes.format_quote(quotes.fetch_info(ticker)) for ticker in tickers}
+
+
+def _clear_caches() -> None:
+    quotes.quote_cache.clear()
+    quotes.invalid_ticker_cache.clear()
+
+
+def _time(function: Callable[[], Any], repeat: int, cold: bool) -> float:
+    samples = []
+    for _ in range(repeat):
+        if cold:
+            _clear_caches()
+        started = time.perf_counter()
+        function()
+        samples.append(time.perf_counter() - started)
+    return statistics.median(samples)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("--delay", type=float, default=0.15, help="Seconds per stubbed lookup.")
+    parser.add_argument("--repeat", type=int, default=3, help="Runs per measurement; the median is reported.")
+    args = parser.parse_args()
+
+    # Every symbol is accepted, whatever listing files are configured
+    quotes.symbol_index = SymbolIndex(paths=[])
+    with stub_server(_quote, delay=args.delay) as server:
+        quotes.fetch_info = _fetch_info_from(server.url)
+        print(f"Stub round trip {args.delay * 1000:.0f} ms, {quotes.MAX_QUOTE_WORKERS} quote workers")
+        print(f"{'tickers':>7}  {'serial':>9}  {'concurrent':>10}  {'speed-up':>8}  {'cached':>9}")
+        for count in TICKER_COUNTS:
+            tickers = [f"T{index:02d}" for index in range(count)]
+            serial = _time(lambda: _serial(tickers), args.repeat, cold=True)
+            concurrent = _time(lambda: quotes.fetch_quotes(tickers), args.repeat, cold=True)
+            assert set(quotes.fetch_quotes(tickers).values()) == {"$100.00 (+1.50%)"}
+            cached = _time(lambda: quotes.fetch_quotes(tickers), args.repeat, cold=False)
+            print(
+                f"{count:>7}  {serial * 1000:>7.0f}ms  {concurrent * 1000:>8.0f}ms"
+                f"  {serial / concurrent:>7.1f}x  {cached * 1000:>7.2f}ms"
+            )
+        print(f"Lookups served by the stub: {server.requests}")
+
+
+if __name__ == "__main__":
+    main()
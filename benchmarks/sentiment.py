@@ -0,0 +1,114 @@
+"""
+Headline sentiment scoring at 10, 1k and 100k headlines (request user-005).
+
+Compares, per batch size:
+
+*   `per-call`: the original tool body, which built a new
+    `SentimentIntensityAnalyzer` (loading the VADER lexicon) on every call
+    and scored the headlines in a loop.
+*   `shared`: `analyze_headlines` with the process-wide analyzer and a cold
+    memo cache, in the calling thread.
+*   `pool`: the same on a process pool, for batches of at least
+    `PROCESS_POOL_THRESHOLD` headlines.
+*   `memoized`: `analyze_headlines` again on the same batch.
+
+The headlines are generated from a fixed seed and are all distinct, so the
+memo cache does not help the cold runs.
+
+    python -m benchmarks.sentiment [--sizes 10 1000 100000] [--processes N] [--repeat 3]
+
+Needs vaderSentiment (`pip install vaderSentiment`).
+"""
+import argparse
+import os
+import random
+import statistics
+import time
+from typing import Any, Callable, Dict, List
+
+from news_tools import sentiment
+
+BATCH_SIZES = (10, 1000, 100000)
+
+_SUBJECTS = ["Nvidia", "Apple", "Microsoft", "Alphabet", "Meta", "Tesla", "AMD", "Intel", "OpenAI", "Anthropic"]
+_VERBS = [
+    "beats estimates as", "misses forecasts after", "surges on", "slumps amid", "unveils", "delays",
+    "faces probe over", "wins approval for", "cuts jobs despite", "raises guidance on",
+]
+_OBJECTS = [
+    "record AI chip demand", "weak cloud growth", "new model launch", "antitrust concerns",
+    "data center expansion", "supply chain problems", "strong quarterly revenue", "a disappointing outlook",
+]
+
+
+def make_headlines(count: int, seed: int = 5) -> List[str]:
+    """Returns `count` distinct, realistic-looking headlines."""
+    rng = random.Random(seed)
+    return [
+        f"{rng.choice(_SUBJECTS)} {rng.choice(_VERBS)} {rng.choice(_OBJECTS)} (#{index})"
+        for index in range(count)
+    ]
+
+
+def per_call_analyzer(headlines: List[str]) -> Dict[str, str]:
+    """The tool body before the shared analyzer: one analyzer per call."""
+    from vaderSentiment.vaderSentiment import SentimentIntensityAnalyzer
+
+    analyzer = SentimentIntensityAnalyzer()
+    return {
+        headline: sentiment.classify(analyzer.polarity_scores(headline)["compound"])
+        for headline in headlines
+    }
+
+
+def _time(function: Callable[[], Any], repeat: int, cold: bool = True) -> float:
+    samples = []
+    for _ in range(repeat):
+        if cold:
+            sentiment.sentiment_cache.clear()
+        started = time.perf_counter()
+        function()
+        samples.append(time.perf_counter() - started)
+    return statistics.median(samples)
+
+
+def _cell(seconds: float, count: int) -> str:
+    return f"{seconds * 1000:>9.1f}ms {seconds / count * 1e6:>6.1f}µs/h"
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("--sizes", type=int, nargs="+", default=list(BATCH_SIZES))
+    parser.add_argument("--processes", type=int, default=os.cpu_count() or 1, help="Process pool size.")
+    parser.add_argument("--repeat", type=int, default=3, help="Runs per measurement; the median is reported.")
+    args = parser.parse_args()
+
+    largest = max(args.sizes)
+    # Every size scores distinct headlines, and the memo cache must hold a whole batch
+    sentiment.set_sentiment_cache_size(max(sentiment.SENTIMENT_CACHE_SIZE, largest))
+    sentiment.get_analyzer()  # The shared analyzer is built once per process, outside the timings
+    print(f"Process pool: {args.processes} workers from {sentiment.PROCESS_POOL_THRESHOLD} headlines")
+    columns = ("per-call", "shared", "pool", "memoized")
+    print(f"{'headlines':>9}  " + "  ".join(f"{name:>22}" for name in columns))
+    for count in args.sizes:
+        headlines = make_headlines(count)
+        results = {
+            "per-call": _time(lambda: per_call_analyzer(headlines), args.repeat),
+            "shared": _time(lambda: sentiment.analyze_headlines(headlines), args.repeat),
+        }
+        if count >= sentiment.PROCESS_POOL_THRESHOLD and args.processes > 1:
+            results["pool"] = _time(
+                lambda: sentiment.analyze_headlines(headlines, max_processes=args.processes), args.repeat
+            )
+        expected = per_call_analyzer(headlines)
+        scored = sentiment.analyze_headlines(headlines)
+        assert {headline: entry["sentiment"] for headline, entry in scored.items()} == expected
+        results["memoized"] = _time(lambda: sentiment.analyze_headlines(headlines), args.repeat, cold=False)
+        print(
+            f"{count:>9}  "
+            + "  ".join(_cell(results[name], count) if name in results else f"{'-':>22}" for name in columns)
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -1,196 +1,45 @@
-from typing import Dict, List
-import pathlib
-import wave
+import os
+from typing import Any, Dict
 
 from google.adk.agents import Agent
 from google.adk.tools.agent_tool import AgentTool
 from google.adk.tools import google_search, ToolContext
-from google import genai
-from google.genai import types
-import yfinance as yf
-from pydantic import BaseModel, Field
-
-class NewsStory(BaseModel):
-    """A single news story with its context."""
-    company: str = Field(description="Company name associated with the story (e.g., 'Nvidia', 'OpenAI'). Use 'N/A' if not applicable.")
-    ticker: str = Field(description="Stock ticker for the company (e.g., 'NVDA'). Use 'N/A' if private or not found.")
-    summary: str = Field(description="A brief, one-sentence summary of the news story.")
-    why_it_matters: str = Field(description="A concise explanation of the story's significance or impact.")
-    financial_context: str = Field(description="Current stock price and change, e.g., '$950.00 (+1.5%)'. Use 'No financial data' if not applicable.")
-    source_domain: str = Field(description="The source domain of the news, e.g., 'techcrunch.com'.")
-    process_log: str = Field(description="populate the `process_log` field in the schema with the `process_log` list from the `google_search` tool's output." ) 
-
-class AINewsReport(BaseModel):
-    """A structured report of the latest AI news."""
-    title: str = Field(default="AI Research Report", description="The main title of the report.")
-    report_summary: str = Field(description="A brief, high-level summary of the key findings in the report.")
-    stories: List[NewsStory] = Field(description="A list of the individual news stories found.")
-
-
-def wave_file(filename, pcm, channels=1, rate=24000, sample_width=2):
-    """Helper function to save audio data as a wave file"""
-    with wave.open(filename, "wb") as wf:
-        wf.setnchannels(channels)
-        wf.setsampwidth(sample_width)
-        wf.setframerate(rate)
-        wf.writeframes(pcm)
-        
-
-async def generate_podcast_audio(podcast_script: str, tool_context: ToolContext, filename: str = "'ai_today_podcast") -> Dict[str, str]:
-    """
-    Generates audio from a podcast script using Gemini API and saves it as a WAV file.
-
-    Args:
-        podcast_script: The conversational script to be converted to audio.
-        tool_context: The ADK tool context.
-        filename: Base filename for the audio file (without extension).
-
-    Returns:
-        Dictionary with status and file information.
-    """
-    try:
-        client = genai.Client()
-        prompt = f"TTS the following conversation between Joe and Jane:\n\n{podcast_script}"
-
-        response = client.models.generate_content(
-            model="gemini-2.5-flash-preview-tts",
-            contents=prompt,
-            config=types.GenerateContentConfig(
-                response_modalities=["AUDIO"],
-                speech_config=types.SpeechConfig(
-                    multi_speaker_voice_config=types.MultiSpeakerVoiceConfig(
-                        speaker_voice_configs=[
-                            types.SpeakerVoiceConfig(speaker='Joe', 
-                                                     voice_config=types.VoiceConfig(prebuilt_voice_config=types.PrebuiltVoiceConfig(voice_name='Kore'))),
-                            types.SpeakerVoiceConfig(speaker='Jane', 
-                                                     voice_config=types.VoiceConfig(prebuilt_voice_config=types.PrebuiltVoiceConfig(voice_name='Puck')))
-                        ]
-                    )
-                )
-            )
-        )
-
-        data = response.candidates[0].content.parts[0].inline_data.data
 
-        if not filename.endswith(".wav"):
-            filename += ".wav"
-
-        # ** BUG FIX **: This logic now runs for all cases, not just when the extension is added.
-        current_directory = pathlib.Path.cwd()
-        file_path = current_directory / filename
-        wave_file(str(file_path), data)
+from news_tools.agent_runner import AgentReply, run_agent
+from news_tools.domain_policy import DomainPolicyFile
+from news_tools.metrics import tool_metrics
+from news_tools.pipeline import SEARCH_INSTRUCTION, run_news_pipeline
+from news_tools.report import REPORT_TEMPLATES_EN as REPORT_TEMPLATES
+from news_tools.schemas import AINewsReport
+from news_tools.search_cache import search_cache
+from news_tools.search_callbacks import (
+    enforce_data_freshness_callback,
+    inject_process_log_after_search,
+    whitelist_domains_callback,
+)
+from news_tools.single_flight import SingleFlight, list_key, text_key
+from news_tools.tools import get_financial_context, podcast_audio_tool, report_tools, save_news_to_markdown
 
-        return {
-            "status": "success",
-            "message": f"Successfully generated and saved podcast audio to {file_path.resolve()}",
-            "file_path": str(file_path.resolve()),
-            "file_size": len(data)
-        }
-
-    except Exception as e:
-        error_msg = str(e)[:200]
-        return {"status": "error", "message": f"Audio generation failed: {error_msg}"}
-
-def get_financial_context(tickers: List[str]) -> Dict[str, str]:
-    """
-    Fetches the current stock price and daily change for a list of stock tickers.
-    """
-    financial_data: Dict[str, str] = {}
-
-    # Filter out invalid tickers upfront
-    valid_tickers = [ticker.upper().strip() for ticker in tickers 
-                    if ticker and ticker.upper() not in ['N/A', 'NA', '']]
-    
-    if not valid_tickers:
-        return {ticker: "No financial data" for ticker in tickers}
-        
-    for ticker_symbol in valid_tickers:
-        try:
-            stock = yf.Ticker(ticker_symbol)
-            info = stock.info
-            price = info.get("currentPrice") or info.get("regularMarketPrice")
-            change_percent = info.get("regularMarketChangePercent")
-            
-            if price is not None and change_percent is not None:
-                change_str = f"{change_percent * 100:+.2f}%"
-                financial_data[ticker_symbol] = f"${price:.2f} ({change_str})"
-            else:
-                financial_data[ticker_symbol] = "Price data not available."
-        except Exception:
-            financial_data[ticker_symbol] = "Invalid Ticker or Data Error"
-            
-    return financial_data
-
-def save_news_to_markdown(filename: str, content: str) -> Dict[str, str]:
-    """
-    Saves the given content to a Markdown file in the current directory.
-    """
-    try:
-        if not filename.endswith(".md"):
-            filename += ".md"
-        current_directory = pathlib.Path.cwd()
-        file_path = current_directory / filename
-        file_path.write_text(content, encoding="utf-8")
-        return {
-            "status": "success",
-            "message": f"Successfully saved news to {file_path.resolve()}",
-        }
-    except Exception as e:
-        return {"status": "error", "message": f"Failed to save file: {str(e)}"}
+TTS_PROMPT = "TTS the following conversation between Joe and Jane:"
 
+generate_podcast_audio = podcast_audio_tool(TTS_PROMPT)
+add_news_story, save_news_report = report_tools(REPORT_TEMPLATES)
 
 WHITELIST_DOMAINS = ["techcrunch.com", "venturebeat.com", "theverge.com", "technologyreview.com", "arstechnica.com"]
 
-def filter_news_sources_callback(tool, args, tool_context):
-    """Callback to enforce that google_search queries only use whitelisted domains."""
-    if tool.name == "google_search":
-        original_query = args.get("query", "")
-        if any(f"site:{domain}" in original_query.lower() for domain in WHITELIST_DOMAINS):
-            return None
-        whitelist_query_part = " OR ".join([f"site:{domain}" for domain in WHITELIST_DOMAINS])
-        args['query'] = f"{original_query} {whitelist_query_part}"
-        print(f"MODIFIED query to enforce whitelist: '{args['query']}'")
-    return None
-
-def enforce_data_freshness_callback(tool, args, tool_context):
-    """Callback to add a time filter to search queries to get recent news."""
-    if tool.name == "google_search":
-        query = args.get("query", "")
-        # Adds a Google search parameter to filter results from the last week.
-        if "tbs=qdr:w" not in query:
-            args['query'] = f"{query} tbs=qdr:w"
-            print(f"MODIFIED query for freshness: '{args['query']}'")
-    return None
-
-def initialize_process_log(tool_context: ToolContext):
-    """Helper to ensure the process_log list exists in the state."""
-    if 'process_log' not in tool_context.state:
-        tool_context.state['process_log'] = []
-
-def inject_process_log_after_search(tool, args, tool_context, tool_response):
-    """
-    Callback: After a successful search, this injects the process_log into the response
-    and adds a specific note about which domains were sourced. This makes the callbacks'
-    actions visible to the LLM.
-    """
-    if tool.name == "google_search" and isinstance(tool_response, str):
-        # Extract source domains from the search results
-        urls = re.findall(r'https?://[^\s/]+', tool_response)
-        unique_domains = sorted(list(set(urlparse(url).netloc for url in urls)))
-        
-        if unique_domains:
-            sourcing_log = f"Action: Sourced news from the following domains: {', '.join(unique_domains)}."
-            # Prepend the new log to the existing one for better readability in the report
-            current_log = tool_context.state.get('process_log', [])
-            tool_context.state['process_log'] = [sourcing_log] + current_log
-
-        final_log = tool_context.state.get('process_log', [])
-        print(f"CALLBACK LOG: Injecting process log into tool response: {final_log}")
-        return {
-            "search_results": tool_response,
-            "process_log": final_log
-        }
-    return tool_response
+# Compiled once; set WHITELIST_DOMAINS_FILE to load (and hot-reload) a larger list from a file.
+news_whitelist = DomainPolicyFile(os.environ.get("WHITELIST_DOMAINS_FILE"), defaults=WHITELIST_DOMAINS)
+filter_news_sources_callback = whitelist_domains_callback(news_whitelist)
+
+# Concurrent identical calls from different sessions share one result. The
+# report tools write per-session files, so they are never coalesced.
+single_flight = SingleFlight(
+    {
+        "get_financial_context": list_key("tickers"),
+        "generate_podcast_audio": text_key("podcast_script", "filename", "stream", "parallel", "output_format"),
+    },
+    wait_timeouts={"generate_podcast_audio": 600},
+)
 
 podcaster_agent = Agent(
     name="podcaster_agent",
@@ -205,9 +54,11 @@ podcaster_agent = Agent(
     3. Report the result of the audio generation back to the user.
     """,
     tools=[generate_podcast_audio],
+    before_tool_callback=[tool_metrics.before_tool, single_flight.before_tool],
+    after_tool_callback=[tool_metrics.after_tool, single_flight.after_tool],
 )
 
-root_agent = Agent(
+prompt_driven_agent = Agent(
     name="ai_news_researcher",
     model="gemini-2.0-flash-live-001", 
     instruction="""
@@ -230,24 +81,117 @@ root_agent = Agent(
     3.  **Analyze & Extract Tickers (Internal Step):** Process search results to identify company names and their stock tickers. If a company is not on NASDAQ or a ticker cannot be found, use 'N/A'.
     4.  **Get Financial Data (Background Step):** Call the `get_financial_context` tool with the extracted tickers. If the tool returns "Not Available" for any ticker, you will accept this and proceed. Do not stop or report an error.
     5.  **Structure the Report (Internal Step):** Use the `AINewsReport` schema to structure all gathered information. If financial data was not found for a story, you MUST use "Not Available" in the `financial_context` field. You MUST also populate the `process_log` field in the schema with the `process_log` list from the `google_search` tool's output.
-    6.  **Format for Markdown (Internal Step):** Convert the structured `AINewsReport` data into a well-formatted Markdown string. This MUST include a section at the end called "## Data Sourcing Notes" where you list the items from the `process_log`.
-    7.  **Save the Report (Background Step):** Save the Markdown string using `save_news_to_markdown` with the filename `ai_research_report.md`.
+    6.  **Stream Stories (Background Step, Optional):** As soon as a story is structured, you may call `add_news_story` with it so a partial report is saved early.
+    7.  **Save the Report (Background Step):** Call `save_news_report` with the complete structured `AINewsReport`. It renders the Markdown (including the "## Data Sourcing Notes" section built from the `process_log`) and a JSON copy, saves them, and returns the Markdown file's location as `file_path`. Do NOT write the Markdown yourself.
     8.  **Create Podcast Script (Internal Step):** After saving the report, you MUST convert the structured `AINewsReport` data into a natural, conversational podcast script between two hosts, 'Joe' (enthusiastic) and 'Jane' (analytical).
     9.  **Generate Audio (Background Step):** Call the `podcaster_agent` tool, passing the complete conversational script you just created to it.
-    10. **Final Confirmation:** After the audio is successfully generated, your final response to the user MUST be: "All done. I've compiled the research report, saved it to `ai_research_report.md`, and generated the podcast audio file for you."
+    10. **Final Confirmation:** After the audio is successfully generated, your final response to the user MUST be: "All done. I've compiled the research report, saved it to <file_path>, and generated the podcast audio file for you.", where <file_path> is the `file_path` returned by `save_news_report`.
     """,
     tools=[
         google_search,
         get_financial_context,
-        save_news_to_markdown,
+        add_news_story,
+        save_news_report,
         AgentTool(agent=podcaster_agent) 
     ],
     output_schema=AINewsReport,
     before_tool_callback=[
+        tool_metrics.before_tool,            # First, so short-circuited calls are measured too
+        filter_news_sources_callback,
+        enforce_data_freshness_callback,
+        single_flight.before_tool,           # Last, after the argument rewrites
+    ],
+    after_tool_callback=[
+        tool_metrics.after_tool,
+        single_flight.after_tool,            # Must see the raw response
+        inject_process_log_after_search,
+    ]
+)
+
+# Deterministic pipeline mode: the model searches (with the same callbacks)
+# and writes the podcast script; every other step is Python.
+news_search_agent = Agent(
+    name="ai_news_search_worker",
+    model="gemini-2.0-flash",
+    instruction=SEARCH_INSTRUCTION,
+    tools=[google_search],
+    before_tool_callback=[
+        tool_metrics.before_tool,            # First, so short-circuited calls are measured too
         filter_news_sources_callback,
         enforce_data_freshness_callback,
     ],
     after_tool_callback=[
+        tool_metrics.after_tool,
         inject_process_log_after_search,
     ]
-)
\ No newline at end of file
+)
+
+podcast_script_agent = Agent(
+    name="podcast_script_writer",
+    model="gemini-2.0-flash",
+    instruction="""
+    Convert the AI news report you receive into a natural, conversational podcast script between two hosts,
+    'Joe' (enthusiastic) and 'Jane' (analytical). Start every line with the speaker's name followed by a colon,
+    e.g. "Joe: Welcome back to AI Today!". Respond with the script only.
+    """,
+)
+
+
+async def _search_news(request: str) -> AgentReply:
+    # google_search runs model-side, so cache the whole worker run instead.
+    # Keyed by module, since each agent's worker applies its own source policy.
+    return await search_cache.run(request, lambda text: run_agent(news_search_agent, text), namespace=__name__)
+
+
+async def run_podcast_pipeline(request: str, tool_context: ToolContext) -> Dict[str, Any]:
+    """
+    Finds recent AI news, enriches it with market data and sentiment, saves the report
+    and generates the podcast audio, all in a single step.
+
+    Args:
+        request: What to search for, e.g. '5 recent AI news articles about NASDAQ-listed US companies'.
+        tool_context: The ADK tool context.
+
+    Returns:
+        A dictionary with the status of the operation, the saved report's path and the podcast audio details.
+    """
+    try:
+        report = await run_news_pipeline(
+            request,
+            _search_news,
+            lambda filename, content: save_news_to_markdown(filename, content, tool_context),
+        )
+        script = await run_agent(podcast_script_agent, report["markdown"])
+        audio = await generate_podcast_audio(script.text, tool_context, "ai_today_podcast", parallel=True)
+    except Exception as e:
+        return {"status": "error", "message": f"Podcast pipeline failed: {str(e)[:200]}"}
+    model_calls = report["model_calls"] + script.model_calls
+    print(f"PIPELINE: {model_calls} model calls, report timings {report['timings']}")
+    return {
+        "status": audio["status"],
+        "report_message": report["message"],
+        "report_path": report.get("file_path", ""),
+        "audio_message": audio["message"],
+        "stories": len(report["stories"]),
+    }
+
+
+pipeline_agent = Agent(
+    name="ai_news_podcast_pipeline",
+    model="gemini-2.0-flash-live-001",
+    instruction="""
+    **Your Core Identity:**
+    You are an AI News Podcast Producer for US-listed companies on the NASDAQ.
+
+    **Required Conversational Workflow:**
+    1.  **Acknowledge and Inform:** The VERY FIRST thing you do is respond to the user with: "Okay, I'll start researching the latest AI news for NASDAQ-listed US companies. I will enrich the findings with financial data where available and compile a report for you. This might take a moment."
+    2.  **Run the Pipeline:** Call `run_podcast_pipeline` once with a request for recent news about "AI" and "NASDAQ-listed US companies". It searches, adds financial data, saves the report and generates the podcast audio for you.
+    3.  **Final Confirmation:** After it succeeds, your final response to the user MUST be: "All done. I've compiled the research report, saved it to <report_path>, and generated the podcast audio file for you.", where <report_path> is the `report_path` returned by `run_podcast_pipeline`.
+    """,
+    tools=[run_podcast_pipeline],
+    before_tool_callback=[tool_metrics.before_tool],
+    after_tool_callback=[tool_metrics.after_tool],
+)
+
+# Set RESEARCH_PIPELINE_MODE=1 to serve the deterministic pipeline instead of the prompt-driven flow.
+root_agent = pipeline_agent if os.environ.get("RESEARCH_PIPELINE_MODE") == "1" else prompt_driven_agent
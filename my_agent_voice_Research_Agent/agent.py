@@ -1,79 +1,147 @@
-import pathlib
-from typing import Dict, List
-import yfinance as yf
+import asyncio
+from typing import Any, Dict, Optional
 
 from google.adk.agents import Agent
-from google.adk.tools import google_search
+from google.adk.tools import ToolContext, google_search
+from google.adk.tools.agent_tool import AgentTool
 
+from news_tools.agent_runner import run_agent
+from news_tools.jobs import Job, JobQueue
+from news_tools.metrics import tool_metrics
+from news_tools.persistence import session_id_of
+from news_tools.pipeline import SEARCH_INSTRUCTION
+from news_tools.tools import get_financial_context, save_news_to_markdown
 
-def get_financial_context(tickers: List[str]) -> Dict[str, str]:
+
+REPORT_SCHEMA = """
+    **Required Report Schema:**
+    ```markdown
+    # AI Industry News Report
+
+    ## Top Headlines
+
+    ### 1. {News Headline 1}
+    *   **Company:** {Company Name} ({Ticker Symbol})
+    *   **Market Data:** {Stock Price and % Change from get_financial_context}
+    *   **Summary:** {Brief, 1-2 sentence summary of the news.}
+
+    ### 2. {News Headline 2}
+    *   **Company:** {Company Name} ({Ticker Symbol})
+    *   **Market Data:** {Stock Price and % Change from get_financial_context}
+    *   **Summary:** {Brief, 1-2 sentence summary of the news.}
+
+    (Continue for all 5 news items)
+    ```
+"""
+
+# Outside the Live API, Gemini cannot combine the built-in google_search with
+# function tools in one agent, so the search runs in its own worker agent.
+news_search_agent = Agent(
+    name="ai_news_report_searcher",
+    model="gemini-2.0-flash",
+    instruction=SEARCH_INSTRUCTION,
+    tools=[google_search],
+)
+
+# Runs the research out-of-band, on a regular (non-live) model, so the live
+# voice session only has to start the job and poll it.
+report_builder_agent = Agent(
+    name="ai_news_report_builder",
+    model="gemini-2.0-flash",
+    instruction="""
+    You are a background AI research worker. For every request, silently execute the following
+    sequence of tool calls:
+        a.  **Search:** Call the `ai_news_report_searcher` tool to find 5 recent, relevant news articles about AI,
+        focusing on US-listed companies. It returns the articles as JSON, with the company and ticker of each.
+        b.  **Extract Tickers:** Collect the stock tickers it found (e.g., 'NVDA' for Nvidia), skipping "N/A".
+        c.  **Get Financial Data:** Call the `get_financial_context` tool with the list of extracted tickers.
+        d.  **Format Report:** Construct a single Markdown string for the report. You MUST format this string to
+        EXACTLY match the schema below.
+        e.  **Save Report:** Call the `save_news_to_markdown` tool with the filename `ai_research_report.md` and the fully
+        formatted Markdown string as the content.
+
+    When `save_news_to_markdown` succeeds, reply with the `file_path` it returned and nothing else.
+    """ + REPORT_SCHEMA,
+    tools=[AgentTool(agent=news_search_agent), get_financial_context, save_news_to_markdown],
+    before_tool_callback=[tool_metrics.before_tool],
+    after_tool_callback=[tool_metrics.after_tool],
+)
+
+report_jobs = JobQueue(max_workers=2)
+
+
+async def _build_report(request: str, session_id: Optional[str]) -> str:
+    """Runs the report builder agent to completion and returns its final reply (the report path)."""
+    # Reuse the live session's ID, so the report is saved with that session's files
+    reply = await run_agent(report_builder_agent, request, session_id=session_id)
+    return reply.text
+
+
+def _log_report_job(job: Job) -> None:
+    print(f"JOB {job.id} ({job.name}) finished with status '{job.status}'")
+
+
+async def start_research_report(request: str, tool_context: ToolContext) -> Dict[str, str]:
     """
-    Fetches the current stock price and daily change for a list of stock tickers
-    using the yfinance library.
+    Starts building the AI news research report in the background and returns immediately.
 
     Args:
-        tickers: A list of stock market tickers (e.g., ["NVDA", "MSFT"]).
+        request: The user's research request, e.g. 'latest AI news'.
+        tool_context: The ADK tool context.
 
     Returns:
-        A dictionary mapping each ticker to its formatted financial data string.
+        A dictionary with the job ID to use with `get_research_report_status`.
     """
-    financial_data: Dict[str, str] = {}
-    for ticker_symbol in tickers:
-        try:
-            # Create a Ticker object
-            stock = yf.Ticker(ticker_symbol)
-            
-            # Fetch the info dictionary
-            info = stock.info
-            
-            # Safely access the required data points
-            price = info.get("currentPrice") or info.get("regularMarketPrice")
-            change_percent = info.get("regularMarketChangePercent")
-            
-            if price is not None and change_percent is not None:
-                # Format the percentage and the final string
-                change_str = f"{change_percent * 100:+.2f}%"
-                financial_data[ticker_symbol] = f"${price:.2f} ({change_str})"
-            else:
-                # Handle cases where the ticker is valid but data is missing
-                financial_data[ticker_symbol] = "Price data not available."
-
-        except Exception:
-            # This handles invalid tickers or other yfinance errors gracefully
-            financial_data[ticker_symbol] = "Invalid Ticker or Data Error"
-            
-    return financial_data
-
-def save_news_to_markdown(filename: str, content: str) -> Dict[str, str]:
+    session_id = session_id_of(tool_context)
+    try:
+        job = await report_jobs.submit(
+            "ai_research_report",
+            lambda: _build_report(request, session_id),
+            on_complete=_log_report_job,
+        )
+    except asyncio.QueueFull:
+        return {"status": "error", "message": "Too many reports are already being built. Try again shortly."}
+    return {"status": "queued", "job_id": job.id}
+
+
+def get_research_report_status(job_id: str) -> Dict[str, Any]:
     """
-    Saves the given content to a Markdown file in the current directory.
+    Returns the status of a background research report job.
 
     Args:
-        filename: The name of the file to save (e.g., 'ai_news.md').
-        content: The Markdown-formatted string to write to the file.
+        job_id: The job ID returned by `start_research_report`.
+
+    Returns:
+        A dictionary with the job status ('queued', 'running', 'done', 'failed' or 'cancelled').
+    """
+    job = report_jobs.get(job_id)
+    if job is None:
+        return {"status": "error", "message": f"Unknown job ID: {job_id}"}
+    return job.to_dict()
+
+
+def cancel_research_report(job_id: str) -> Dict[str, str]:
+    """
+    Cancels a background research report job.
+
+    Args:
+        job_id: The job ID returned by `start_research_report`.
 
     Returns:
         A dictionary with the status of the operation.
     """
-    try:
-        if not filename.endswith(".md"):
-            filename += ".md"
-        current_directory = pathlib.Path.cwd()
-        file_path = current_directory / filename
-        file_path.write_text(content, encoding="utf-8")
-        return {
-            "status": "success",
-            "message": f"Successfully saved news to {file_path.resolve()}",
-        }
-    except Exception as e:
-        return {"status": "error", "message": f"Failed to save file: {str(e)}"}
+    if report_jobs.cancel(job_id):
+        return {"status": "success", "message": f"Cancelled job {job_id}"}
+    return {"status": "error", "message": f"Job {job_id} is unknown or already finished"}
+
+
 # The root_agent is what ADK will run.
 root_agent = Agent(
     name="ai_news_research_coordinator",
     model="gemini-2.0-flash-live-001",
     instruction="""
     **Your Identity:** You are a background AI Research Coordinator. Your sole purpose is to respond to requests for 
-    recent AI news by performing a multi-step research task and saving the result to a file.
+    recent AI news by starting a multi-step research task that saves the result to a file.
 
     **Strict Topic Mandate:**
     If a user asks about anything other than recent AI news, you MUST refuse with the exact phrase: "Sorry, I can only help 
@@ -81,50 +149,29 @@ root_agent = Agent(
 
     **Required Two-Message Interaction Workflow:**
 
-    1.  **Initial Acknowledgment:** The MOMENT you receive a valid request for AI news, your first and only immediate 
-    response MUST be:
+    1.  **Initial Acknowledgment:** The MOMENT you receive a valid request for AI news, call the `start_research_report`
+    tool with the user's request. Your first and only immediate response MUST then be:
         *   "Okay, I'll start researching the latest AI news. I will enrich the findings with financial data and compile a 
         report for you. This might take a moment."
+        Then tell the user the `job_id` returned by `start_research_report`.
 
-    2.  **Background Processing (Silent):** After sending the acknowledgment, you will silently execute the following 
-    sequence of tool calls without any further communication with the user:
-        a.  **Search:** Use the `google_search` tool to find 5 recent, relevant news articles about AI, focusing on 
-        US-listed companies.
-        b.  **Extract Tickers:** Internally, identify the stock ticker for each company mentioned (e.g., 'NVDA' for Nvidia).
-        c.  **Get Financial Data:** Call the `get_financial_context` tool with the list of extracted tickers.
-        d.  **Format Report:** Construct a single Markdown string for the report. You MUST format this string to 
-        EXACTLY match the schema below.
-
-    **Required Report Schema:**
-    ```markdown
-    # AI Industry News Report
-
-    ## Top Headlines
-
-    ### 1. {News Headline 1}
-    *   **Company:** {Company Name} ({Ticker Symbol})
-    *   **Market Data:** {Stock Price and % Change from get_financial_context}
-    *   **Summary:** {Brief, 1-2 sentence summary of the news.}
+    2.  **Background Processing (Silent):** The search, financial data lookup, formatting and saving all happen in the
+    background job. Do not call any other tool while it runs, and keep the conversation free for the user.
 
-    ### 2. {News Headline 2}
-    *   **Company:** {Company Name} ({Ticker Symbol})
-    *   **Market Data:** {Stock Price and % Change from get_financial_context}
-    *   **Summary:** {Brief, 1-2 sentence summary of the news.}
-
-    (Continue for all 5 news items)
-    ```
-        e.  **Save Report:** Call the `save_news_to_markdown` tool with the filename `ai_research_report.md` and the fully 
-        formatted Markdown string as the content.
+    3.  **Status and Cancellation:** If the user asks whether the report is ready, call `get_research_report_status`
+    with the job ID. If the user asks to stop, call `cancel_research_report` with the job ID.
 
-    3.  **Final Confirmation:** Once `save_news_to_markdown` returns a success message, your second and final response to the 
+    4.  **Final Confirmation:** Once `get_research_report_status` returns 'done', your second and final response to the 
     user MUST be:
-        *   "All done. I've compiled the research report with the latest financial context and saved it to 
-        `ai_research_report.md`."
+        *   "All done. I've compiled the research report with the latest financial context and saved it to
+        <file_path>.", where <file_path> is the path in the job's `result`.
 
-    **Crucial Rule:** All complex work happens silently in the background between your initial acknowledgment and
+    **Crucial Rule:** All complex work happens in the background between your initial acknowledgment and
     your final confirmation. Do not engage in any other conversation.
     """,
-    tools=[google_search, get_financial_context, save_news_to_markdown],
+    tools=[start_research_report, get_research_report_status, cancel_research_report],
+    before_tool_callback=[tool_metrics.before_tool],
+    after_tool_callback=[tool_metrics.after_tool],
 )
 
 #from IPython.display import Markdown, display
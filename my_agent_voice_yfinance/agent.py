@@ -1,82 +1,16 @@
-from typing import Dict, List
 from google.adk.agents import Agent
 from google.adk.tools import google_search
-import yfinance as yf
-from vaderSentiment.vaderSentiment import SentimentIntensityAnalyzer
 
-def get_financial_context(tickers: List[str]) -> Dict[str, str]:
-    """
-    Fetches the current stock price and daily change for a list of stock tickers
-    using the yfinance library.
+from news_tools.metrics import tool_metrics
+from news_tools.single_flight import SingleFlight, list_key
+from news_tools.tools import analyze_news_sentiment, get_financial_context
 
-    Args:
-        tickers: A list of stock market tickers (e.g., ["GOOG", "NVDA"]).
 
-    Returns:
-        A dictionary mapping each ticker to its formatted financial data string.
-    """
-    financial_data: Dict[str, str] = {}
-    for ticker_symbol in tickers:
-        try:
-            # Create a Ticker object
-            stock = yf.Ticker(ticker_symbol)
-
-            # Fetch the info dictionary
-            info = stock.info
-
-            # Safely access the required data points
-            price = info.get("currentPrice") or info.get("regularMarketPrice")
-            change_percent = info.get("regularMarketChangePercent")
-
-            if price is not None and change_percent is not None:
-                # Format the percentage and the final string
-                change_str = f"{change_percent * 100:+.2f}%"
-                financial_data[ticker_symbol] = f"${price:.2f} ({change_str})"
-            else:
-                # Handle cases where the ticker is valid but data is missing
-                financial_data[ticker_symbol] = "Price data not available."
-
-        except Exception:
-            # This handles invalid tickers or other yfinance errors gracefully
-            financial_data[ticker_symbol] = "Invalid Ticker or Data Error"
-
-    return financial_data
-
-def analyze_news_sentiment(headlines: List[str]) -> Dict[str, str]:
-    """
-    Analyzes the sentiment of news headlines and classifies them as positive, negative, or neutral.
-
-    Args:
-        headlines: A list of news headlines to analyze (e.g., ["Apple announces new product", "Market crashes"]).
-
-    Returns:
-        A dictionary mapping each headline to its sentiment classification (positive/negative/neutral).
-    """
-    # Initialize VADER sentiment analyzer
-    analyzer = SentimentIntensityAnalyzer()
-    sentiment_results: Dict[str, str] = {}
-    
-    for headline in headlines:
-        try:
-            # Get sentiment scores: compound score ranges from -1.0 (negative) to 1.0 (positive)
-            scores = analyzer.polarity_scores(headline)
-            compound_score = scores['compound']
-            
-            # Classify sentiment based on compound score threshold
-            if compound_score >= 0.05:
-                sentiment = "positive"
-            elif compound_score <= -0.05:
-                sentiment = "negative"
-            else:
-                sentiment = "neutral"
-            
-            sentiment_results[headline] = sentiment
-            
-        except Exception:
-            # Handle any errors gracefully
-            sentiment_results[headline] = "error"
-    
-    return sentiment_results
+# Concurrent identical calls from different sessions share one result.
+single_flight = SingleFlight({
+    "get_financial_context": list_key("tickers"),
+    "analyze_news_sentiment": list_key("headlines"),
+})
 
 root_agent = Agent(
     name="ai_news_chat_assistant",
@@ -114,4 +48,6 @@ S-listed companies. Your primary goal is to be interactive and transparent about
     *   **Cite Your Tools:** Always mention `analyze_news_sentiment` when presenting the sentiment of the news headlines.
     """,
     tools=[google_search, get_financial_context, analyze_news_sentiment],
+    before_tool_callback=[tool_metrics.before_tool, single_flight.before_tool],
+    after_tool_callback=[tool_metrics.after_tool, single_flight.after_tool],
 )
\ No newline at end of file
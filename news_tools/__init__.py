@@ -0,0 +1 @@
+"""Helpers shared by the agent packages in this repository."""
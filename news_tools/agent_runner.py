@@ -0,0 +1,57 @@
+"""
+Runs an ADK agent to completion outside of a user-facing session.
+
+The runner stack is imported on the first run, so agents that never start a
+background run do not load it.
+"""
+from typing import Any, List, NamedTuple, Optional
+
+from news_tools.process_log import grounding_domains
+
+
+class AgentReply(NamedTuple):
+    """Outcome of a one-off agent run."""
+    text: str
+    model_calls: int
+    sources: List[str]
+
+
+async def run_agent(
+    agent: Any, message: str, user_id: str = "background", session_id: Optional[str] = None
+) -> AgentReply:
+    """
+    Sends one message to an agent in a fresh in-memory session.
+
+    Args:
+        agent: The ADK agent to run.
+        message: The user message to send.
+        user_id: The user ID the session is created for.
+        session_id: ID for the new session, e.g. the live session the run works for,
+            so session-scoped files end up next to that session's other files.
+
+    Returns:
+        The agent's final reply, the number of model responses it took and
+        the source domains its search grounding cited.
+    """
+    from google.adk.runners import InMemoryRunner
+    from google.genai import types
+
+    runner = InMemoryRunner(agent=agent, app_name=agent.name)
+    session = await runner.session_service.create_session(
+        app_name=agent.name, user_id=user_id, session_id=session_id
+    )
+    final_text = ""
+    model_calls = 0
+    grounding = []
+    async for event in runner.run_async(
+        user_id=user_id,
+        session_id=session.id,
+        new_message=types.Content(role="user", parts=[types.Part(text=message)]),
+    ):
+        if event.content and event.content.role == "model" and not event.partial:
+            model_calls += 1
+        if event.grounding_metadata:
+            grounding.append(event.grounding_metadata)
+        if event.is_final_response() and event.content and event.content.parts:
+            final_text = "".join(part.text or "" for part in event.content.parts)
+    return AgentReply(final_text, model_calls, grounding_domains(grounding))
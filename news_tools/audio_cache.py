@@ -0,0 +1,147 @@
+"""
+On-disk, content-addressed cache of synthesized PCM.
+
+Each entry is a raw PCM file named after a SHA-256 of everything that
+affects the audio: the text, the speaker, the voice and the language prompt
+(so the English and Spanish podcasts never share entries). Hits are served
+as read-only memory maps instead of a TTS call, and the least recently used
+entries are deleted once the cache grows past its byte budget.
+"""
+from collections import OrderedDict
+import hashlib
+import mmap
+import os
+import pathlib
+import tempfile
+import threading
+from typing import Any, Dict, Optional, Union
+
+AUDIO_CACHE_DIR_ENV = "NEWS_TOOLS_AUDIO_CACHE_DIR"
+DEFAULT_AUDIO_CACHE_DIR = pathlib.Path.home() / ".cache" / "news_tools" / "tts"
+DEFAULT_AUDIO_CACHE_BYTES = 512 * 1024 * 1024
+
+_ENTRY_SUFFIX = ".pcm"
+
+
+def audio_key(text: str, speaker: str, voice_name: str, prompt: str) -> str:
+    """Returns the content address of a synthesized segment."""
+    digest = hashlib.sha256()
+    for part in (text, speaker, voice_name, prompt):
+        encoded = part.encode("utf-8")
+        # Length-prefix each part so ('ab', 'c') and ('a', 'bc') differ
+        digest.update(len(encoded).to_bytes(8, "big"))
+        digest.update(encoded)
+    return digest.hexdigest()
+
+
+class AudioCache:
+    """Size-bounded LRU cache of PCM segments stored as files."""
+
+    def __init__(self, directory: Union[str, pathlib.Path], max_bytes: int = DEFAULT_AUDIO_CACHE_BYTES):
+        self.directory = pathlib.Path(directory)
+        self.directory.mkdir(parents=True, exist_ok=True)
+        self.max_bytes = max_bytes
+        self._lock = threading.Lock()
+        self._entries: "OrderedDict[str, int]" = OrderedDict()
+        self._total_bytes = 0
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        # Rebuild the LRU order from the files left by earlier processes
+        existing = sorted(
+            self.directory.glob(f"*{_ENTRY_SUFFIX}"), key=lambda path: path.stat().st_mtime
+        )
+        for path in existing:
+            size = path.stat().st_size
+            self._entries[path.stem] = size
+            self._total_bytes += size
+
+    def _path(self, key: str) -> pathlib.Path:
+        return self.directory / f"{key}{_ENTRY_SUFFIX}"
+
+    def get(self, key: str) -> Optional[mmap.mmap]:
+        """
+        Returns a read-only memory map of a cached segment, or None on a miss.
+
+        The map is closed when it is garbage collected.
+        """
+        with self._lock:
+            if key not in self._entries:
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+        path = self._path(key)
+        try:
+            with open(path, "rb") as segment:
+                mapped = mmap.mmap(segment.fileno(), 0, access=mmap.ACCESS_READ)
+            # Touch the file so the LRU order survives a restart
+            os.utime(path)
+        except (OSError, ValueError):
+            # Deleted or truncated behind our back; treat as a miss
+            with self._lock:
+                self._forget(key)
+                self.misses += 1
+            return None
+        with self._lock:
+            self.hits += 1
+        return mapped
+
+    def put(self, key: str, pcm: bytes) -> None:
+        """Stores a segment atomically and evicts old entries past the byte budget."""
+        if not pcm or len(pcm) > self.max_bytes:
+            return
+        fd, tmp_name = tempfile.mkstemp(dir=self.directory, suffix=".tmp")
+        try:
+            with os.fdopen(fd, "wb") as segment:
+                segment.write(pcm)
+            os.replace(tmp_name, self._path(key))
+        except OSError:
+            try:
+                os.unlink(tmp_name)
+            except OSError:
+                pass
+            return
+        with self._lock:
+            self._forget(key)
+            self._entries[key] = len(pcm)
+            self._total_bytes += len(pcm)
+            while self._total_bytes > self.max_bytes:
+                old_key, _ = next(iter(self._entries.items()))
+                self._forget(old_key)
+                self.evictions += 1
+                try:
+                    self._path(old_key).unlink()
+                except OSError:
+                    pass
+
+    def _forget(self, key: str) -> None:
+        size = self._entries.pop(key, None)
+        if size is not None:
+            self._total_bytes -= size
+
+    def stats(self) -> Dict[str, Any]:
+        """Returns hit/miss/eviction counters and the bytes on disk."""
+        with self._lock:
+            return {
+                "entries": len(self._entries),
+                "bytes": self._total_bytes,
+                "max_bytes": self.max_bytes,
+                "hits": self.hits,
+                "misses": self.misses,
+                "evictions": self.evictions,
+            }
+
+
+_audio_cache: Optional[AudioCache] = None
+_audio_cache_lock = threading.Lock()
+
+
+def get_audio_cache() -> AudioCache:
+    """Returns the process-wide audio cache, creating its directory on first use."""
+    global _audio_cache
+    if _audio_cache is None:
+        with _audio_cache_lock:
+            if _audio_cache is None:
+                directory = os.environ.get(AUDIO_CACHE_DIR_ENV) or DEFAULT_AUDIO_CACHE_DIR
+                _audio_cache = AudioCache(directory)
+    return _audio_cache
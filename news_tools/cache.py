@@ -0,0 +1,120 @@
+"""
+A small thread-safe LRU cache with per-entry time-to-live.
+
+Entries younger than `ttl` are fresh. Entries older than `ttl` but younger
+than `ttl + stale_ttl` are stale: they are still returned so callers can
+answer immediately and refresh them in the background. Anything older is
+dropped.
+"""
+from collections import OrderedDict
+import threading
+import time
+from typing import Any, Callable, Dict, Hashable, Optional, Tuple
+
+FRESH = "fresh"
+STALE = "stale"
+MISS = "miss"
+
+
+class TTLCache:
+    """Bounded LRU cache whose entries expire after a time-to-live."""
+
+    def __init__(
+        self,
+        max_entries: int = 256,
+        ttl: float = 60.0,
+        stale_ttl: float = 0.0,
+        clock: Callable[[], float] = time.monotonic,
+    ):
+        if max_entries < 1:
+            raise ValueError("max_entries must be at least 1")
+        self.max_entries = max_entries
+        self.ttl = ttl
+        self.stale_ttl = stale_ttl
+        self._clock = clock
+        self._entries: "OrderedDict[Hashable, Tuple[float, Any]]" = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.stale_hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.expirations = 0
+
+    def lookup(self, key: Hashable) -> Tuple[Optional[Any], str]:
+        """
+        Looks up a key without loading it.
+
+        Returns:
+            A `(value, state)` tuple where state is FRESH, STALE or MISS.
+            The value is None on a miss.
+        """
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                self.misses += 1
+                return None, MISS
+            stored_at, value = entry
+            age = self._clock() - stored_at
+            if age > self.ttl + self.stale_ttl:
+                del self._entries[key]
+                self.expirations += 1
+                self.misses += 1
+                return None, MISS
+            self._entries.move_to_end(key)
+            if age > self.ttl:
+                self.stale_hits += 1
+                return value, STALE
+            self.hits += 1
+            return value, FRESH
+
+    def get(self, key: Hashable, default: Any = None) -> Any:
+        """Returns the cached value for a key, fresh or stale, or `default`."""
+        value, state = self.lookup(key)
+        return default if state == MISS else value
+
+    def set(self, key: Hashable, value: Any) -> None:
+        """Stores a value, evicting the least recently used entries if full."""
+        with self._lock:
+            self._entries[key] = (self._clock(), value)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+                self.evictions += 1
+
+    def resize(self, max_entries: int) -> None:
+        """Changes the entry cap, evicting least recently used entries if needed."""
+        if max_entries < 1:
+            raise ValueError("max_entries must be at least 1")
+        with self._lock:
+            self.max_entries = max_entries
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+                self.evictions += 1
+
+    def discard(self, key: Hashable) -> None:
+        """Removes a key if it is present."""
+        with self._lock:
+            self._entries.pop(key, None)
+
+    def clear(self) -> None:
+        """Drops every entry. Counters are kept."""
+        with self._lock:
+            self._entries.clear()
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def stats(self) -> Dict[str, Any]:
+        """Returns the cache counters, e.g. for sizing the cache under load."""
+        with self._lock:
+            lookups = self.hits + self.stale_hits + self.misses
+            return {
+                "entries": len(self._entries),
+                "max_entries": self.max_entries,
+                "hits": self.hits,
+                "stale_hits": self.stale_hits,
+                "misses": self.misses,
+                "evictions": self.evictions,
+                "expirations": self.expirations,
+                "hit_rate": (self.hits + self.stale_hits) / lookups if lookups else 0.0,
+            }
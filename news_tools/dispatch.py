@@ -0,0 +1,258 @@
+"""
+Rate-limited bulk delivery of one message to many recipients.
+
+`dispatch` is the non-LLM path for fan-out notifications: it fills a
+message template per recipient and sends each one with a caller-supplied
+`send` coroutine, e.g. a direct MCP `call_tool`. Only `{field}` placeholders
+naming a recipient field (such as `{to}`) are substituted; any other braces
+in the message are sent as they are.
+
+*   A token bucket caps the send rate (with a small burst allowance) and a
+    fixed number of workers caps how many sends are in flight.
+*   Failed sends are retried per recipient with exponential backoff and
+    jitter. One bad number never stops the batch.
+*   Every delivery has an idempotency key derived from the campaign, the
+    recipient and the final message text. Keys of delivered messages are
+    appended to a ledger file, so re-running an interrupted batch with the
+    same campaign ID only sends what is missing. Without a campaign ID the
+    keys are scoped to the one run, so the same text can be sent again
+    another day.
+
+Delivery is at least once. The key is handed to `send`, but deduplication
+only happens at the receiving end if `send` forwards it to a service that
+honours it. Otherwise a retry after an ambiguous failure (e.g. a timeout
+after the message went out) can deliver the message twice.
+
+The returned report has the counts, the throughput and the latency
+percentiles, plus the failures so they can be retried or inspected.
+"""
+import asyncio
+import hashlib
+import json
+import os
+import pathlib
+import random
+import re
+import threading
+import time
+import uuid
+from typing import Any, Awaitable, Callable, Dict, Iterable, List, Mapping, NamedTuple, Optional, Set, Union
+
+from news_tools.metrics import percentile
+
+LEDGER_FILE_ENV = "NEWS_TOOLS_DISPATCH_LEDGER"
+DEFAULT_LEDGER_FILE = pathlib.Path.home() / ".cache" / "news_tools" / "dispatch_sent.jsonl"
+DISPATCH_RATE_PER_SECOND = 5.0
+DISPATCH_BURST = 10
+DISPATCH_MAX_IN_FLIGHT = 8
+DISPATCH_ATTEMPTS = 3
+DISPATCH_RETRY_BACKOFF_SECONDS = 1.0
+
+SENT = "sent"
+DUPLICATE = "duplicate"
+FAILED = "failed"
+
+Recipient = Union[str, Mapping[str, str]]
+
+_PLACEHOLDER = re.compile(r"\{(\w+)\}")
+
+
+class TokenBucket:
+    """Async token bucket: `rate` tokens per second, holding at most `burst`."""
+
+    def __init__(self, rate: float, burst: int = 1, clock: Callable[[], float] = time.monotonic):
+        if rate <= 0 or burst < 1:
+            raise ValueError("rate must be positive and burst at least 1")
+        self.rate = rate
+        self.burst = burst
+        self._clock = clock
+        self._tokens = float(burst)
+        self._updated = clock()
+        self._lock: Optional[asyncio.Lock] = None
+
+    async def acquire(self) -> None:
+        """Waits until a token is available and takes it."""
+        if self._lock is None:
+            self._lock = asyncio.Lock()
+        # Waiters queue on the lock, so tokens are handed out in arrival order
+        async with self._lock:
+            while True:
+                now = self._clock()
+                self._tokens = min(self.burst, self._tokens + (now - self._updated) * self.rate)
+                self._updated = now
+                if self._tokens >= 1:
+                    self._tokens -= 1
+                    return
+                await asyncio.sleep((1 - self._tokens) / self.rate)
+
+
+def idempotency_key(campaign: str, recipient: str, message: str) -> str:
+    """Returns a stable key for delivering `message` to `recipient` within `campaign`."""
+    digest = hashlib.blake2b(digest_size=16)
+    for part in (campaign, recipient, message):
+        encoded = part.encode("utf-8")
+        digest.update(len(encoded).to_bytes(8, "big"))
+        digest.update(encoded)
+    return digest.hexdigest()
+
+
+class SentLedger:
+    """Append-only record of delivered idempotency keys, optionally backed by a JSON-lines file."""
+
+    def __init__(self, path: Optional[Union[str, pathlib.Path]] = None):
+        self.path = pathlib.Path(path) if path else None
+        self._keys: Set[str] = set()
+        self._lock = threading.Lock()
+        if self.path is not None and self.path.exists():
+            with open(self.path, encoding="utf-8") as ledger_file:
+                for line in ledger_file:
+                    try:
+                        self._keys.add(json.loads(line)["key"])
+                    except (ValueError, KeyError, TypeError):
+                        continue  # A torn last line from an interrupted run
+
+    def __contains__(self, key: str) -> bool:
+        return key in self._keys
+
+    def add(self, key: str, recipient: str) -> None:
+        """Records a delivery."""
+        with self._lock:
+            if key in self._keys:
+                return
+            self._keys.add(key)
+            if self.path is not None:
+                self.path.parent.mkdir(parents=True, exist_ok=True)
+                with open(self.path, "a", encoding="utf-8") as ledger_file:
+                    ledger_file.write(json.dumps({"key": key, "recipient": recipient, "sent_at": time.time()}) + "\n")
+
+
+def default_ledger() -> SentLedger:
+    """Returns a ledger at `NEWS_TOOLS_DISPATCH_LEDGER`, or the default path under `~/.cache`."""
+    return SentLedger(os.environ.get(LEDGER_FILE_ENV) or DEFAULT_LEDGER_FILE)
+
+
+class Delivery(NamedTuple):
+    """Outcome of one recipient."""
+    recipient: str
+    key: str
+    status: str
+    attempts: int
+    latency: float
+    error: str = ""
+
+
+def _fields(recipient: Recipient) -> Dict[str, str]:
+    if isinstance(recipient, str):
+        return {"to": recipient}
+    return dict(recipient)
+
+
+def render_message(template: str, fields: Mapping[str, Any]) -> str:
+    """Replaces `{field}` placeholders that name a recipient field; other text, braces included, is kept."""
+    return _PLACEHOLDER.sub(
+        lambda match: str(fields[match.group(1)]) if match.group(1) in fields else match.group(0),
+        template,
+    )
+
+
+async def dispatch(
+    recipients: Iterable[Recipient],
+    message_template: str,
+    send: Callable[[str, str, str], Awaitable[Any]],
+    campaign: Optional[str] = None,
+    rate: float = DISPATCH_RATE_PER_SECOND,
+    burst: int = DISPATCH_BURST,
+    max_in_flight: int = DISPATCH_MAX_IN_FLIGHT,
+    attempts: int = DISPATCH_ATTEMPTS,
+    backoff: float = DISPATCH_RETRY_BACKOFF_SECONDS,
+    ledger: Optional[SentLedger] = None,
+) -> Dict[str, Any]:
+    """
+    Sends a templated message to every recipient.
+
+    Args:
+        recipients: Phone numbers, or dicts with a `to` entry plus any other
+            fields the template uses.
+        message_template: Message text with optional `{field}` placeholders for
+            recipient fields, e.g. "Hi {name}, the report is ready: {link}".
+        send: Coroutine `send(to, message, idempotency_key)`. It raises or
+            returns a result with a truthy `isError` to signal failure.
+        campaign: Namespace for the idempotency keys. Re-running the same
+            campaign skips recipients that already got the same message.
+            Defaults to a new ID, so duplicates are only skipped within this run.
+        rate: Sends per second.
+        burst: Sends allowed back to back before the rate applies.
+        max_in_flight: Sends awaiting a response at the same time.
+        attempts: Tries per recipient.
+        backoff: Delay before the first retry; it doubles on every retry.
+        ledger: Where delivered keys are recorded. Defaults to an in-memory ledger.
+
+    Returns:
+        A report with the campaign ID, counts, throughput, latency percentiles and the failures.
+    """
+    campaign = campaign or f"run-{uuid.uuid4().hex}"
+    ledger = ledger if ledger is not None else SentLedger()
+    bucket = TokenBucket(rate, burst)
+    queue: "asyncio.Queue[Recipient]" = asyncio.Queue()
+    for recipient in recipients:
+        queue.put_nowait(recipient)
+    deliveries: List[Delivery] = []
+    claimed: Set[str] = set()
+
+    async def deliver(recipient: Recipient) -> Delivery:
+        fields = _fields(recipient)
+        to = fields.get("to", "")
+        message = render_message(message_template, fields)
+        key = idempotency_key(campaign, to, message)
+        if key in ledger or key in claimed:
+            return Delivery(to, key, DUPLICATE, 0, 0.0)
+        claimed.add(key)
+
+        started = time.perf_counter()
+        delay = backoff
+        error = ""
+        for attempt in range(1, attempts + 1):
+            await bucket.acquire()
+            try:
+                result = await send(to, message, key)
+                if getattr(result, "isError", False):
+                    raise RuntimeError(str(getattr(result, "content", result))[:200])
+                ledger.add(key, to)
+                return Delivery(to, key, SENT, attempt, time.perf_counter() - started)
+            except Exception as e:
+                error = str(e)[:200]
+            if attempt < attempts:
+                await asyncio.sleep(delay * random.uniform(0.5, 1.5))
+                delay *= 2
+        return Delivery(to, key, FAILED, attempts, time.perf_counter() - started, error)
+
+    async def worker() -> None:
+        while True:
+            try:
+                recipient = queue.get_nowait()
+            except asyncio.QueueEmpty:
+                return
+            deliveries.append(await deliver(recipient))
+
+    started = time.perf_counter()
+    await asyncio.gather(*(worker() for _ in range(max(1, min(max_in_flight, queue.qsize())))))
+    elapsed = time.perf_counter() - started
+
+    sent = [d for d in deliveries if d.status == SENT]
+    failed = [d for d in deliveries if d.status == FAILED]
+    latencies = sorted(d.latency for d in sent)
+    return {
+        "status": "success" if not failed else "partial" if sent else "error",
+        "campaign": campaign,
+        "total": len(deliveries),
+        "sent": len(sent),
+        "duplicates": sum(d.status == DUPLICATE for d in deliveries),
+        "failed": len(failed),
+        "retries": sum(d.attempts - 1 for d in deliveries if d.attempts > 1),
+        "elapsed_seconds": elapsed,
+        "messages_per_second": len(sent) / elapsed if elapsed else 0.0,
+        "latency_p50": percentile(latencies, 0.50),
+        "latency_p95": percentile(latencies, 0.95),
+        "latency_max": latencies[-1] if latencies else 0.0,
+        "failures": [{"recipient": d.recipient, "error": d.error} for d in failed],
+    }
@@ -0,0 +1,193 @@
+"""
+Compiled allow/block lists for the search callbacks.
+
+A `DomainPolicy` is built once from a domain list and then answers the two
+questions the callbacks ask on every search:
+
+* `find_mention(query)`: does the query mention a listed domain (or its
+  bare name, e.g. 'reddit' for 'reddit.com')? All names are compiled into
+  a single trie-shaped regex, so one scan of the query checks every domain.
+* `covers(host)`: is a host, or one of its parent domains, listed? Hosts
+  are looked up in a trie keyed by reversed labels ('com' -> 'reddit' ->
+  'old'), so the cost depends on the number of labels, not on list size.
+
+`DomainPolicyFile` loads the list from a file (one domain per line, '#'
+comments) and rebuilds the policy when the file changes, so the lists can
+be edited without restarting the agents. Compiling a large list takes a
+while (over a second for 10k domains), so it happens on a background
+thread: the callbacks keep getting the previous policy (at first, the one
+compiled from the in-code defaults) until the new one is swapped in.
+"""
+import os
+import re
+import threading
+import time
+from typing import Dict, Iterable, List, Optional
+
+_SITE_OPERATOR = re.compile(r"site:([^\s()]+)", re.IGNORECASE)
+_END = ""
+
+
+def normalize_domain(domain: str) -> str:
+    """Lower-cases a domain and strips schemes, paths, 'www.' and trailing dots."""
+    domain = domain.strip().lower()
+    domain = re.sub(r"^[a-z]+://", "", domain).split("/", 1)[0].strip(".")
+    return domain[4:] if domain.startswith("www.") else domain
+
+
+def _trie_pattern(words: Iterable[str]) -> Optional[str]:
+    """Builds a regex matching any of the words, with shared prefixes factored out."""
+    trie: Dict[str, dict] = {}
+    for word in words:
+        node = trie
+        for char in word:
+            node = node.setdefault(char, {})
+        node[_END] = {}
+
+    def build(node: Dict[str, dict]) -> str:
+        branches = [
+            re.escape(char) + build(child) for char, child in sorted(node.items()) if char != _END
+        ]
+        if not branches:
+            return ""
+        pattern = branches[0] if len(branches) == 1 else "(?:" + "|".join(branches) + ")"
+        # A word may end here; greedy '?' still prefers the longer match
+        return f"(?:{pattern})?" if _END in node else pattern
+
+    return build(trie) or None
+
+
+class DomainPolicy:
+    """An immutable, pre-compiled domain list."""
+
+    def __init__(self, domains: Iterable[str], match_bare_names: bool = False):
+        self.domains = tuple(dict.fromkeys(
+            normalize_domain(domain) for domain in domains if normalize_domain(domain)
+        ))
+        self._trie: Dict[str, dict] = {}
+        for domain in self.domains:
+            node = self._trie
+            for label in reversed(domain.split(".")):
+                node = node.setdefault(label, {})
+            node[_END] = {}
+
+        # Every spelling that counts as a mention, mapped back to its domain
+        self._names: Dict[str, str] = {}
+        for domain in self.domains:
+            self._names.setdefault(domain, domain)
+            if match_bare_names and "." in domain:
+                self._names.setdefault(domain.rsplit(".", 1)[0], domain)
+        pattern = _trie_pattern(self._names)
+        self._mention = re.compile(pattern) if pattern else None
+
+        # Precomputed once instead of on every search
+        self.site_filter = " OR ".join(f"site:{domain}" for domain in self.domains)
+
+    def find_mention(self, text: str) -> Optional[str]:
+        """Returns the first listed domain mentioned in lower-case `text`, or None."""
+        if self._mention is None:
+            return None
+        match = self._mention.search(text)
+        return self._names[match.group(0)] if match else None
+
+    def covers(self, host: str) -> bool:
+        """Returns True if the host or any of its parent domains is listed."""
+        node = self._trie
+        for label in reversed(normalize_domain(host).split(".")):
+            node = node.get(label)
+            if node is None:
+                return False
+            if _END in node:
+                return True
+        return False
+
+    def __len__(self) -> int:
+        return len(self.domains)
+
+
+def site_domains(query: str) -> List[str]:
+    """Returns the hosts named in a query's `site:` operators."""
+    return [normalize_domain(host) for host in _SITE_OPERATOR.findall(query)]
+
+
+def load_domain_list(path: str) -> List[str]:
+    """Reads one domain per line, ignoring blank lines and '#' comments."""
+    with open(path, encoding="utf-8") as domain_file:
+        return [
+            line.split("#", 1)[0].strip()
+            for line in domain_file
+            if line.split("#", 1)[0].strip()
+        ]
+
+
+class DomainPolicyFile:
+    """A `DomainPolicy` backed by a file and rebuilt in the background when the file changes."""
+
+    def __init__(
+        self,
+        path: Optional[str],
+        defaults: Iterable[str] = (),
+        match_bare_names: bool = False,
+        check_interval: float = 5.0,
+    ):
+        self.path = path
+        self.defaults = tuple(defaults)
+        self.match_bare_names = match_bare_names
+        self.check_interval = check_interval
+        self._lock = threading.Lock()
+        self._mtime: Optional[float] = None
+        self._checked_at = time.monotonic()
+        self._policy = DomainPolicy(self.defaults, match_bare_names)
+        self._rebuild: Optional[threading.Thread] = None
+        if path:
+            self._start_rebuild()
+
+    def reload(self) -> DomainPolicy:
+        """
+        Rebuilds the policy from the file now, in the calling thread.
+
+        If the file is missing or unreadable the previous policy is kept.
+        """
+        try:
+            mtime = os.stat(self.path).st_mtime
+            domains = load_domain_list(self.path)
+        except (OSError, TypeError) as e:
+            print(f"DOMAIN POLICY: keeping previous list, could not read '{self.path}': {e}")
+            return self._policy
+        policy = DomainPolicy(domains, self.match_bare_names)
+        with self._lock:
+            self._policy = policy
+            self._mtime = mtime
+        return policy
+
+    def _start_rebuild(self) -> None:
+        """Starts a background rebuild unless one is already running."""
+        with self._lock:
+            if self._rebuild is not None and self._rebuild.is_alive():
+                return
+            self._rebuild = threading.Thread(target=self.reload, name="domain-policy-rebuild", daemon=True)
+            self._rebuild.start()
+
+    def wait_for_rebuild(self, timeout: Optional[float] = None) -> DomainPolicy:
+        """Waits for a running background rebuild, e.g. before a batch job, and returns the current policy."""
+        rebuild = self._rebuild
+        if rebuild is not None:
+            rebuild.join(timeout)
+        return self._policy
+
+    def get(self) -> DomainPolicy:
+        """
+        Returns the current policy without blocking.
+
+        If the file has changed, a rebuild starts in the background and the
+        previous policy is returned until it finishes.
+        """
+        if self.path and time.monotonic() - self._checked_at >= self.check_interval:
+            self._checked_at = time.monotonic()
+            try:
+                changed = os.stat(self.path).st_mtime != self._mtime
+            except OSError:
+                changed = False
+            if changed:
+                self._start_rebuild()
+        return self._policy
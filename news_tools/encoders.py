@@ -0,0 +1,155 @@
+"""
+Output encoders for synthesized audio.
+
+Every encoder has the `write(chunk)` / `close()` interface of `WavWriter`,
+so podcast synthesis can stream into any of them. WAV is written directly;
+FLAC and Opus are encoded by an `ffmpeg` subprocess fed from a background
+thread, so encoding overlaps with synthesis of the following turns instead
+of running after it. Encoders record how long encoding took.
+"""
+import queue
+import shutil
+import subprocess
+import threading
+import time
+from typing import Any, Dict, List, Optional
+
+from news_tools.wav import WavWriter
+
+# File extension for each supported output format.
+AUDIO_EXTENSIONS = {"wav": ".wav", "flac": ".flac", "opus": ".ogg"}
+
+_FFMPEG_CODEC_ARGS: Dict[str, List[str]] = {
+    "flac": ["-c:a", "flac", "-compression_level", "5"],
+    "opus": ["-c:a", "libopus", "-b:a", "48k", "-application", "voip"],
+}
+# Chunks queued for the encoder thread before write() blocks.
+_ENCODER_QUEUE_SIZE = 32
+_SAMPLE_FORMATS = {1: "u8", 2: "s16le", 4: "s32le"}
+
+
+class TimedWavWriter(WavWriter):
+    """`WavWriter` that records the time spent writing, for parity with the encoders."""
+
+    def __init__(self, *args: Any, **kwargs: Any):
+        self.encode_seconds = 0.0
+        super().__init__(*args, **kwargs)
+
+    def write(self, chunk: Any) -> int:
+        started = time.perf_counter()
+        try:
+            return super().write(chunk)
+        finally:
+            self.encode_seconds += time.perf_counter() - started
+
+
+class FfmpegEncoder:
+    """Streams raw PCM into an ffmpeg process that writes a compressed file."""
+
+    def __init__(
+        self,
+        filename: str,
+        output_format: str,
+        channels: int = 1,
+        rate: int = 24000,
+        sample_width: int = 2,
+    ):
+        ffmpeg = shutil.which("ffmpeg")
+        if ffmpeg is None:
+            raise RuntimeError(f"ffmpeg is required for {output_format} output but was not found on PATH")
+        self.filename = str(filename)
+        self.data_size = 0
+        self.encode_seconds = 0.0
+        self._process = subprocess.Popen(
+            [
+                ffmpeg, "-hide_banner", "-loglevel", "error", "-y",
+                "-f", _SAMPLE_FORMATS[sample_width], "-ar", str(rate), "-ac", str(channels),
+                "-i", "pipe:0",
+                *_FFMPEG_CODEC_ARGS[output_format],
+                self.filename,
+            ],
+            stdin=subprocess.PIPE,
+            stderr=subprocess.PIPE,
+        )
+        self._chunks: "queue.Queue[Optional[Any]]" = queue.Queue(maxsize=_ENCODER_QUEUE_SIZE)
+        self._error: Optional[BaseException] = None
+        self._thread = threading.Thread(target=self._feed, name="audio-encoder", daemon=True)
+        self._thread.start()
+
+    def _feed(self) -> None:
+        """Encoder thread: pipes queued chunks into ffmpeg until the sentinel arrives."""
+        while True:
+            chunk = self._chunks.get()
+            if chunk is None:
+                return
+            if self._error is not None:
+                continue
+            started = time.perf_counter()
+            try:
+                self._process.stdin.write(chunk)
+            except BaseException as e:
+                # Keep draining so write() never blocks on a full queue
+                self._error = e
+            self.encode_seconds += time.perf_counter() - started
+
+    def write(self, chunk: Any) -> int:
+        """Queues a chunk of PCM for encoding and returns its size in bytes."""
+        size = memoryview(chunk).nbytes
+        if size:
+            self._chunks.put(chunk)
+            self.data_size += size
+        return size
+
+    def close(self) -> None:
+        """Flushes the queue, waits for ffmpeg to finish and raises if it failed."""
+        if self._thread.is_alive():
+            self._chunks.put(None)
+            self._thread.join()
+        started = time.perf_counter()
+        try:
+            self._process.stdin.close()
+        except OSError:
+            pass
+        stderr = self._process.stderr.read()
+        self._process.wait()
+        self.encode_seconds += time.perf_counter() - started
+        if self._process.returncode != 0 or self._error is not None:
+            detail = stderr.decode("utf-8", "replace").strip() or str(self._error)
+            raise RuntimeError(f"Audio encoding failed: {detail[:200]}")
+
+    def __enter__(self) -> "FfmpegEncoder":
+        return self
+
+    def __exit__(self, *exc_info: Any) -> None:
+        self.close()
+
+
+def open_audio_writer(
+    filename: str,
+    output_format: str = "wav",
+    channels: int = 1,
+    rate: int = 24000,
+    sample_width: int = 2,
+    use_mmap: bool = False,
+) -> Any:
+    """
+    Opens a streaming writer for the requested output format.
+
+    Args:
+        filename: Path of the file to write.
+        output_format: One of the keys of AUDIO_EXTENSIONS.
+        channels: Number of interleaved channels in the PCM.
+        rate: Sample rate of the PCM in Hz.
+        sample_width: Bytes per sample.
+        use_mmap: Memory-map the output file (WAV only).
+
+    Returns:
+        A writer with `write(chunk)`, `close()`, `data_size` and `encode_seconds`.
+    """
+    if output_format not in AUDIO_EXTENSIONS:
+        raise ValueError(
+            f"Unsupported audio format '{output_format}'. Use one of: {', '.join(AUDIO_EXTENSIONS)}"
+        )
+    if output_format == "wav":
+        return TimedWavWriter(filename, channels, rate, sample_width, use_mmap=use_mmap)
+    return FfmpegEncoder(filename, output_format, channels, rate, sample_width)
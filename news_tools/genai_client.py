@@ -0,0 +1,78 @@
+"""
+Process-wide Gemini client shared by every tool that calls the API directly.
+
+`genai.Client()` sets up credentials and an HTTP connection pool, so
+building one per tool call pays the TLS handshake and auth setup every
+time. The client here is created lazily on first use, reused by every
+agent in the process (its HTTP pool keeps connections alive), and closed at
+interpreter exit. A semaphore caps how many requests are in flight at once
+so concurrent podcast jobs queue instead of tripping API rate limits.
+The SDK itself is imported at that point too.
+"""
+import atexit
+import threading
+from typing import Any, Optional
+
+MAX_CONCURRENT_GENAI_REQUESTS = 8
+
+
+class _LimitedModels:
+    """Forwards `models` calls to the real client while holding a request slot."""
+
+    def __init__(self, models: Any, slots: threading.BoundedSemaphore):
+        self._models = models
+        self._slots = slots
+
+    def generate_content(self, **kwargs: Any) -> Any:
+        with self._slots:
+            return self._models.generate_content(**kwargs)
+
+    def __getattr__(self, name: str) -> Any:
+        return getattr(self._models, name)
+
+
+class SharedGenaiClient:
+    """A `genai.Client` stand-in whose `models.generate_content` calls are rate capped."""
+
+    def __init__(self, client: Any, max_concurrent_requests: int = MAX_CONCURRENT_GENAI_REQUESTS):
+        self.client = client
+        self.models = _LimitedModels(
+            client.models, threading.BoundedSemaphore(max_concurrent_requests)
+        )
+
+    def close(self) -> None:
+        """Closes the underlying HTTP connections, if the SDK supports it."""
+        close = getattr(self.client, "close", None)
+        if close is not None:
+            close()
+
+    def __getattr__(self, name: str) -> Any:
+        return getattr(self.client, name)
+
+
+_shared_client: Optional[SharedGenaiClient] = None
+_shared_client_lock = threading.Lock()
+
+
+def get_genai_client() -> SharedGenaiClient:
+    """Returns the process-wide Gemini client, creating it on first use."""
+    global _shared_client
+    if _shared_client is None:
+        with _shared_client_lock:
+            if _shared_client is None:
+                from google import genai
+
+                _shared_client = SharedGenaiClient(genai.Client(), MAX_CONCURRENT_GENAI_REQUESTS)
+    return _shared_client
+
+
+def shutdown_genai_client() -> None:
+    """Closes the shared client. A later call to `get_genai_client` builds a new one."""
+    global _shared_client
+    with _shared_client_lock:
+        client, _shared_client = _shared_client, None
+    if client is not None:
+        client.close()
+
+
+atexit.register(shutdown_genai_client)
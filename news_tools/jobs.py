@@ -0,0 +1,181 @@
+"""
+Background jobs for work that should not hold up a live voice turn.
+
+`JobQueue` runs coroutines on a bounded pool of asyncio worker tasks. A
+tool submits the work, returns the job ID to the user straight away, and
+later tool calls poll or cancel the job by ID. An optional completion
+callback fires when a job finishes, fails or is cancelled.
+"""
+import asyncio
+import time
+import uuid
+from typing import Any, Awaitable, Callable, Dict, List, Optional
+
+QUEUED = "queued"
+RUNNING = "running"
+DONE = "done"
+FAILED = "failed"
+CANCELLED = "cancelled"
+
+# Finished jobs kept around for status polling.
+MAX_FINISHED_JOBS = 500
+
+
+class Job:
+    """State of one submitted job."""
+
+    def __init__(
+        self,
+        name: str,
+        work: Callable[[], Awaitable[Any]],
+        on_complete: Optional[Callable[["Job"], Any]] = None,
+    ):
+        self.id = uuid.uuid4().hex[:12]
+        self.name = name
+        self.status = QUEUED
+        self.result: Any = None
+        self.error: Optional[str] = None
+        self.created_at = time.time()
+        self.started_at: Optional[float] = None
+        self.finished_at: Optional[float] = None
+        self._work = work
+        self._on_complete = on_complete
+        self._task: Optional[asyncio.Task] = None
+
+    @property
+    def finished(self) -> bool:
+        return self.status in (DONE, FAILED, CANCELLED)
+
+    def to_dict(self) -> Dict[str, Any]:
+        """Returns a JSON-friendly snapshot, e.g. for a status tool."""
+        snapshot: Dict[str, Any] = {"job_id": self.id, "name": self.name, "status": self.status}
+        if self.started_at is not None:
+            end = self.finished_at or time.time()
+            snapshot["elapsed_seconds"] = round(end - self.started_at, 1)
+        if self.status == DONE:
+            snapshot["result"] = self.result
+        if self.error is not None:
+            snapshot["error"] = self.error
+        return snapshot
+
+
+class JobQueue:
+    """Asyncio job queue served by a bounded number of worker tasks."""
+
+    def __init__(self, max_workers: int = 2, max_queued: int = 100):
+        self.max_workers = max_workers
+        self.max_queued = max_queued
+        self._jobs: Dict[str, Job] = {}
+        self._queue: Optional[asyncio.Queue] = None
+        self._workers: List[asyncio.Task] = []
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+
+    def _ensure_workers(self) -> None:
+        """Starts the workers on the running loop (again, if the loop changed)."""
+        loop = asyncio.get_running_loop()
+        if self._loop is loop and self._workers:
+            return
+        self._loop = loop
+        self._queue = asyncio.Queue(maxsize=self.max_queued)
+        self._workers = [
+            loop.create_task(self._worker(), name=f"job-worker-{i}")
+            for i in range(self.max_workers)
+        ]
+
+    async def submit(
+        self,
+        name: str,
+        work: Callable[[], Awaitable[Any]],
+        on_complete: Optional[Callable[[Job], Any]] = None,
+    ) -> Job:
+        """
+        Queues a job and returns it immediately.
+
+        Args:
+            name: A short label for the job.
+            work: A zero-argument callable returning the coroutine to run.
+            on_complete: Called with the job once it has finished, failed or
+                been cancelled. May be a coroutine function.
+
+        Raises:
+            asyncio.QueueFull: If `max_queued` jobs are already waiting.
+        """
+        self._ensure_workers()
+        job = Job(name, work, on_complete)
+        self._queue.put_nowait(job)
+        self._jobs[job.id] = job
+        self._prune()
+        return job
+
+    def get(self, job_id: str) -> Optional[Job]:
+        """Returns the job with this ID, or None if it is unknown or was pruned."""
+        return self._jobs.get(job_id)
+
+    def cancel(self, job_id: str) -> bool:
+        """
+        Cancels a queued or running job.
+
+        Returns:
+            True if the job was cancelled, False if it is unknown or finished.
+        """
+        job = self._jobs.get(job_id)
+        if job is None or job.finished:
+            return False
+        if job._task is not None:
+            job._task.cancel()
+        else:
+            # Still queued; the worker skips it when it comes up
+            self._finish(job, CANCELLED)
+        return True
+
+    async def _worker(self) -> None:
+        while True:
+            job = await self._queue.get()
+            try:
+                if job.finished:
+                    continue
+                job.status = RUNNING
+                job.started_at = time.time()
+                job._task = asyncio.ensure_future(job._work())
+                try:
+                    result = await job._task
+                except asyncio.CancelledError:
+                    if not job._task.cancelled():
+                        # The worker itself is being cancelled
+                        raise
+                    self._finish(job, CANCELLED)
+                except Exception as e:
+                    self._finish(job, FAILED, error=str(e)[:200])
+                else:
+                    self._finish(job, DONE, result=result)
+            finally:
+                self._queue.task_done()
+
+    def _finish(self, job: Job, status: str, result: Any = None, error: Optional[str] = None) -> None:
+        job.status = status
+        job.result = result
+        job.error = error
+        job.finished_at = time.time()
+        job._task = None
+        if job._on_complete is not None:
+            try:
+                outcome = job._on_complete(job)
+                if asyncio.iscoroutine(outcome):
+                    asyncio.ensure_future(outcome)
+            except Exception as e:
+                print(f"JOB CALLBACK ERROR: {job.id}: {e}")
+
+    def _prune(self) -> None:
+        """Forgets the oldest finished jobs beyond MAX_FINISHED_JOBS."""
+        finished = [job for job in self._jobs.values() if job.finished]
+        for job in finished[: max(0, len(finished) - MAX_FINISHED_JOBS)]:
+            del self._jobs[job.id]
+
+    async def shutdown(self) -> None:
+        """Cancels running jobs and stops the workers."""
+        for job in list(self._jobs.values()):
+            self.cancel(job.id)
+        for worker in self._workers:
+            worker.cancel()
+        await asyncio.gather(*self._workers, return_exceptions=True)
+        self._workers = []
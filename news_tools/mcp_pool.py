@@ -0,0 +1,245 @@
+"""
+Shared, health-checked MCP connections.
+
+Each `MCPToolset` opens its own MCP session and calls `list_tools` every
+time the agent asks for its tools. A bulk notification run would redo the
+handshake and the manifest request for every agent instance and every
+turn. `PooledMCPToolset` is a drop-in replacement. Every toolset that
+points at the same server (same connection parameters) shares one
+`PooledSession`, which:
+
+*   keeps a single MCP session open and reuses it for every call,
+*   pings the server before reusing a session that has not been checked for
+    `MCP_HEALTH_CHECK_SECONDS`, and reconnects if the ping fails,
+*   reconnects with exponential backoff, up to `MCP_CONNECT_ATTEMPTS` tries,
+*   closes the session after `MCP_IDLE_SECONDS` without use,
+*   caches the server's tool manifest for `MCP_MANIFEST_TTL_SECONDS`.
+
+`tool_filter` is applied per toolset, on top of the shared manifest.
+"""
+import asyncio
+import time
+from typing import Any, Dict, List, Optional
+
+from google.adk.tools.base_toolset import BaseToolset
+from google.adk.tools.mcp_tool.mcp_session_manager import MCPSessionManager
+from google.adk.tools.mcp_tool.mcp_tool import MCPTool
+
+MCP_IDLE_SECONDS = 300.0
+MCP_HEALTH_CHECK_SECONDS = 30.0
+MCP_PING_TIMEOUT_SECONDS = 5.0
+MCP_MANIFEST_TTL_SECONDS = 300.0
+MCP_CONNECT_ATTEMPTS = 4
+MCP_CONNECT_BACKOFF_SECONDS = 0.5
+
+
+class PooledSession:
+    """One shared MCP session per server, usable wherever ADK expects an `MCPSessionManager`."""
+
+    def __init__(
+        self,
+        connection_params: Any,
+        idle_seconds: float = MCP_IDLE_SECONDS,
+        health_check_seconds: float = MCP_HEALTH_CHECK_SECONDS,
+        manifest_ttl: float = MCP_MANIFEST_TTL_SECONDS,
+        attempts: int = MCP_CONNECT_ATTEMPTS,
+        backoff: float = MCP_CONNECT_BACKOFF_SECONDS,
+        session_manager: Optional[Any] = None,
+    ):
+        self.connection_params = connection_params
+        self.idle_seconds = idle_seconds
+        self.health_check_seconds = health_check_seconds
+        self.manifest_ttl = manifest_ttl
+        self.attempts = attempts
+        self.backoff = backoff
+        self._manager = session_manager or MCPSessionManager(connection_params=connection_params)
+        self._session = None
+        self._lock: Optional[asyncio.Lock] = None
+        self._last_used = 0.0
+        self._last_checked = 0.0
+        self._manifest: Optional[List[Any]] = None
+        self._manifest_at = 0.0
+        self.connects = 0
+        self.failed_connects = 0
+        self.health_checks = 0
+        self.evictions = 0
+        self.manifest_requests = 0
+
+    def _get_lock(self) -> asyncio.Lock:
+        # Created on first use so it binds to the loop that serves the agent
+        if self._lock is None:
+            self._lock = asyncio.Lock()
+        return self._lock
+
+    async def create_session(self, headers: Optional[Dict[str, str]] = None):
+        """Returns the shared session, reconnecting if it is idle, unhealthy or closed."""
+        async with self._get_lock():
+            now = time.monotonic()
+            if self._session is not None and now - self._last_used > self.idle_seconds:
+                self.evictions += 1
+                await self._close_locked()
+            if self._session is not None and now - self._last_checked > self.health_check_seconds:
+                self.health_checks += 1
+                try:
+                    await asyncio.wait_for(self._session.send_ping(), MCP_PING_TIMEOUT_SECONDS)
+                    self._last_checked = now
+                except Exception as e:
+                    print(f"MCP POOL: health check failed ({str(e)[:100]}); reconnecting")
+                    await self._close_locked()
+            if self._session is None:
+                self._session = await self._connect(headers)
+                self._last_checked = time.monotonic()
+            self._last_used = time.monotonic()
+            return self._session
+
+    async def _connect(self, headers: Optional[Dict[str, str]]):
+        delay = self.backoff
+        for attempt in range(1, self.attempts + 1):
+            try:
+                if headers:
+                    session = await self._manager.create_session(headers=headers)
+                else:
+                    session = await self._manager.create_session()
+                self.connects += 1
+                # The server may have changed its tools since the last connection
+                self._manifest = None
+                return session
+            except Exception as e:
+                self.failed_connects += 1
+                if attempt == self.attempts:
+                    raise
+                print(f"MCP POOL: connect attempt {attempt} failed ({str(e)[:100]}); retrying in {delay:.1f}s")
+                await asyncio.sleep(delay)
+                delay *= 2
+
+    async def _reinitialize_session(self):
+        """Drops the current session and connects again. Used by ADK's closed-resource retry."""
+        async with self._get_lock():
+            await self._close_locked()
+            self._session = await self._connect(None)
+            self._last_checked = self._last_used = time.monotonic()
+            return self._session
+
+    async def list_tools(self) -> List[Any]:
+        """Returns the server's tool definitions, requesting them only when the cache has expired."""
+        if self._manifest is not None and time.monotonic() - self._manifest_at < self.manifest_ttl:
+            return self._manifest
+        session = await self.create_session()
+        self.manifest_requests += 1
+        result = await session.list_tools()
+        self._manifest = list(result.tools)
+        self._manifest_at = time.monotonic()
+        return self._manifest
+
+    async def evict_if_idle(self) -> bool:
+        """Closes the session if it has not been used for `idle_seconds`. Returns True if it did."""
+        async with self._get_lock():
+            if self._session is None or time.monotonic() - self._last_used <= self.idle_seconds:
+                return False
+            self.evictions += 1
+            await self._close_locked()
+            return True
+
+    async def close(self) -> None:
+        """Closes the shared session."""
+        async with self._get_lock():
+            await self._close_locked()
+
+    async def _close_locked(self) -> None:
+        self._session = None
+        try:
+            await self._manager.close()
+        except Exception as e:
+            # The MCP client may refuse to close from a task other than the one that opened it
+            print(f"MCP POOL: error while closing session: {str(e)[:200]}")
+
+    def stats(self) -> Dict[str, Any]:
+        """Returns connection and manifest counters."""
+        return {
+            "connected": self._session is not None,
+            "connects": self.connects,
+            "failed_connects": self.failed_connects,
+            "health_checks": self.health_checks,
+            "evictions": self.evictions,
+            "manifest_requests": self.manifest_requests,
+        }
+
+
+_pool: Dict[str, PooledSession] = {}
+
+
+def _pool_key(connection_params: Any) -> str:
+    if hasattr(connection_params, "model_dump_json"):
+        return f"{type(connection_params).__name__}:{connection_params.model_dump_json()}"
+    return repr(connection_params)
+
+
+def get_pooled_session(connection_params: Any) -> PooledSession:
+    """Returns the shared session for a server, creating it on first use."""
+    key = _pool_key(connection_params)
+    pooled = _pool.get(key)
+    if pooled is None:
+        pooled = _pool[key] = PooledSession(connection_params)
+    return pooled
+
+
+async def evict_idle_sessions() -> int:
+    """Closes every pooled session that has been idle too long. Returns how many were closed."""
+    closed = 0
+    for pooled in list(_pool.values()):
+        if await pooled.evict_if_idle():
+            closed += 1
+    return closed
+
+
+async def close_pool() -> None:
+    """Closes every pooled session, e.g. when the process shuts down."""
+    for pooled in list(_pool.values()):
+        await pooled.close()
+
+
+def pool_stats() -> Dict[str, Dict[str, Any]]:
+    """Returns the counters of every pooled session, by server."""
+    return {key: pooled.stats() for key, pooled in _pool.items()}
+
+
+class PooledMCPToolset(BaseToolset):
+    """`MCPToolset` replacement that shares one connection and tool manifest per server."""
+
+    def __init__(
+        self,
+        *,
+        connection_params: Any,
+        tool_filter: Optional[Any] = None,
+        auth_scheme: Optional[Any] = None,
+        auth_credential: Optional[Any] = None,
+    ):
+        super().__init__(tool_filter=tool_filter)
+        self._pooled = get_pooled_session(connection_params)
+        self._auth_scheme = auth_scheme
+        self._auth_credential = auth_credential
+        self._tools_manifest: Optional[List[Any]] = None
+        self._tools: List[MCPTool] = []
+
+    async def get_tools(self, readonly_context=None) -> List[MCPTool]:
+        """Returns the filtered tools, wrapping the manifest only when it changes."""
+        manifest = await self._pooled.list_tools()
+        # A predicate filter may depend on the context, so only name lists are cached
+        if manifest is self._tools_manifest and not callable(self.tool_filter):
+            return self._tools
+        tools = []
+        for definition in manifest:
+            tool = MCPTool(
+                mcp_tool=definition,
+                mcp_session_manager=self._pooled,
+                auth_scheme=self._auth_scheme,
+                auth_credential=self._auth_credential,
+            )
+            if self._is_tool_selected(tool, readonly_context):
+                tools.append(tool)
+        self._tools_manifest, self._tools = manifest, tools
+        return tools
+
+    async def close(self) -> None:
+        """Leaves the shared session open for the other toolsets; idle eviction closes it."""
+        await evict_idle_sessions()
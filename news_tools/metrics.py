@@ -0,0 +1,338 @@
+"""
+Per-tool latency, payload and cache metrics collected by tool callbacks.
+
+`ToolMetrics` is a pair of ADK tool callbacks. `before_tool` goes first in
+`before_tool_callback`, so it also sees calls that a cache later answers.
+`after_tool` goes first in `after_tool_callback`, before any callback that
+replaces the response and stops the chain. Each call records:
+
+*   wall time, from the first before-callback to the first after-callback,
+    which includes any single-flight wait;
+*   the size in bytes of the tool's own response, before later callbacks
+    decorate it. The model reads this back on its next turn, so it is the
+    closest proxy for tool-driven token usage a tool callback can see;
+*   whether the response reports an error;
+*   the cache status: `coalesced` (shared an in-flight call, as reported
+    by the single-flight layer through `note_cache_status`) or `miss` (the
+    tool actually ran).
+
+Calls are tracked by `tool_context.function_call_id`, which is unique per
+call, so a call whose tool raised cannot leak its timing or cache status
+into a later one. Calls without an ID are not measured.
+
+Latency goes into cumulative histogram buckets for Prometheus, and into a
+bounded window of recent samples for p50/p95/p99. `prometheus_text()`
+renders the Prometheus text exposition format. Setting
+`NEWS_TOOLS_METRICS_PORT` serves it at `/metrics` from a background thread.
+With `otel=True` (or
+`NEWS_TOOLS_OTEL=1`), each call is also emitted as an OpenTelemetry span,
+if the `opentelemetry-api` package is installed.
+
+ADK does not run after-tool callbacks when a tool raises. Calls still open
+after `ABANDONED_CALL_SECONDS` are therefore counted as errors.
+
+`google_search` runs on the model side, so ADK never calls tool callbacks
+for it. Searches are only measured where Python sees them: `SearchCache`
+records every search worker run of the pipelines under `google_search`
+with `record`, as `hit` when the cache answered it. Searches a live agent
+runs itself, in the same turn as its other tools, are not measured.
+"""
+from collections import OrderedDict, deque
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+import json
+import os
+import threading
+import time
+from typing import Any, Deque, Dict, List, Optional, Tuple
+
+CACHE_HIT = "hit"
+CACHE_COALESCED = "coalesced"
+CACHE_MISS = "miss"
+
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0, 120.0)
+LATENCY_WINDOW = 2048
+ABANDONED_CALL_SECONDS = 900.0
+QUANTILES = (0.5, 0.95, 0.99)
+
+# function call ID -> cache status, written by cache layers during the before-tool chain
+_cache_notes: "OrderedDict[str, str]" = OrderedDict()
+_MAX_CACHE_NOTES = 4096
+_notes_lock = threading.Lock()
+
+
+def _call_id(tool_context: Any) -> Optional[str]:
+    return getattr(tool_context, "function_call_id", None)
+
+
+def note_cache_status(tool_context: Any, status: str) -> None:
+    """Tells the metrics callbacks how the call behind this tool context was answered."""
+    call_id = _call_id(tool_context)
+    if call_id is None:
+        return
+    with _notes_lock:
+        _cache_notes[call_id] = status
+        while len(_cache_notes) > _MAX_CACHE_NOTES:
+            _cache_notes.popitem(last=False)
+
+
+def _pop_cache_status(call_id: str) -> str:
+    with _notes_lock:
+        return _cache_notes.pop(call_id, CACHE_MISS)
+
+
+def payload_bytes(response: Any) -> int:
+    """Returns the size of a tool response serialized as JSON (strings and bytes as they are)."""
+    if isinstance(response, (bytes, bytearray)):
+        return len(response)
+    if not isinstance(response, str):
+        try:
+            response = json.dumps(response, default=str, ensure_ascii=False)
+        except (TypeError, ValueError):
+            response = str(response)
+    return len(response.encode("utf-8"))
+
+
+def is_error_response(response: Any) -> bool:
+    """True for the error shapes the tools and callbacks return."""
+    if isinstance(response, dict):
+        return response.get("status") == "error" or "error" in response
+    return bool(getattr(response, "isError", False))
+
+
+def percentile(sorted_values: List[float], fraction: float) -> float:
+    """Nearest-rank percentile of an ascending list; 0.0 when it is empty."""
+    if not sorted_values:
+        return 0.0
+    index = min(len(sorted_values) - 1, int(round(fraction * (len(sorted_values) - 1))))
+    return sorted_values[index]
+
+
+def _label(value: str) -> str:
+    return value.replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+class _ToolStats:
+    """Aggregates for one tool."""
+
+    def __init__(self):
+        self.bucket_counts = [0] * len(LATENCY_BUCKETS)
+        self.count = 0
+        self.latency_sum = 0.0
+        self.errors = 0
+        self.payload_sum = 0
+        self.cache: Dict[str, int] = {}
+        self.recent: Deque[float] = deque(maxlen=LATENCY_WINDOW)
+
+    def record(self, seconds: float, size: int, error: bool, cache_status: str) -> None:
+        self.count += 1
+        self.latency_sum += seconds
+        self.payload_sum += size
+        self.errors += error
+        self.cache[cache_status] = self.cache.get(cache_status, 0) + 1
+        self.recent.append(seconds)
+        for index, bound in enumerate(LATENCY_BUCKETS):
+            if seconds <= bound:
+                self.bucket_counts[index] += 1
+                break
+
+    def quantiles(self) -> Dict[float, float]:
+        ordered = sorted(self.recent)
+        return {q: percentile(ordered, q) for q in QUANTILES}
+
+
+class ToolMetrics:
+    """Collects per-tool call metrics, exposed as ADK tool callbacks."""
+
+    def __init__(self, otel: Optional[bool] = None, service_name: str = "news_tools"):
+        self._stats: Dict[str, _ToolStats] = {}
+        # function call ID -> (tool name, perf_counter start, wall clock start in ns)
+        self._open: Dict[str, Tuple[str, float, int]] = {}
+        self._lock = threading.Lock()
+        self._otel = os.environ.get("NEWS_TOOLS_OTEL") == "1" if otel is None else otel
+        self._tracer = None
+        self._service_name = service_name
+
+    def before_tool(self, tool, args, tool_context) -> None:
+        """Callback: Starts timing a tool call. Never short-circuits it."""
+        call_id = _call_id(tool_context)
+        if call_id is None:
+            return None
+        with self._lock:
+            self._open[call_id] = (tool.name, time.perf_counter(), time.time_ns())
+            if len(self._open) > 1024:
+                self._sweep_abandoned()
+        return None
+
+    def after_tool(self, tool, args, tool_context, tool_response) -> None:
+        """Callback: Records the finished call. Never changes the response."""
+        ended = time.perf_counter()
+        call_id = _call_id(tool_context)
+        with self._lock:
+            started = self._open.pop(call_id, None) if call_id is not None else None
+        if started is None:
+            return None
+        name, perf_start, wall_start_ns = started
+        self.record(
+            name,
+            ended - perf_start,
+            payload_bytes(tool_response),
+            is_error_response(tool_response),
+            _pop_cache_status(call_id),
+            wall_start_ns,
+        )
+        return None
+
+    def record(
+        self,
+        name: str,
+        seconds: float,
+        size: int,
+        error: bool,
+        cache_status: str = CACHE_MISS,
+        wall_start_ns: Optional[int] = None,
+    ) -> None:
+        """Records one finished call measured outside the tool callbacks, e.g. a search worker run."""
+        if wall_start_ns is None:
+            wall_start_ns = time.time_ns() - int(seconds * 1e9)
+        with self._lock:
+            self._stats.setdefault(name, _ToolStats()).record(seconds, size, error, cache_status)
+        if self._otel:
+            self._emit_span(name, wall_start_ns, seconds, size, error, cache_status)
+
+    def _sweep_abandoned(self) -> None:
+        # Caller holds the lock
+        now = time.perf_counter()
+        for key, (name, perf_start, _) in list(self._open.items()):
+            if now - perf_start > ABANDONED_CALL_SECONDS:
+                del self._open[key]
+                self._stats.setdefault(name, _ToolStats()).record(now - perf_start, 0, True, CACHE_MISS)
+
+    def _emit_span(self, name: str, start_ns: int, seconds: float, size: int, error: bool, cache_status: str) -> None:
+        if self._tracer is None:
+            try:
+                from opentelemetry import trace
+            except ImportError:
+                print("TOOL METRICS: opentelemetry-api is not installed; span export disabled")
+                self._otel = False
+                return
+            self._tracer = trace.get_tracer(self._service_name)
+        span = self._tracer.start_span(
+            f"tool {name}",
+            start_time=start_ns,
+            attributes={
+                "tool.name": name,
+                "tool.payload_bytes": size,
+                "tool.error": error,
+                "tool.cache_status": cache_status,
+            },
+        )
+        span.end(end_time=start_ns + int(seconds * 1e9))
+
+    def snapshot(self) -> Dict[str, Dict[str, Any]]:
+        """Returns per-tool aggregates: calls, error rate, payload size, cache statuses and latency percentiles."""
+        with self._lock:
+            self._sweep_abandoned()
+            result = {}
+            for name, stats in sorted(self._stats.items()):
+                quantiles = stats.quantiles()
+                result[name] = {
+                    "calls": stats.count,
+                    "errors": stats.errors,
+                    "error_rate": stats.errors / stats.count if stats.count else 0.0,
+                    "mean_payload_bytes": stats.payload_sum / stats.count if stats.count else 0.0,
+                    "cache": dict(stats.cache),
+                    "latency_p50": quantiles[0.5],
+                    "latency_p95": quantiles[0.95],
+                    "latency_p99": quantiles[0.99],
+                    "latency_mean": stats.latency_sum / stats.count if stats.count else 0.0,
+                }
+            return result
+
+    def prometheus_text(self) -> str:
+        """Renders every metric in the Prometheus text exposition format."""
+        lines = [
+            "# HELP tool_call_duration_seconds Wall time of agent tool calls.",
+            "# TYPE tool_call_duration_seconds histogram",
+        ]
+        with self._lock:
+            self._sweep_abandoned()
+            stats_items = sorted(self._stats.items())
+            for name, stats in stats_items:
+                label = f'tool="{_label(name)}"'
+                cumulative = 0
+                for bound, count in zip(LATENCY_BUCKETS, stats.bucket_counts):
+                    cumulative += count
+                    lines.append(f'tool_call_duration_seconds_bucket{{{label},le="{bound}"}} {cumulative}')
+                lines.append(f'tool_call_duration_seconds_bucket{{{label},le="+Inf"}} {stats.count}')
+                lines.append(f"tool_call_duration_seconds_sum{{{label}}} {stats.latency_sum}")
+                lines.append(f"tool_call_duration_seconds_count{{{label}}} {stats.count}")
+
+            lines += [
+                "# HELP tool_call_latency_seconds Recent tool call wall time quantiles.",
+                "# TYPE tool_call_latency_seconds summary",
+            ]
+            for name, stats in stats_items:
+                label = f'tool="{_label(name)}"'
+                for quantile, value in stats.quantiles().items():
+                    lines.append(f'tool_call_latency_seconds{{{label},quantile="{quantile}"}} {value}')
+                lines.append(f"tool_call_latency_seconds_sum{{{label}}} {stats.latency_sum}")
+                lines.append(f"tool_call_latency_seconds_count{{{label}}} {stats.count}")
+
+            lines += [
+                "# HELP tool_calls_total Tool calls by cache status.",
+                "# TYPE tool_calls_total counter",
+            ]
+            for name, stats in stats_items:
+                for cache_status, count in sorted(stats.cache.items()):
+                    lines.append(f'tool_calls_total{{tool="{_label(name)}",cache="{cache_status}"}} {count}')
+
+            lines += [
+                "# HELP tool_errors_total Tool calls that returned or raised an error.",
+                "# TYPE tool_errors_total counter",
+            ]
+            lines += [f'tool_errors_total{{tool="{_label(name)}"}} {stats.errors}' for name, stats in stats_items]
+
+            lines += [
+                "# HELP tool_response_bytes_total Bytes of tool responses returned to the model.",
+                "# TYPE tool_response_bytes_total counter",
+            ]
+            lines += [f'tool_response_bytes_total{{tool="{_label(name)}"}} {stats.payload_sum}' for name, stats in stats_items]
+        return "\n".join(lines) + "\n"
+
+    def reset(self) -> None:
+        """Drops every aggregate and open call."""
+        with self._lock:
+            self._stats.clear()
+            self._open.clear()
+
+
+def serve_prometheus(metrics: ToolMetrics, port: int, host: str = "0.0.0.0") -> ThreadingHTTPServer:
+    """Serves `metrics.prometheus_text()` at `/metrics` from a daemon thread."""
+
+    class _MetricsHandler(BaseHTTPRequestHandler):
+        def do_GET(self):
+            if self.path.split("?")[0] != "/metrics":
+                self.send_error(404)
+                return
+            body = metrics.prometheus_text().encode("utf-8")
+            self.send_response(200)
+            self.send_header("Content-Type", "text/plain; version=0.0.4; charset=utf-8")
+            self.send_header("Content-Length", str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+
+        def log_message(self, format, *args):
+            pass  # Scrapes every few seconds would flood the agent's console
+
+    server = ThreadingHTTPServer((host, port), _MetricsHandler)
+    threading.Thread(target=server.serve_forever, name="tool-metrics", daemon=True).start()
+    return server
+
+
+tool_metrics = ToolMetrics()
+
+if os.environ.get("NEWS_TOOLS_METRICS_PORT"):
+    try:
+        serve_prometheus(tool_metrics, int(os.environ["NEWS_TOOLS_METRICS_PORT"]))
+    except (OSError, ValueError) as e:
+        print(f"TOOL METRICS: could not serve /metrics: {e}")
@@ -0,0 +1,138 @@
+"""
+Atomic, non-blocking report persistence.
+
+Reports are written to a temporary file in the target directory and moved
+into place with `os.replace`, so readers never see a torn file. The write
+runs in a worker thread so the event loop keeps serving live sessions.
+
+When the session is known, each report goes to
+`<base_dir>/reports/<session_id>/<name>.md` (the same layout the report
+renderer uses), so concurrent sessions cannot overwrite each other. A
+re-save replaces the file in place; re-saving identical content skips the
+write. Saves of the same file by the same session that arrive within the
+coalescing window are merged: only the newest content is written and every
+caller gets the same result.
+"""
+import asyncio
+import os
+import pathlib
+import re
+import tempfile
+from typing import Any, Dict, Optional, Tuple, Union
+
+FSYNC_ALWAYS = "always"
+FSYNC_NEVER = "never"
+
+_UNSAFE_PATH_CHARS = re.compile(r"[^A-Za-z0-9._-]")
+
+
+def atomic_write_text(path: pathlib.Path, content: str, fsync: str = FSYNC_ALWAYS) -> None:
+    """Writes text to a temporary file next to `path` and renames it into place."""
+    path.parent.mkdir(parents=True, exist_ok=True)
+    fd, tmp_name = tempfile.mkstemp(dir=path.parent, prefix=f".{path.name}.", suffix=".tmp")
+    try:
+        with os.fdopen(fd, "w", encoding="utf-8") as tmp_file:
+            tmp_file.write(content)
+            if fsync == FSYNC_ALWAYS:
+                tmp_file.flush()
+                os.fsync(tmp_file.fileno())
+        os.replace(tmp_name, path)
+    except BaseException:
+        try:
+            os.unlink(tmp_name)
+        except OSError:
+            pass
+        raise
+    if fsync == FSYNC_ALWAYS and hasattr(os, "O_DIRECTORY"):
+        # Persist the rename itself
+        dir_fd = os.open(path.parent, os.O_DIRECTORY)
+        try:
+            os.fsync(dir_fd)
+        finally:
+            os.close(dir_fd)
+
+
+class ReportWriter:
+    """Writes Markdown reports atomically off the event loop."""
+
+    def __init__(
+        self,
+        base_dir: Optional[Union[str, pathlib.Path]] = None,
+        fsync: str = FSYNC_ALWAYS,
+        coalesce_seconds: float = 0.0,
+    ):
+        if fsync not in (FSYNC_ALWAYS, FSYNC_NEVER):
+            raise ValueError(f"Unknown fsync policy: {fsync}")
+        self.base_dir = pathlib.Path(base_dir) if base_dir is not None else None
+        self.fsync = fsync
+        self.coalesce_seconds = coalesce_seconds
+        self._pending: Dict[Tuple[Optional[str], str], Tuple[str, "asyncio.Future[Dict[str, str]]"]] = {}
+
+    def session_path(self, filename: str, session_id: Optional[str] = None, suffix: str = ".md") -> pathlib.Path:
+        """Returns the un-hashed location of a session's file, e.g. for reports updated in place."""
+        base_dir = self.base_dir or pathlib.Path.cwd()
+        name = pathlib.Path(filename).name
+        if not name.endswith(suffix):
+            name += suffix
+        if session_id is None:
+            return base_dir / name
+        return base_dir / "reports" / _UNSAFE_PATH_CHARS.sub("_", session_id) / name
+
+    def _write_if_changed(self, path: pathlib.Path, content: str) -> None:
+        """Writes the file unless it already holds this content."""
+        try:
+            if path.read_text(encoding="utf-8") == content:
+                return
+        except (OSError, UnicodeDecodeError):
+            pass
+        atomic_write_text(path, content, self.fsync)
+
+    async def save(self, filename: str, content: str, session_id: Optional[str] = None) -> Dict[str, str]:
+        """
+        Saves a report and returns the tool-style status dictionary.
+
+        Args:
+            filename: The requested file name (e.g. 'ai_research_report.md').
+            content: The Markdown content.
+            session_id: The ADK session the report belongs to, if known.
+        """
+        if self.coalesce_seconds <= 0:
+            return await self._write(filename, content, session_id)
+
+        key = (session_id, filename)
+        pending = self._pending.get(key)
+        if pending is not None:
+            # Newer content replaces the queued write; everyone shares its result
+            self._pending[key] = (content, pending[1])
+            return await asyncio.shield(pending[1])
+        loop = asyncio.get_running_loop()
+        future: "asyncio.Future[Dict[str, str]]" = loop.create_future()
+        self._pending[key] = (content, future)
+        loop.call_later(self.coalesce_seconds, lambda: asyncio.ensure_future(self._flush(key)))
+        return await asyncio.shield(future)
+
+    async def _flush(self, key: Tuple[Optional[str], str]) -> None:
+        content, future = self._pending.pop(key)
+        session_id, filename = key
+        future.set_result(await self._write(filename, content, session_id))
+
+    async def _write(self, filename: str, content: str, session_id: Optional[str]) -> Dict[str, str]:
+        try:
+            path = self.session_path(filename, session_id)
+            await asyncio.to_thread(self._write_if_changed, path, content)
+        except Exception as e:
+            return {"status": "error", "message": f"Failed to save file: {str(e)}"}
+        return {
+            "status": "success",
+            "message": f"Successfully saved news to {path.resolve()}",
+            "file_path": str(path.resolve()),
+        }
+
+
+def session_id_of(tool_context: Any) -> Optional[str]:
+    """Returns the ADK session ID behind a tool context, or None outside a session."""
+    session = getattr(tool_context, "session", None)
+    return getattr(session, "id", None)
+
+
+report_writer = ReportWriter()
@@ -0,0 +1,141 @@
+"""
+Deterministic research pipeline.
+
+The prompt-driven agents have the model drive search -> tickers ->
+financials -> format -> save, and write the whole report as the argument
+of the save call. Here only the search step uses the model (Google Search
+is a model-side tool, and the same call extracts the tickers and writes
+the summaries). Quotes and sentiment are then fetched in parallel in
+Python, and the report is rendered and saved in Python, so the model
+writes far fewer output tokens. It is not fewer model calls: the agent
+calling the pipeline still takes its own turns around it (see
+`benchmarks/pipeline.py`).
+"""
+import asyncio
+import json
+import re
+import time
+from typing import Any, Awaitable, Callable, Dict, List
+
+from news_tools.quotes import fetch_quotes_async
+from news_tools.sentiment import analyze_headlines
+
+SEARCH_INSTRUCTION = """
+    You are a news search worker. Use the `google_search` tool to find the requested number of recent news
+    articles about AI at US-listed companies. Then respond with ONLY a JSON array, one object per article,
+    with these keys:
+        "headline": the article headline,
+        "company": the company the story is about,
+        "ticker": its stock ticker, or "N/A" if it is private or not found,
+        "summary": a brief, 1-2 sentence summary of the news,
+        "source_domain": the source domain, e.g. "techcrunch.com".
+    Do not add any text before or after the JSON array.
+    """
+
+_JSON_ARRAY = re.compile(r"\[.*\]", re.DOTALL)
+_NO_TICKER = {"", "N/A", "NA"}
+
+
+def parse_stories(text: str) -> List[Dict[str, str]]:
+    """
+    Extracts the story list from the search worker's reply.
+
+    Raises:
+        ValueError: If the reply does not contain a JSON array of objects.
+    """
+    match = _JSON_ARRAY.search(text)
+    if match is None:
+        raise ValueError("Search reply did not contain a JSON array")
+    stories = json.loads(match.group(0))
+    if not isinstance(stories, list) or not all(isinstance(story, dict) for story in stories):
+        raise ValueError("Search reply was not a JSON array of objects")
+    return [{key: str(value) for key, value in story.items()} for story in stories]
+
+
+def render_report(
+    stories: List[Dict[str, str]],
+    quotes: Dict[str, str],
+    sentiments: Dict[str, Dict[str, Any]],
+    process_log: List[str],
+) -> str:
+    """Renders the stories as the Markdown report the agents save."""
+    lines = ["# AI Industry News Report", "", "## Top Headlines", ""]
+    for number, story in enumerate(stories, start=1):
+        headline = story.get("headline", "Untitled")
+        ticker = story.get("ticker", "N/A").strip().upper()
+        market_data = quotes.get(ticker, "Not Available")
+        sentiment = sentiments.get(headline, {}).get("sentiment", "Not Available")
+        lines += [
+            f"### {number}. {headline}",
+            f"*   **Company:** {story.get('company', 'N/A')} ({ticker or 'N/A'})",
+            f"*   **Market Data:** {market_data}",
+            f"*   **Sentiment:** {sentiment}",
+            f"*   **Summary:** {story.get('summary', '')}",
+            "",
+        ]
+    if process_log:
+        lines += ["## Data Sourcing Notes", ""]
+        lines += [f"*   {entry}" for entry in process_log]
+        lines.append("")
+    return "\n".join(lines)
+
+
+async def run_news_pipeline(
+    request: str,
+    search: Callable[[str], Awaitable[Any]],
+    save: Callable[[str, str], Awaitable[Dict[str, str]]],
+    filename: str = "ai_research_report.md",
+) -> Dict[str, Any]:
+    """
+    Runs the fixed research steps directly.
+
+    Args:
+        request: The search request passed to the search worker.
+        search: Coroutine function running the search worker; returns an
+            `AgentReply` (text, model_calls, sources).
+        save: Coroutine function persisting the report, called as
+            `save(filename, content)`.
+        filename: Name of the report file.
+
+    Returns:
+        The save result, extended with the stories, the rendered Markdown,
+        the number of model calls and per-step timings.
+    """
+    timings: Dict[str, float] = {}
+    started = time.perf_counter()
+
+    reply = await search(request)
+    stories = parse_stories(reply.text)
+    timings["search"] = time.perf_counter() - started
+
+    step = time.perf_counter()
+    tickers = [
+        story.get("ticker", "").strip().upper()
+        for story in stories
+        if story.get("ticker", "").strip().upper() not in _NO_TICKER
+    ]
+    headlines = [story.get("headline", "") for story in stories]
+    # Independent lookups run side by side
+    quotes, sentiments = await asyncio.gather(
+        fetch_quotes_async(tickers),
+        asyncio.to_thread(analyze_headlines, headlines),
+    )
+    timings["enrich"] = time.perf_counter() - step
+
+    step = time.perf_counter()
+    # No tool callback sees a model-side search, so the notes come from the reply's grounding
+    notes = []
+    if reply.sources:
+        notes.append(f"Action: Sourced news from the following domains: {', '.join(reply.sources)}.")
+    markdown = render_report(stories, quotes, sentiments, notes)
+    result = dict(await save(filename, markdown))
+    timings["render_and_save"] = time.perf_counter() - step
+    timings["total"] = time.perf_counter() - started
+
+    result.update({
+        "stories": stories,
+        "markdown": markdown,
+        "model_calls": reply.model_calls,
+        "timings": {name: round(seconds, 3) for name, seconds in timings.items()},
+    })
+    return result
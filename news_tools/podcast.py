@@ -0,0 +1,303 @@
+"""
+Podcast synthesis with the Gemini TTS model.
+
+`generate_podcast` either sends the whole script in one request, or, in
+streaming mode, splits it into speaker turns and synthesizes them as a
+pipeline: the next turn is requested while the current one is written, and
+every turn is appended to the WAV file as soon as it arrives. Playback or
+upload can then start after the first turn instead of after the whole
+episode. With `max_concurrency` above one, several turns are synthesized
+at once (each retried on failure) and reassembled in script order, so the
+wall-clock time approaches that of the longest turn.
+
+When an `AudioCache` is given, segments that were synthesized before with
+the same text, speaker, voice and prompt are read back from disk instead.
+
+The client defaults to the process-wide shared client, and any object
+exposing `models.generate_content(model=..., contents=..., config=...)` can
+stand in for it (e.g. a local fake in tests). The `google.genai` types are
+only imported when a config is built.
+"""
+from collections import deque
+from concurrent.futures import Future, ThreadPoolExecutor
+import os
+import re
+import time
+from typing import TYPE_CHECKING, Any, Callable, Deque, Dict, Iterator, List, NamedTuple, Optional
+
+from news_tools.audio_cache import AudioCache, audio_key
+from news_tools.genai_client import get_genai_client
+from news_tools.encoders import open_audio_writer
+
+if TYPE_CHECKING:
+    from google.genai import types
+
+TTS_MODEL = "gemini-2.5-flash-preview-tts"
+SPEAKER_VOICES = {"Joe": "Kore", "Jane": "Puck"}
+
+# Raw PCM format returned by the TTS model.
+CHANNELS = 1
+SAMPLE_RATE = 24000
+SAMPLE_WIDTH = 2
+
+# Attempts per turn before the whole synthesis fails, and the base backoff.
+TTS_ATTEMPTS = 3
+TTS_RETRY_BACKOFF_SECONDS = 1.0
+
+
+class Turn(NamedTuple):
+    """One speaker turn of a podcast script."""
+    speaker: str
+    text: str
+
+
+def split_turns(script: str, speakers: Optional[List[str]] = None) -> List[Turn]:
+    """
+    Splits a podcast script into speaker turns.
+
+    A turn starts at a line beginning with a speaker name followed by a colon
+    (Markdown bold around the name is allowed, e.g. '**Joe:**'). Lines that
+    do not start a new turn are appended to the current one.
+
+    Args:
+        script: The conversational script.
+        speakers: The speaker names to split on. Defaults to the keys of
+            SPEAKER_VOICES.
+
+    Returns:
+        The turns in script order. Text before the first speaker label is
+        attributed to the first speaker.
+    """
+    speakers = speakers or list(SPEAKER_VOICES)
+    names = "|".join(re.escape(speaker) for speaker in speakers)
+    turn_start = re.compile(rf"^\s*[*_]*({names})[*_]*\s*:[*_]*\s*(.*)$")
+
+    turns: List[Turn] = []
+    speaker = speakers[0]
+    lines: List[str] = []
+
+    def _flush() -> None:
+        text = " ".join(line.strip() for line in lines if line.strip())
+        if text:
+            turns.append(Turn(speaker, text))
+
+    for line in script.splitlines():
+        match = turn_start.match(line)
+        if match:
+            _flush()
+            speaker, lines = match.group(1), [match.group(2)]
+        else:
+            lines.append(line)
+    _flush()
+    return turns
+
+
+def speech_config(voices: Optional[Dict[str, str]] = None) -> "types.GenerateContentConfig":
+    """Builds the multi-speaker TTS config mapping each speaker to a prebuilt voice."""
+    from google.genai import types
+
+    voices = voices or SPEAKER_VOICES
+    return types.GenerateContentConfig(
+        response_modalities=["AUDIO"],
+        speech_config=types.SpeechConfig(
+            multi_speaker_voice_config=types.MultiSpeakerVoiceConfig(
+                speaker_voice_configs=[
+                    types.SpeakerVoiceConfig(
+                        speaker=speaker,
+                        voice_config=types.VoiceConfig(
+                            prebuilt_voice_config=types.PrebuiltVoiceConfig(voice_name=voice_name)
+                        ),
+                    )
+                    for speaker, voice_name in voices.items()
+                ]
+            )
+        ),
+    )
+
+
+def synthesize(client: Any, contents: str, config: "types.GenerateContentConfig") -> bytes:
+    """Runs one TTS request and returns the raw PCM bytes."""
+    response = client.models.generate_content(
+        model=TTS_MODEL,
+        contents=contents,
+        config=config,
+    )
+    return response.candidates[0].content.parts[0].inline_data.data
+
+
+def cached_synthesize(
+    client: Any,
+    contents: str,
+    config: "types.GenerateContentConfig",
+    cache_key: str,
+    cache: Optional[AudioCache],
+    attempts: int = TTS_ATTEMPTS,
+) -> Any:
+    """Serves a segment from the audio cache, synthesizing and storing it on a miss."""
+    if cache is not None:
+        cached = cache.get(cache_key)
+        if cached is not None:
+            return cached
+    pcm = synthesize_with_retry(client, contents, config, attempts)
+    if cache is not None:
+        cache.put(cache_key, pcm)
+    return pcm
+
+
+def synthesize_with_retry(
+    client: Any,
+    contents: str,
+    config: "types.GenerateContentConfig",
+    attempts: int = TTS_ATTEMPTS,
+) -> bytes:
+    """Runs one TTS request, retrying with exponential backoff on failure."""
+    for attempt in range(attempts):
+        try:
+            return synthesize(client, contents, config)
+        except Exception:
+            if attempt == attempts - 1:
+                raise
+            time.sleep(TTS_RETRY_BACKOFF_SECONDS * 2 ** attempt)
+    raise ValueError("attempts must be at least 1")
+
+
+def silence(milliseconds: int) -> bytes:
+    """Returns PCM silence of the given length in the TTS output format."""
+    frames = SAMPLE_RATE * milliseconds // 1000
+    return bytes(frames * CHANNELS * SAMPLE_WIDTH)
+
+
+def stream_turns(
+    client: Any,
+    turns: List[Turn],
+    prompt_prefix: str,
+    config: "types.GenerateContentConfig",
+    max_concurrency: int = 1,
+    attempts: int = TTS_ATTEMPTS,
+    voices: Optional[Dict[str, str]] = None,
+    cache: Optional[AudioCache] = None,
+) -> Iterator[bytes]:
+    """
+    Yields the PCM for each turn in script order.
+
+    Up to `max_concurrency` turns are in flight at any time, including while
+    the caller consumes the current one, so one worker gives a simple
+    synthesize-while-writing pipeline and more workers overlap the requests.
+    Cached turns are yielded as read-only memory maps.
+    """
+    voices = voices or SPEAKER_VOICES
+
+    def _synthesize_turn(turn: Turn) -> bytes:
+        contents = f"{prompt_prefix}\n\n{turn.speaker}: {turn.text}"
+        key = audio_key(turn.text, turn.speaker, voices.get(turn.speaker, ""), prompt_prefix)
+        return cached_synthesize(client, contents, config, key, cache, attempts)
+
+    remaining = iter(turns)
+    pending: Deque[Future] = deque()
+    with ThreadPoolExecutor(max_workers=max_concurrency, thread_name_prefix="tts") as pool:
+        try:
+            for turn in remaining:
+                pending.append(pool.submit(_synthesize_turn, turn))
+                if len(pending) >= max_concurrency:
+                    break
+            while pending:
+                pcm = pending.popleft().result()
+                # Keep the window full before handing the chunk to the caller
+                for turn in remaining:
+                    pending.append(pool.submit(_synthesize_turn, turn))
+                    break
+                yield pcm
+        finally:
+            for future in pending:
+                future.cancel()
+
+
+def generate_podcast(
+    podcast_script: str,
+    file_path: str,
+    prompt_prefix: str,
+    client: Any = None,
+    stream: bool = False,
+    max_concurrency: int = 1,
+    silence_ms: int = 0,
+    cache: Optional[AudioCache] = None,
+    use_mmap: bool = False,
+    output_format: str = "wav",
+    on_chunk: Optional[Callable[[bytes], None]] = None,
+) -> Dict[str, Any]:
+    """
+    Synthesizes a podcast script and writes it to an audio file.
+
+    Args:
+        podcast_script: The conversational script between the speakers.
+        file_path: Where to write the audio file.
+        prompt_prefix: The instruction placed before the script, which also
+            sets the spoken language.
+        client: A genai client, or a stand-in with the same interface.
+            Defaults to the shared client from `get_genai_client()`.
+        stream: Synthesize turn by turn and append each turn to the file as
+            soon as it arrives.
+        max_concurrency: How many turns to synthesize at once. Values above
+            one imply turn-by-turn synthesis.
+        silence_ms: Silence inserted between turns in turn-by-turn mode.
+        cache: Audio cache consulted before every TTS request.
+        use_mmap: Write the WAV file through a memory map.
+        output_format: 'wav', 'flac' or 'opus'. Compressed formats are
+            encoded in a background thread while synthesis continues.
+        on_chunk: Called with each PCM chunk right after it is written, e.g.
+            to start playback or upload early.
+
+    Returns:
+        Dictionary with status and file information.
+    """
+    client = client or get_genai_client()
+    config = speech_config()
+    started = time.perf_counter()
+    first_audio: Optional[float] = None
+    total_bytes = 0
+
+    if stream or max_concurrency > 1:
+        chunks = stream_turns(
+            client,
+            split_turns(podcast_script),
+            prompt_prefix,
+            config,
+            max_concurrency,
+            cache=cache,
+        )
+    else:
+        key = audio_key(
+            podcast_script, ",".join(SPEAKER_VOICES), ",".join(SPEAKER_VOICES.values()), prompt_prefix
+        )
+        chunks = iter([
+            cached_synthesize(client, f"{prompt_prefix}\n\n{podcast_script}", config, key, cache)
+        ])
+
+    writer = open_audio_writer(
+        str(file_path), output_format, CHANNELS, SAMPLE_RATE, SAMPLE_WIDTH, use_mmap=use_mmap
+    )
+    with writer as wf:
+        gap = silence(silence_ms) if silence_ms > 0 else b""
+        for index, pcm in enumerate(chunks):
+            if gap and index:
+                total_bytes += wf.write(gap)
+            # Chunks are written through as they arrive and dropped afterwards,
+            # so memory stays flat however long the episode is
+            total_bytes += wf.write(pcm)
+            if first_audio is None:
+                first_audio = time.perf_counter() - started
+            if on_chunk is not None:
+                on_chunk(pcm)
+
+    encoded_size = os.path.getsize(file_path)
+    return {
+        "status": "success",
+        "message": f"Successfully generated and saved podcast audio to {file_path}",
+        "file_path": str(file_path),
+        "file_size": total_bytes,
+        "time_to_first_audio": round(first_audio or 0.0, 3),
+        "output_format": output_format,
+        "encoded_size": encoded_size,
+        "encode_seconds": round(writer.encode_seconds, 3),
+        "compression_ratio": round(total_bytes / encoded_size, 2) if encoded_size else 0.0,
+    }
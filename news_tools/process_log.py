@@ -0,0 +1,88 @@
+"""
+Source-domain extraction and a bounded process log for search callbacks.
+
+`source_domains` scans a search response once with a precompiled pattern
+that captures the host directly, so there is no second `urlparse` pass
+over every match. `grounding_domains` reads the sources the model cited
+from a reply's grounding metadata instead, for runs where no tool
+callback sees the search response (Google Search is model-side).
+
+The process log lives in session state as a plain list
+(state must stay JSON-serialisable). New entries are appended and only the
+newest `PROCESS_LOG_MAX_ENTRIES` are kept, so a long session does not make
+its state, or the copy written on every search, grow forever.
+"""
+import re
+from typing import Any, Iterable, List, MutableMapping
+
+PROCESS_LOG_KEY = "process_log"
+PROCESS_LOG_MAX_ENTRIES = 50
+
+# Scheme plus authority: stops at the first path, query, fragment, quote or bracket.
+_URL_HOST = re.compile(r"https?://([^\s/?#\"'<>()\[\]]+)", re.IGNORECASE)
+_DOMAIN_NAME = re.compile(r"(?:[a-z0-9-]+\.)+[a-z]{2,}")
+# Grounding chunk URIs point at this redirect rather than at the source
+_GROUNDING_REDIRECT_HOST = "vertexaisearch.cloud.google.com"
+
+
+def source_domains(text: str) -> List[str]:
+    """Returns the sorted, unique host names of every http(s) URL in `text`.
+
+    User info and ports are dropped and hosts are lower-cased, so
+    `https://user@TechCrunch.com:443/x` and `http://techcrunch.com` count once.
+    """
+    hosts = set()
+    for match in _URL_HOST.finditer(text):
+        host = match.group(1).rpartition("@")[2].partition(":")[0].rstrip(".,;").lower()
+        if host:
+            hosts.add(host)
+    return sorted(hosts)
+
+
+def grounding_domains(metadata: Iterable[Any]) -> List[str]:
+    """Returns the sorted, unique source domains cited in Gemini grounding metadata.
+
+    Each chunk's `web.domain` is used when set. Otherwise its title is used
+    (the Gemini API titles web chunks with the domain), and failing that
+    the URI's host unless it is the grounding redirect.
+    """
+    hosts = set()
+    for entry in metadata:
+        for chunk in getattr(entry, "grounding_chunks", None) or ():
+            web = getattr(chunk, "web", None)
+            if web is None:
+                continue
+            title = (web.title or "").strip().lower()
+            host = (web.domain or "").strip().lower() or (title if _DOMAIN_NAME.fullmatch(title) else "")
+            if not host:
+                uri_hosts = [name for name in source_domains(web.uri or "") if name != _GROUNDING_REDIRECT_HOST]
+                host = uri_hosts[0] if uri_hosts else ""
+            if host:
+                hosts.add(host.removeprefix("www."))
+    return sorted(hosts)
+
+
+def append_log(
+    state: MutableMapping[str, Any],
+    entry: str,
+    max_entries: int = PROCESS_LOG_MAX_ENTRIES,
+) -> List[str]:
+    """Appends `entry` to the process log in `state`, dropping the oldest entries past `max_entries`.
+
+    The list is reassigned rather than mutated in place so ADK records the
+    change in the session's state delta.
+
+    Returns:
+        The stored log, oldest entry first.
+    """
+    log = list(state.get(PROCESS_LOG_KEY) or ())
+    log.append(entry)
+    if len(log) > max_entries:
+        del log[: len(log) - max_entries]
+    state[PROCESS_LOG_KEY] = log
+    return log
+
+
+def recent_log(state: MutableMapping[str, Any]) -> List[str]:
+    """Returns the process log newest entry first, the order the reports show it in."""
+    return list(reversed(state.get(PROCESS_LOG_KEY) or ()))
@@ -0,0 +1,279 @@
+"""
+Quote fetching used by the agents' `get_financial_context` tools.
+
+yfinance only exposes per-ticker quote lookups, so instead of walking the
+ticker list one request at a time the lookups are fanned out over a small,
+process-wide thread pool. A report with five stories then costs roughly one
+network round trip instead of five.
+
+Formatted quotes are kept in a process-wide TTL cache shared by every
+session. Fresh entries are served without touching the network; slightly
+stale entries are served immediately while a refresh runs on the pool.
+
+Symbols that are not in the local listing index, or that yfinance recently
+reported as unknown, are rejected without a network call. Timeouts,
+connection errors and rate limits say nothing about the symbol, so they are
+never remembered, and a cached quote always wins over a rejection.
+
+yfinance (and the pandas/numpy stack behind it) is imported on the first
+lookup rather than when an agent package is loaded.
+"""
+import asyncio
+from concurrent.futures import Future, ThreadPoolExecutor, wait
+import threading
+from typing import Any, Dict, List, Optional, Set, Tuple
+
+from news_tools.cache import MISS, STALE, TTLCache
+from news_tools.symbols import symbol_index
+
+# Upper bound on concurrent quote lookups shared by every agent in the process.
+MAX_QUOTE_WORKERS = 8
+
+# Quotes younger than this are served straight from the cache.
+QUOTE_TTL_SECONDS = 60.0
+# Quotes up to this much older are still served while they are refreshed.
+QUOTE_STALE_SECONDS = 300.0
+QUOTE_CACHE_SIZE = 512
+# How long an unknown symbol is rejected before it is looked up again.
+INVALID_TICKER_TTL_SECONDS = 900.0
+INVALID_TICKER_CACHE_SIZE = 1024
+# How long a tool call waits for the network lookups before giving up.
+QUOTE_TIMEOUT_SECONDS = 10.0
+
+QUOTE_ERROR = "Invalid Ticker or Data Error"
+QUOTE_TIMEOUT = "Price data not available (request timed out)."
+
+quote_cache = TTLCache(
+    max_entries=QUOTE_CACHE_SIZE,
+    ttl=QUOTE_TTL_SECONDS,
+    stale_ttl=QUOTE_STALE_SECONDS,
+)
+invalid_ticker_cache = TTLCache(
+    max_entries=INVALID_TICKER_CACHE_SIZE,
+    ttl=INVALID_TICKER_TTL_SECONDS,
+)
+_refreshing: Set[str] = set()
+_refresh_lock = threading.Lock()
+
+_executor: Optional[ThreadPoolExecutor] = None
+_executor_lock = threading.Lock()
+
+
+def _get_executor() -> ThreadPoolExecutor:
+    """Returns the shared quote worker pool, creating it on first use."""
+    global _executor
+    if _executor is None:
+        with _executor_lock:
+            if _executor is None:
+                _executor = ThreadPoolExecutor(
+                    max_workers=MAX_QUOTE_WORKERS, thread_name_prefix="quote"
+                )
+    return _executor
+
+
+class UnknownSymbolError(LookupError):
+    """Raised when yfinance has no quote for a symbol, as opposed to failing to reach it."""
+
+
+def _is_unknown_symbol(error: Exception) -> bool:
+    """True for errors that mean the symbol does not exist, not that the request failed."""
+    status_code = getattr(getattr(error, "response", None), "status_code", None)
+    if status_code is not None:
+        return status_code == 404
+    message = str(error).lower()
+    return "404" in message or "not found" in message or "delisted" in message
+
+
+def fetch_info(ticker_symbol: str) -> Dict[str, Any]:
+    """
+    Fetches the raw yfinance info dictionary for a single ticker.
+
+    Raises:
+        UnknownSymbolError: yfinance answered, but has no such symbol.
+        Exception: Transport errors (timeouts, connection errors, rate
+            limits) propagate unchanged.
+    """
+    import yfinance as yf
+
+    try:
+        info = yf.Ticker(ticker_symbol).info
+    except Exception as e:
+        if _is_unknown_symbol(e):
+            raise UnknownSymbolError(ticker_symbol) from e
+        raise
+    # Unknown symbols come back as a near-empty dict instead of an error
+    if not info or not (info.get("quoteType") or info.get("symbol")):
+        raise UnknownSymbolError(ticker_symbol)
+    return info
+
+
+def format_quote(info: Dict[str, Any]) -> str:
+    """
+    Formats a yfinance info dictionary as a price and daily change string.
+
+    Args:
+        info: The info dictionary returned by yfinance for a ticker.
+
+    Returns:
+        A string such as '$950.00 (+1.50%)', or 'Price data not available.'
+        when the ticker is valid but the data points are missing.
+    """
+    # Safely access the required data points
+    price = info.get("currentPrice") or info.get("regularMarketPrice")
+    change_percent = info.get("regularMarketChangePercent")
+
+    if price is not None and change_percent is not None:
+        change_str = f"{change_percent * 100:+.2f}%"
+        return f"${price:.2f} ({change_str})"
+    # Handle cases where the ticker is valid but data is missing
+    return "Price data not available."
+
+
+def _cache_key(ticker_symbol: str) -> str:
+    return ticker_symbol.strip().upper()
+
+
+def fetch_quote(ticker_symbol: str) -> str:
+    """Fetches and formats the quote for a single ticker, bypassing the cache."""
+    key = _cache_key(ticker_symbol)
+    try:
+        quote = format_quote(fetch_info(ticker_symbol))
+    except UnknownSymbolError:
+        invalid_ticker_cache.set(key, True)
+        return QUOTE_ERROR
+    except Exception:
+        # A network blip or rate limit; a stale cached quote (if any) stays in place
+        return QUOTE_ERROR
+    invalid_ticker_cache.discard(key)
+    quote_cache.set(key, quote)
+    return quote
+
+
+def is_rejected(ticker_symbol: str) -> bool:
+    """Returns True if a symbol is unlisted or recently reported unknown, so it can skip the network."""
+    if not symbol_index.is_known(ticker_symbol):
+        return True
+    return invalid_ticker_cache.get(_cache_key(ticker_symbol), False)
+
+
+def _refresh_in_background(ticker_symbol: str) -> None:
+    """Schedules a refresh of a stale quote unless one is already running."""
+    key = _cache_key(ticker_symbol)
+    with _refresh_lock:
+        if key in _refreshing:
+            return
+        _refreshing.add(key)
+
+    def _done(_future) -> None:
+        with _refresh_lock:
+            _refreshing.discard(key)
+
+    _get_executor().submit(fetch_quote, ticker_symbol).add_done_callback(_done)
+
+
+def _start_lookups(
+    tickers: List[str],
+) -> Tuple[List[str], Dict[str, str], Dict[str, Future]]:
+    """
+    Serves what it can from the cache and submits the rest to the quote pool.
+
+    Returns:
+        The de-duplicated tickers in input order, the quotes already known,
+        and the pending lookups keyed by ticker.
+    """
+    unique_tickers = list(dict.fromkeys(tickers))
+    results: Dict[str, str] = {}
+    pending: Dict[str, Future] = {}
+    for ticker_symbol in unique_tickers:
+        quote, state = quote_cache.lookup(_cache_key(ticker_symbol))
+        if state == MISS:
+            if is_rejected(ticker_symbol):
+                results[ticker_symbol] = QUOTE_ERROR
+            else:
+                pending[ticker_symbol] = _get_executor().submit(fetch_quote, ticker_symbol)
+            continue
+        results[ticker_symbol] = quote
+        if state == STALE:
+            _refresh_in_background(ticker_symbol)
+    return unique_tickers, results, pending
+
+
+def _collect(
+    unique_tickers: List[str], results: Dict[str, str], pending: Dict[str, Future]
+) -> Dict[str, str]:
+    """Merges finished lookups into the results, marking unfinished ones as timed out."""
+    for ticker_symbol, future in pending.items():
+        if future.done():
+            results[ticker_symbol] = future.result()
+        else:
+            future.cancel()
+            results[ticker_symbol] = QUOTE_TIMEOUT
+    return {ticker_symbol: results[ticker_symbol] for ticker_symbol in unique_tickers}
+
+
+def fetch_quotes(tickers: List[str], timeout: float = QUOTE_TIMEOUT_SECONDS) -> Dict[str, str]:
+    """
+    Fetches formatted quotes for a list of tickers.
+
+    Cached quotes are returned without a network call; the remaining tickers
+    are looked up concurrently. Duplicate tickers are looked up once and the
+    result keeps the order of the input list, so it is a drop-in replacement
+    for the serial loop the agents used to run.
+
+    This blocks the calling thread. Agents running on a live model should
+    use `fetch_quotes_async` instead.
+
+    Args:
+        tickers: A list of stock market tickers (e.g., ["NVDA", "MSFT"]).
+        timeout: Seconds to wait for the network lookups.
+
+    Returns:
+        A dictionary mapping each ticker to its formatted financial data string.
+    """
+    unique_tickers, results, pending = _start_lookups(tickers)
+    if pending:
+        wait(pending.values(), timeout=timeout)
+    return _collect(unique_tickers, results, pending)
+
+
+async def fetch_quotes_async(
+    tickers: List[str], timeout: float = QUOTE_TIMEOUT_SECONDS
+) -> Dict[str, str]:
+    """
+    Awaitable version of `fetch_quotes`.
+
+    The blocking yfinance calls run on the shared quote pool, so the event
+    loop (and the live audio stream it drives) keeps running while quotes
+    are fetched. yfinance keeps one HTTP session per process, so the pool
+    threads reuse its keep-alive connections.
+
+    Args:
+        tickers: A list of stock market tickers (e.g., ["NVDA", "MSFT"]).
+        timeout: Seconds to wait for the network lookups.
+
+    Returns:
+        A dictionary mapping each ticker to its formatted financial data string.
+    """
+    unique_tickers, results, pending = _start_lookups(tickers)
+    if pending:
+        await asyncio.wait(
+            [asyncio.wrap_future(future) for future in pending.values()],
+            timeout=timeout,
+        )
+    return _collect(unique_tickers, results, pending)
+
+
+def quote_cache_stats() -> Dict[str, Any]:
+    """Returns hit/miss/eviction counters for the shared quote cache."""
+    return quote_cache.stats()
+
+
+def refresh_symbol_data() -> int:
+    """
+    Reloads the listing index and forgets symbols recently reported unknown.
+
+    Returns:
+        The number of symbols in the reloaded index.
+    """
+    invalid_ticker_cache.clear()
+    return symbol_index.refresh()
@@ -0,0 +1,203 @@
+"""
+Native rendering of `AINewsReport` objects to Markdown and JSON.
+
+The agents used to have the model write the whole Markdown report as one
+long string and pass it to `save_news_to_markdown`. `ReportRenderer` builds
+it from the structured report instead: each story is rendered from a
+template once and cached by a hash of its fields, so updating a report
+re-renders only the stories that changed. Every change is flushed to disk
+straight away, so a partial report is visible as soon as its first story
+is known.
+
+The renderer relies only on the attribute names of the report models
+(`title`, `report_summary`, `stories`, and the `NewsStory` fields), so any
+pydantic model or plain object with those attributes works.
+"""
+import asyncio
+import hashlib
+import json
+import pathlib
+from typing import Any, Dict, List, Optional, Tuple
+
+from news_tools.cache import TTLCache
+from news_tools.persistence import FSYNC_ALWAYS, ReportWriter, atomic_write_text
+
+REPORT_TEMPLATES_EN = {
+    "header": "# {title}\n\n{report_summary}\n\n## Top Headlines\n",
+    "story": (
+        "### {number}. {company} ({ticker})\n"
+        "*   **Summary:** {summary}\n"
+        "*   **Why It Matters:** {why_it_matters}\n"
+        "*   **Market Data:** {financial_context}\n"
+        "*   **Source:** {source_domain}\n"
+    ),
+    "notes_header": "## Data Sourcing Notes\n",
+    "note": "*   {entry}\n",
+}
+
+REPORT_TEMPLATES_ES = {
+    "header": "# {title}\n\n{report_summary}\n\n## Titulares Principales\n",
+    "story": (
+        "### {number}. {company} ({ticker})\n"
+        "*   **Resumen:** {summary}\n"
+        "*   **Por Qué Importa:** {why_it_matters}\n"
+        "*   **Datos de Mercado:** {financial_context}\n"
+        "*   **Fuente:** {source_domain}\n"
+    ),
+    "notes_header": "## Notas de Fuentes de Datos\n",
+    "note": "*   {entry}\n",
+}
+
+
+def _as_dict(item: Any) -> Dict[str, Any]:
+    """Returns the fields of a pydantic model or a plain mapping."""
+    if hasattr(item, "model_dump"):
+        return item.model_dump()
+    return dict(item)
+
+
+def _fingerprint(fields: Dict[str, Any]) -> str:
+    return hashlib.sha1(json.dumps(fields, sort_keys=True, default=str).encode("utf-8")).hexdigest()
+
+
+class ReportRenderer:
+    """Keeps a report's rendered fragments and writes Markdown and JSON on every change."""
+
+    def __init__(
+        self,
+        markdown_path: pathlib.Path,
+        json_path: Optional[pathlib.Path] = None,
+        templates: Optional[Dict[str, str]] = None,
+        fsync: str = FSYNC_ALWAYS,
+    ):
+        self.markdown_path = pathlib.Path(markdown_path)
+        self.json_path = pathlib.Path(json_path) if json_path is not None else None
+        self.templates = templates or REPORT_TEMPLATES_EN
+        self.fsync = fsync
+        self.renders = 0
+        self._header: Dict[str, Any] = {"title": "AI Research Report", "report_summary": ""}
+        self._stories: List[Dict[str, Any]] = []
+        # (fingerprint, number, rendered Markdown) per story
+        self._fragments: List[Tuple[str, int, str]] = []
+        # Serializes flushes, so an older snapshot can never be renamed into place last
+        self._flush_lock = asyncio.Lock()
+
+    def set_header(self, title: str, report_summary: str) -> None:
+        """Sets the report title and summary shown above the stories."""
+        self._header = {"title": title, "report_summary": report_summary}
+
+    def upsert_story(self, index: int, story: Any) -> bool:
+        """
+        Adds or replaces the story at `index`.
+
+        Returns:
+            True if the story was (re-)rendered, False if it was unchanged.
+        """
+        fields = _as_dict(story)
+        fingerprint = _fingerprint(fields)
+        number = index + 1
+        if index < len(self._fragments) and self._fragments[index][:2] == (fingerprint, number):
+            return False
+        rendered = (fingerprint, number, self.templates["story"].format(number=number, **fields))
+        if index < len(self._fragments):
+            self._stories[index] = fields
+            self._fragments[index] = rendered
+        elif index == len(self._fragments):
+            self._stories.append(fields)
+            self._fragments.append(rendered)
+        else:
+            raise IndexError(f"Story {index} would leave a gap after {len(self._fragments)} stories")
+        self.renders += 1
+        return True
+
+    def add_story(self, story: Any) -> None:
+        """Appends a story."""
+        self.upsert_story(len(self._stories), story)
+
+    def update(self, report: Any) -> int:
+        """
+        Syncs the renderer with a full report, re-rendering only changed stories.
+
+        Returns:
+            The number of stories that were re-rendered.
+        """
+        self.set_header(report.title, report.report_summary)
+        changed = sum(self.upsert_story(index, story) for index, story in enumerate(report.stories))
+        del self._stories[len(report.stories):]
+        del self._fragments[len(report.stories):]
+        return changed
+
+    def markdown(self) -> str:
+        """Assembles the Markdown report from the cached fragments."""
+        parts = [self.templates["header"].format(**self._header)]
+        parts += [fragment[2] for fragment in self._fragments]
+        # Stories carry the search process log; list each entry once, in order
+        notes = list(dict.fromkeys(
+            story.get("process_log", "") for story in self._stories if story.get("process_log")
+        ))
+        if notes:
+            parts.append(self.templates["notes_header"] + "\n" + "".join(
+                self.templates["note"].format(entry=entry) for entry in notes
+            ))
+        return "\n".join(parts)
+
+    def as_json(self) -> str:
+        """Returns the structured report as JSON."""
+        return json.dumps({**self._header, "stories": self._stories}, indent=2, ensure_ascii=False)
+
+    def _snapshot(self) -> Tuple[str, Optional[str]]:
+        """Renders the current Markdown and JSON, to be written without touching the renderer's state."""
+        return self.markdown(), self.as_json() if self.json_path is not None else None
+
+    def _write(self, markdown: str, json_text: Optional[str]) -> Dict[str, str]:
+        atomic_write_text(self.markdown_path, markdown, self.fsync)
+        if self.json_path is not None and json_text is not None:
+            atomic_write_text(self.json_path, json_text, self.fsync)
+        result = {
+            "status": "success",
+            "message": f"Successfully saved news to {self.markdown_path.resolve()}",
+            "file_path": str(self.markdown_path.resolve()),
+        }
+        if self.json_path is not None:
+            result["json_path"] = str(self.json_path.resolve())
+        return result
+
+    def flush(self) -> Dict[str, str]:
+        """Writes the current Markdown (and JSON) atomically."""
+        return self._write(*self._snapshot())
+
+    async def flush_async(self) -> Dict[str, str]:
+        """
+        `flush` without blocking the event loop.
+
+        The report is rendered on the loop, where tool calls change it, and
+        only the file I/O runs in a worker thread. Flushes of one renderer
+        run one at a time, so the newest snapshot is always written last.
+        """
+        async with self._flush_lock:
+            snapshot = self._snapshot()
+            return await asyncio.to_thread(self._write, *snapshot)
+
+
+# One renderer per session, so repeated saves only re-render what changed.
+_session_renderers = TTLCache(max_entries=256, ttl=3600.0)
+
+
+def session_renderer(
+    writer: ReportWriter,
+    session_id: Optional[str],
+    filename: str = "ai_research_report",
+    templates: Optional[Dict[str, str]] = None,
+) -> ReportRenderer:
+    """Returns the renderer for a session's report, creating it on first use."""
+    key = (session_id, filename)
+    renderer = _session_renderers.get(key)
+    if renderer is None:
+        renderer = ReportRenderer(
+            writer.session_path(filename, session_id),
+            writer.session_path(filename, session_id, suffix=".json"),
+            templates=templates,
+            fsync=writer.fsync,
+        )
+        _session_renderers.set(key, renderer)
+    return renderer
@@ -0,0 +1,131 @@
+"""
+Shared cache for news search results.
+
+`google_search` is a model-side grounding tool: the model runs the search
+itself and ADK never calls before/after tool callbacks for it, so a cache
+cannot sit around the tool call. The cache therefore wraps the one layer
+that does see a whole search in Python: the search worker run of the
+deterministic pipelines (`news_tools.pipeline`). Different sessions asking
+the pipeline for the same topic share the worker's reply, including the
+process log it left in session state, without another model call or
+search.
+
+Keys are the request with case and whitespace normalised. Standalone
+filter operators (`site:`, `tbs=`, `after:`...) are sorted, since Google
+ANDs them with the rest of the query and their order does not change the
+results. Boolean `OR`/`AND` and the terms next to them keep their place.
+Entries expire after `SEARCH_CACHE_TTL_SECONDS`. The least recently used
+ones are evicted past `SEARCH_CACHE_SIZE`. Replies whose text is larger
+than `SEARCH_CACHE_MAX_RESPONSE_BYTES` are not cached, so memory stays
+bounded.
+
+Since no tool callback sees `google_search`, every run is also recorded in
+the tool metrics under `google_search`, as a `hit` or a `miss`.
+"""
+import os
+import re
+import time
+from typing import Any, Awaitable, Callable, Dict, Optional, Tuple
+
+from news_tools.cache import FRESH, TTLCache
+from news_tools.metrics import CACHE_HIT, CACHE_MISS, ToolMetrics, payload_bytes, tool_metrics
+
+SEARCH_TOOL_NAME = "google_search"
+SEARCH_CACHE_TTL_SECONDS = float(os.environ.get("SEARCH_CACHE_TTL_SECONDS", "900"))
+SEARCH_CACHE_SIZE = int(os.environ.get("SEARCH_CACHE_SIZE", "256"))
+SEARCH_CACHE_MAX_RESPONSE_BYTES = 256 * 1024
+
+# Filters Google ANDs with the rest of the query, so their order is irrelevant
+_FILTER = re.compile(r"^-?(?:site|inurl|intitle|intext|filetype|before|after):\S+$|^tbs=\S+$")
+# Google only treats the upper-case forms as operators
+_BOOLEAN = frozenset({"OR", "AND", "|"})
+
+
+def normalize_query(query: str) -> Tuple[str, Tuple[str, ...]]:
+    """Returns a cache key for a search query.
+
+    Terms keep their order. Standalone filters are de-duplicated and sorted;
+    a filter joined to its neighbour by `OR`/`AND` stays in place.
+    """
+    tokens = query.split()
+    words = []
+    filters = set()
+    for index, token in enumerate(tokens):
+        if token in _BOOLEAN:
+            words.append(token)
+            continue
+        token = token.casefold()
+        joined = (index > 0 and tokens[index - 1] in _BOOLEAN) or (
+            index + 1 < len(tokens) and tokens[index + 1] in _BOOLEAN
+        )
+        if _FILTER.match(token) and not joined:
+            filters.add(token)
+        else:
+            words.append(token)
+    return " ".join(words), tuple(sorted(filters))
+
+
+class SearchCache:
+    """Time- and size-bounded cache of search worker replies."""
+
+    def __init__(
+        self,
+        ttl: float = SEARCH_CACHE_TTL_SECONDS,
+        max_entries: int = SEARCH_CACHE_SIZE,
+        max_response_bytes: int = SEARCH_CACHE_MAX_RESPONSE_BYTES,
+        metrics: Optional[ToolMetrics] = tool_metrics,
+    ):
+        self.cache = TTLCache(max_entries=max_entries, ttl=ttl)
+        self.max_response_bytes = max_response_bytes
+        self.metrics = metrics
+
+    async def run(self, request: str, search: Callable[[str], Awaitable[Any]], namespace: str = "") -> Any:
+        """
+        Returns the cached reply for a search request, or runs the search and caches its reply.
+
+        Args:
+            request: The search request sent to the worker.
+            search: Coroutine function running the search, e.g. a search worker agent.
+            namespace: Keeps apart workers whose replies differ for the same request
+                (e.g. different source policies or languages).
+
+        Returns:
+            The search reply. An `AgentReply` served from the cache reports zero
+            model calls, since none were made for it.
+        """
+        started = time.perf_counter()
+        key = (namespace, normalize_query(request))
+        reply, state = self.cache.lookup(key)
+        if state == FRESH:
+            print(f"SEARCH CACHE: hit for '{request}'")
+            reply = reply._replace(model_calls=0) if hasattr(reply, "_replace") else reply
+            self._record(started, reply, CACHE_HIT)
+            return reply
+        try:
+            reply = await search(request)
+        except Exception:
+            self._record(started, None, CACHE_MISS, error=True)
+            raise
+        self._record(started, reply, CACHE_MISS)
+        text = getattr(reply, "text", reply)
+        if isinstance(text, str) and text and len(text.encode("utf-8")) <= self.max_response_bytes:
+            self.cache.set(key, reply)
+        return reply
+
+    def _record(self, started: float, reply: Any, cache_status: str, error: bool = False) -> None:
+        if self.metrics is None:
+            return
+        text = getattr(reply, "text", reply)
+        size = payload_bytes(text) if text is not None else 0
+        self.metrics.record(SEARCH_TOOL_NAME, time.perf_counter() - started, size, error, cache_status)
+
+    def clear(self) -> None:
+        """Drops every cached reply."""
+        self.cache.clear()
+
+    def stats(self) -> Dict[str, Any]:
+        """Returns the cache counters."""
+        return self.cache.stats()
+
+
+search_cache = SearchCache()
@@ -0,0 +1,97 @@
+"""
+`google_search` callbacks shared by the news agents.
+
+The source policy callbacks are built from a `DomainPolicyFile`, so each
+agent keeps its own list (a block list for the research agent, a whitelist
+for the podcast agents) while the matching logic lives here once.
+"""
+from typing import Any, Callable, Optional
+
+from google.adk.tools import ToolContext
+
+from news_tools.domain_policy import DomainPolicyFile, site_domains
+from news_tools.process_log import PROCESS_LOG_KEY, append_log, recent_log, source_domains
+from news_tools.search_cache import SEARCH_TOOL_NAME
+
+FRESHNESS_FILTER = "tbs=qdr:w"
+
+
+def block_domains_callback(blocked: DomainPolicyFile) -> Callable[..., Optional[Any]]:
+    """Builds a before-tool callback that refuses searches mentioning a blocked domain."""
+
+    def filter_news_sources_callback(tool, args, tool_context):
+        """
+        Callback: Blocks search requests that target certain domains which are not necessarily news sources.
+        Demonstrates content quality enforcement through request blocking.
+        """
+        if tool.name == SEARCH_TOOL_NAME:
+            query = args.get("query", "").lower()
+
+            # Check if query explicitly targets blocked domains (one pass over the compiled list)
+            domain = blocked.get().find_mention(query)
+            if domain is not None:
+                print(f"BLOCKED: Domains from blocked list detected: '{query}'")
+                return {
+                    "error": "blocked_source",
+                    "reason": f"Searches targeting {domain} or similar are not allowed. Please search for professional news sources."
+                }
+
+            print(f"ALLOWED: Professional source query: '{query}'")
+        return None
+
+    return filter_news_sources_callback
+
+
+def whitelist_domains_callback(whitelist: DomainPolicyFile) -> Callable[..., Optional[Any]]:
+    """Builds a before-tool callback that restricts searches to whitelisted domains."""
+
+    def filter_news_sources_callback(tool, args, tool_context):
+        """Callback to enforce that google_search queries only use whitelisted domains."""
+        if tool.name == SEARCH_TOOL_NAME:
+            original_query = args.get("query", "")
+            policy = whitelist.get()
+            if any(policy.covers(host) for host in site_domains(original_query)):
+                return None
+            args['query'] = f"{original_query} {policy.site_filter}"
+            print(f"MODIFIED query to enforce whitelist: '{args['query']}'")
+        return None
+
+    return filter_news_sources_callback
+
+
+def enforce_data_freshness_callback(tool, args, tool_context):
+    """Callback to add a time filter to search queries to get recent news."""
+    if tool.name == SEARCH_TOOL_NAME:
+        query = args.get("query", "")
+        # Adds a Google search parameter to filter results from the last week.
+        if FRESHNESS_FILTER not in query:
+            args['query'] = f"{query} {FRESHNESS_FILTER}"
+            print(f"MODIFIED query for freshness: '{args['query']}'")
+    return None
+
+
+def initialize_process_log(tool_context: ToolContext):
+    """Helper to ensure the process_log list exists in the state."""
+    if PROCESS_LOG_KEY not in tool_context.state:
+        tool_context.state[PROCESS_LOG_KEY] = []
+
+
+def inject_process_log_after_search(tool, args, tool_context, tool_response):
+    """
+    Callback: After a successful search, this injects the process_log into the response
+    and adds a specific note about which domains were sourced. This makes the callbacks'
+    actions visible to the LLM.
+    """
+    if tool.name == SEARCH_TOOL_NAME and isinstance(tool_response, str):
+        # Single pass over the response; the log is capped so state stays bounded
+        unique_domains = source_domains(tool_response)
+        if unique_domains:
+            append_log(tool_context.state, f"Action: Sourced news from the following domains: {', '.join(unique_domains)}.")
+
+        final_log = recent_log(tool_context.state)
+        print(f"CALLBACK LOG: Injecting process log into tool response: {final_log}")
+        return {
+            "search_results": tool_response,
+            "process_log": final_log
+        }
+    return tool_response
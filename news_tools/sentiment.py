@@ -0,0 +1,179 @@
+"""
+Headline sentiment scoring with VADER.
+
+Building a `SentimentIntensityAnalyzer` loads the VADER lexicon from disk,
+so the analyzer is built once per process and reused by every call. Large
+batches are split into chunks and scored on a process pool, where each
+worker builds its own analyzer once.
+
+Scores are memoized in a bounded LRU cache keyed by a hash of the
+normalized headline, so a wire-service headline repeated across sessions
+is scored once per process.
+
+vaderSentiment and the process pool machinery are imported on first use,
+so loading an agent package does not pay for them.
+"""
+import hashlib
+import math
+import threading
+from typing import TYPE_CHECKING, Any, Dict, List, Optional, Tuple
+
+from news_tools.cache import MISS, TTLCache
+
+if TYPE_CHECKING:
+    from vaderSentiment.vaderSentiment import SentimentIntensityAnalyzer
+
+# Compound-score thresholds recommended by the VADER authors.
+POSITIVE_THRESHOLD = 0.05
+NEGATIVE_THRESHOLD = -0.05
+
+# Batches at least this large are scored on a process pool when one is allowed.
+PROCESS_POOL_THRESHOLD = 5000
+PROCESS_POOL_CHUNK_SIZE = 2000
+
+SENTIMENT_CACHE_SIZE = 50000
+
+# Sentiment of a given headline never changes, so entries only leave by LRU eviction.
+sentiment_cache = TTLCache(max_entries=SENTIMENT_CACHE_SIZE, ttl=math.inf)
+
+_analyzer: Optional["SentimentIntensityAnalyzer"] = None
+_analyzer_lock = threading.Lock()
+
+
+def get_analyzer() -> "SentimentIntensityAnalyzer":
+    """Returns the process-wide VADER analyzer, building it on first use."""
+    global _analyzer
+    if _analyzer is None:
+        with _analyzer_lock:
+            if _analyzer is None:
+                from vaderSentiment.vaderSentiment import SentimentIntensityAnalyzer
+
+                _analyzer = SentimentIntensityAnalyzer()
+    return _analyzer
+
+
+def classify(compound_score: float) -> str:
+    """Maps a compound score in [-1.0, 1.0] to positive, negative or neutral."""
+    if compound_score >= POSITIVE_THRESHOLD:
+        return "positive"
+    if compound_score <= NEGATIVE_THRESHOLD:
+        return "negative"
+    return "neutral"
+
+
+def headline_key(headline: str) -> bytes:
+    """
+    Returns the memo key for a headline.
+
+    Case and whitespace are folded so trivially different copies of the
+    same headline share an entry, and the result is hashed to a fixed
+    16 bytes so long headlines do not bloat the cache.
+    """
+    normalized = " ".join(headline.casefold().split())
+    return hashlib.blake2b(normalized.encode("utf-8"), digest_size=16).digest()
+
+
+def score_headline(headline: str) -> Tuple[Optional[float], str]:
+    """
+    Scores a single headline.
+
+    Returns:
+        A `(compound_score, label)` tuple. On failure the score is None and
+        the label is 'error'.
+    """
+    try:
+        compound_score = get_analyzer().polarity_scores(headline)["compound"]
+    except Exception:
+        return None, "error"
+    return compound_score, classify(compound_score)
+
+
+def _score_chunk(headlines: List[str]) -> List[Tuple[Optional[float], str]]:
+    return [score_headline(headline) for headline in headlines]
+
+
+def score_headlines(
+    headlines: List[str], max_processes: Optional[int] = None
+) -> List[Tuple[Optional[float], str]]:
+    """
+    Scores a batch of headlines, serving repeated headlines from the memo cache.
+
+    Args:
+        headlines: The headlines to score.
+        max_processes: If set and the batch has at least
+            PROCESS_POOL_THRESHOLD headlines, score chunks on a pool of up to
+            this many processes. Otherwise score in the calling thread.
+
+    Returns:
+        One `(compound_score, label)` tuple per headline, in input order.
+    """
+    scores: List[Optional[Tuple[Optional[float], str]]] = []
+    misses: Dict[bytes, List[int]] = {}
+    miss_headlines: List[str] = []
+    for index, headline in enumerate(headlines):
+        key = headline_key(headline)
+        cached, state = sentiment_cache.lookup(key)
+        scores.append(cached)
+        if state == MISS:
+            if key not in misses:
+                misses[key] = []
+                miss_headlines.append(headline)
+            misses[key].append(index)
+
+    if miss_headlines:
+        new_scores = _score_uncached(miss_headlines, max_processes)
+        for key, score in zip(misses, new_scores):
+            # Failures are not memoized so they are retried on the next call
+            if score[0] is not None:
+                sentiment_cache.set(key, score)
+            for index in misses[key]:
+                scores[index] = score
+    return scores
+
+
+def _score_uncached(
+    headlines: List[str], max_processes: Optional[int]
+) -> List[Tuple[Optional[float], str]]:
+    """Scores headlines with the analyzer, on a process pool for large batches."""
+    if not max_processes or len(headlines) < PROCESS_POOL_THRESHOLD:
+        return _score_chunk(headlines)
+
+    chunks = [
+        headlines[i : i + PROCESS_POOL_CHUNK_SIZE]
+        for i in range(0, len(headlines), PROCESS_POOL_CHUNK_SIZE)
+    ]
+    from concurrent.futures import ProcessPoolExecutor
+
+    scores: List[Tuple[Optional[float], str]] = []
+    with ProcessPoolExecutor(max_workers=max_processes) as pool:
+        for chunk_scores in pool.map(_score_chunk, chunks):
+            scores.extend(chunk_scores)
+    return scores
+
+
+def analyze_headlines(
+    headlines: List[str], max_processes: Optional[int] = None
+) -> Dict[str, Dict[str, Any]]:
+    """
+    Scores headlines and returns the result keyed by headline.
+
+    Returns:
+        A dictionary mapping each headline to
+        `{"sentiment": label, "compound": score}`.
+    """
+    unique_headlines = list(dict.fromkeys(headlines))
+    scores = score_headlines(unique_headlines, max_processes=max_processes)
+    return {
+        headline: {"sentiment": label, "compound": compound_score}
+        for headline, (compound_score, label) in zip(unique_headlines, scores)
+    }
+
+
+def set_sentiment_cache_size(max_entries: int) -> None:
+    """Changes how many headline scores are memoized."""
+    sentiment_cache.resize(max_entries)
+
+
+def sentiment_cache_stats() -> Dict[str, Any]:
+    """Returns hit/miss/eviction counters and hit rate for the memo cache."""
+    return sentiment_cache.stats()
@@ -0,0 +1,153 @@
+"""
+Single-flight coalescing of identical tool calls.
+
+When many sessions ask for the same thing at once (the same tickers, the
+same headlines, the same podcast script), only the first call runs. The others wait for its result and return a copy of it. No second
+request is sent.
+
+`SingleFlight` is a pair of ADK tool callbacks. A key function per tool
+maps the call arguments to a hashable key. Returning None means "never
+coalesce", which suits per-session tools such as report saving. Model-side
+tools such as `google_search` never reach tool callbacks and cannot be
+coalesced here.
+
+*   `before_tool` goes last in `before_tool_callback`, after the callbacks
+    that rewrite arguments or answer from a cache. The first call for a key
+    becomes the leader and runs the tool. Later calls await the leader's
+    future and short-circuit with its result.
+*   `after_tool` goes first in `after_tool_callback`, before any callback
+    that replaces the response. It resolves the leader's future with the
+    raw response, so every waiter still runs its own post-processing.
+
+Leaders are tracked by `tool_context.function_call_id`, which is unique per
+call, so a later call can never resolve someone else's flight. Calls
+without one are not coalesced.
+
+ADK does not run the after-tool callbacks when a tool raises, so a failed
+leader never resolves its future. Flights are therefore only trusted for
+the tool's wait timeout (`SINGLE_FLIGHT_WAIT_SECONDS` unless overridden per
+tool). After that, waiters run the tool themselves, the next call becomes
+the new leader and the failed leader's bookkeeping is dropped.
+"""
+import asyncio
+import copy
+import hashlib
+import os
+import time
+from typing import Any, Callable, Dict, Hashable, Mapping, Optional, Tuple
+
+from news_tools.metrics import CACHE_COALESCED, note_cache_status
+
+SINGLE_FLIGHT_WAIT_SECONDS = float(os.environ.get("SINGLE_FLIGHT_WAIT_SECONDS", "60"))
+
+KeyFunction = Callable[[Dict[str, Any]], Optional[Hashable]]
+
+
+def list_key(arg: str) -> KeyFunction:
+    """Key function for tools whose result depends only on the set of items in one list argument."""
+    def key(args: Dict[str, Any]) -> Optional[Hashable]:
+        items = args.get(arg)
+        if not isinstance(items, (list, tuple)):
+            return None
+        return tuple(sorted({str(item) for item in items}))
+    return key
+
+
+def text_key(arg: str, *options: str) -> KeyFunction:
+    """Key function for tools driven by one large text argument plus a few small options."""
+    def key(args: Dict[str, Any]) -> Optional[Hashable]:
+        text = args.get(arg)
+        if not isinstance(text, str):
+            return None
+        digest = hashlib.blake2b(text.encode("utf-8"), digest_size=16).hexdigest()
+        return (digest,) + tuple(repr(args.get(option)) for option in options)
+    return key
+
+
+class SingleFlight:
+    """Coalesces concurrent identical tool calls, exposed as ADK tool callbacks."""
+
+    def __init__(
+        self,
+        key_functions: Mapping[str, KeyFunction],
+        wait_timeout: float = SINGLE_FLIGHT_WAIT_SECONDS,
+        wait_timeouts: Optional[Mapping[str, float]] = None,
+    ):
+        self.key_functions = dict(key_functions)
+        self.wait_timeout = wait_timeout
+        self.wait_timeouts = dict(wait_timeouts or {})
+        # flight key -> (future, function call ID of the leader, start time)
+        self._flights: Dict[Tuple[str, Hashable], Tuple[asyncio.Future, str, float]] = {}
+        # function call ID of each leader -> its flight key
+        self._leaders: Dict[str, Tuple[str, Hashable]] = {}
+        self.leaders = 0
+        self.coalesced = 0
+        self.timeouts = 0
+
+    def _key(self, tool, args) -> Optional[Tuple[str, Hashable]]:
+        key_function = self.key_functions.get(tool.name)
+        if key_function is None:
+            return None
+        try:
+            key = key_function(args)
+            hash(key)
+        except Exception:
+            return None
+        return None if key is None else (tool.name, key)
+
+    async def before_tool(self, tool, args, tool_context) -> Optional[Any]:
+        """Callback: Waits for an identical in-flight call instead of starting another one."""
+        key = self._key(tool, args)
+        call_id = getattr(tool_context, "function_call_id", None)
+        if key is None or call_id is None:
+            return None
+        loop = asyncio.get_running_loop()
+        now = time.monotonic()
+        timeout = self.wait_timeouts.get(tool.name, self.wait_timeout)
+        flight = self._flights.get(key)
+        if flight is None or flight[0].get_loop() is not loop or now - flight[2] >= timeout:
+            if flight is not None:
+                self._leaders.pop(flight[1], None)
+            future = loop.create_future()
+            self._flights[key] = (future, call_id, now)
+            self._leaders[call_id] = key
+            self.leaders += 1
+            return None
+
+        future, leader_id, started = flight
+        try:
+            response = await asyncio.wait_for(asyncio.shield(future), timeout - (now - started))
+        except asyncio.TimeoutError:
+            self.timeouts += 1
+            print(f"SINGLE FLIGHT: gave up waiting for {tool.name}; running it again")
+            if self._flights.get(key) is flight:
+                del self._flights[key]
+                self._leaders.pop(leader_id, None)
+            return None
+        self.coalesced += 1
+        print(f"SINGLE FLIGHT: shared in-flight {tool.name} result")
+        note_cache_status(tool_context, CACHE_COALESCED)
+        # Callers own their copy; later callbacks may modify it
+        return copy.copy(response)
+
+    def after_tool(self, tool, args, tool_context, tool_response) -> None:
+        """Callback: Hands a leader's response to every call waiting on it. Never changes the response."""
+        call_id = getattr(tool_context, "function_call_id", None)
+        key = self._leaders.pop(call_id, None) if call_id is not None else None
+        if key is None:
+            return None
+        flight = self._flights.get(key)
+        if flight is not None and flight[1] == call_id:
+            del self._flights[key]
+            if not flight[0].done():
+                flight[0].set_result(tool_response)
+        return None
+
+    def stats(self) -> Dict[str, int]:
+        """Returns how many calls ran, how many shared a result and how many waits timed out."""
+        return {
+            "in_flight": len(self._flights),
+            "leaders": self.leaders,
+            "coalesced": self.coalesced,
+            "timeouts": self.timeouts,
+        }
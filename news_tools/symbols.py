@@ -0,0 +1,118 @@
+"""
+Local index of listed ticker symbols.
+
+The index lets `get_financial_context` reject symbols the model made up
+without a network round trip. It is built once from listing files in the
+pipe-delimited format published by NASDAQ Trader (`nasdaqlisted.txt` and
+`otherlisted.txt`, which covers NYSE); plain one-symbol-per-line files work
+too. Point NEWS_TOOLS_SYMBOL_FILES at one or more such files (separated by
+os.pathsep), or drop them into `news_tools/data/`. With no listing files
+the index is disabled and every symbol is treated as known.
+"""
+import os
+import pathlib
+import threading
+from typing import FrozenSet, Iterable, List, Optional
+
+DEFAULT_DATA_DIR = pathlib.Path(__file__).parent / "data"
+SYMBOL_FILES_ENV = "NEWS_TOOLS_SYMBOL_FILES"
+
+# Column holding the symbol in the NASDAQ Trader listing files.
+_SYMBOL_COLUMNS = ("Symbol", "ACT Symbol", "NASDAQ Symbol")
+
+
+def normalize_symbol(symbol: str) -> str:
+    """Normalizes a symbol to the form yfinance uses (e.g. 'brk.b' -> 'BRK-B')."""
+    return symbol.strip().upper().replace(".", "-").replace("/", "-")
+
+
+def parse_listing(lines: Iterable[str]) -> List[str]:
+    """
+    Extracts symbols from the lines of a listing file.
+
+    Args:
+        lines: Lines of a pipe-delimited listing file with a header row, or
+            of a plain file with one symbol per line.
+
+    Returns:
+        The normalized symbols, excluding test issues.
+    """
+    symbols: List[str] = []
+    symbol_col: Optional[int] = None
+    test_col: Optional[int] = None
+    for line_number, line in enumerate(lines):
+        line = line.strip()
+        if not line or line.startswith("#"):
+            continue
+        fields = line.split("|")
+        if line_number == 0 and len(fields) > 1:
+            for name in _SYMBOL_COLUMNS:
+                if name in fields:
+                    symbol_col = fields.index(name)
+                    break
+            if "Test Issue" in fields:
+                test_col = fields.index("Test Issue")
+            continue
+        # The NASDAQ Trader files end with a "File Creation Time" footer.
+        if fields[0].startswith("File Creation Time"):
+            continue
+        symbol = fields[symbol_col or 0]
+        if test_col is not None and len(fields) > test_col and fields[test_col] == "Y":
+            continue
+        if symbol:
+            symbols.append(normalize_symbol(symbol))
+    return symbols
+
+
+class SymbolIndex:
+    """Immutable-per-generation set of known ticker symbols."""
+
+    def __init__(self, paths: Optional[List[pathlib.Path]] = None):
+        self._paths = paths
+        self._symbols: FrozenSet[str] = frozenset()
+        self._lock = threading.Lock()
+        self.refresh()
+
+    @staticmethod
+    def default_paths() -> List[pathlib.Path]:
+        """Returns the listing files configured by env var, else those bundled in data/."""
+        configured = os.environ.get(SYMBOL_FILES_ENV)
+        if configured:
+            return [pathlib.Path(p) for p in configured.split(os.pathsep) if p]
+        if DEFAULT_DATA_DIR.is_dir():
+            return sorted(DEFAULT_DATA_DIR.glob("*.txt"))
+        return []
+
+    def refresh(self) -> int:
+        """
+        Rebuilds the index from the listing files.
+
+        Lookups running concurrently keep seeing the previous set until the
+        new one is swapped in.
+
+        Returns:
+            The number of symbols in the new index.
+        """
+        symbols = set()
+        for path in self._paths if self._paths is not None else self.default_paths():
+            with open(path, encoding="utf-8") as listing:
+                symbols.update(parse_listing(listing))
+        with self._lock:
+            self._symbols = frozenset(symbols)
+        return len(symbols)
+
+    @property
+    def enabled(self) -> bool:
+        """Whether any listing was loaded. A disabled index accepts every symbol."""
+        return bool(self._symbols)
+
+    def is_known(self, symbol: str) -> bool:
+        """Returns True if the symbol is listed, or if the index is disabled."""
+        symbols = self._symbols
+        return not symbols or normalize_symbol(symbol) in symbols
+
+    def __len__(self) -> int:
+        return len(self._symbols)
+
+
+symbol_index = SymbolIndex()
@@ -0,0 +1,176 @@
+"""
+Tool functions shared by the agent packages.
+
+Every agent registers these functions (or the ones built by the factories
+below) instead of keeping its own copy, so fixes land everywhere at once.
+The state behind them is per process, not per agent module: the quote
+cache, the sentiment memo, the report writer and the audio cache are
+created once and warmed by whichever agent uses them first.
+
+ADK builds each tool's declaration from the function name, signature and
+docstring, so the factories return functions with the public tool names.
+"""
+import asyncio
+import pathlib
+from typing import Any, Callable, Dict, List, Mapping, Tuple
+
+from google.adk.tools import ToolContext
+
+from news_tools.audio_cache import get_audio_cache
+from news_tools.encoders import AUDIO_EXTENSIONS
+from news_tools.persistence import report_writer, session_id_of
+from news_tools.podcast import generate_podcast
+from news_tools.quotes import fetch_quotes_async
+from news_tools.report import session_renderer
+from news_tools.schemas import AINewsReport, NewsStory
+from news_tools.sentiment import analyze_headlines
+
+NO_FINANCIAL_DATA = "No financial data"
+# Ticker placeholders the models use for private or unlisted companies
+TICKER_PLACEHOLDERS = frozenset({"N/A", "NA", ""})
+
+# Speaker turns synthesized at once in parallel mode, and the pause between turns.
+TTS_MAX_CONCURRENCY = 4
+TURN_SILENCE_MS = 300
+
+
+async def get_financial_context(tickers: List[str]) -> Dict[str, str]:
+    """
+    Fetches the current stock price and daily change for a list of stock tickers
+    using the yfinance library.
+
+    Args:
+        tickers: A list of stock market tickers (e.g., ["NVDA", "MSFT"]).
+
+    Returns:
+        A dictionary mapping each ticker to its formatted financial data string.
+    """
+    valid_tickers = [ticker.upper().strip() for ticker in tickers
+                     if ticker and ticker.upper().strip() not in TICKER_PLACEHOLDERS]
+    if not valid_tickers:
+        return {ticker: NO_FINANCIAL_DATA for ticker in tickers}
+    return await fetch_quotes_async(valid_tickers)
+
+
+def analyze_news_sentiment(headlines: List[str]) -> Dict[str, Dict[str, Any]]:
+    """
+    Analyzes the sentiment of news headlines and classifies them as positive, negative, or neutral.
+
+    Args:
+        headlines: A list of news headlines to analyze (e.g., ["Apple announces new product", "Market crashes"]).
+
+    Returns:
+        A dictionary mapping each headline to its sentiment classification (positive/negative/neutral)
+        and its VADER compound score, which ranges from -1.0 (negative) to 1.0 (positive).
+    """
+    return analyze_headlines(headlines)
+
+
+async def save_news_to_markdown(filename: str, content: str, tool_context: ToolContext = None) -> Dict[str, str]:
+    """
+    Saves the given content to a Markdown file, atomically and without blocking the event loop.
+
+    Args:
+        filename: The name of the file to save (e.g., 'ai_news.md').
+        content: The Markdown-formatted string to write to the file.
+        tool_context: The ADK tool context, used to keep each session's reports apart.
+
+    Returns:
+        A dictionary with the status of the operation and the saved file's `file_path`.
+    """
+    return await report_writer.save(filename, content, session_id_of(tool_context))
+
+
+def podcast_audio_tool(tts_prompt: str) -> Callable[..., Any]:
+    """Builds a `generate_podcast_audio` tool that voices scripts with the given TTS prompt (and so language)."""
+
+    async def generate_podcast_audio(podcast_script: str, tool_context: ToolContext, filename: str = "ai_today_podcast", stream: bool = False, parallel: bool = False, output_format: str = "wav") -> Dict[str, str]:
+        """
+        Generates audio from a podcast script using Gemini API and saves it as a WAV, FLAC or Opus file.
+
+        Args:
+            podcast_script: The conversational script to be converted to audio.
+            tool_context: The ADK tool context.
+            filename: Base filename for the audio file (without extension).
+            stream: If true, synthesize the script turn by turn and append each turn to the file as it arrives.
+            parallel: If true, synthesize several speaker turns at once and stitch them back in order.
+            output_format: Audio format of the saved file: 'wav' (default), 'flac' or 'opus'.
+
+        Returns:
+            Dictionary with status and file information.
+        """
+        try:
+            extension = AUDIO_EXTENSIONS.get(output_format)
+            if extension is None:
+                return {"status": "error", "message": f"Unsupported audio format: {output_format}"}
+            if not filename.endswith(extension):
+                filename += extension
+
+            file_path = pathlib.Path.cwd() / filename
+            # Synthesis blocks on the network, so keep it off the event loop
+            return await asyncio.to_thread(
+                generate_podcast,
+                podcast_script,
+                file_path.resolve(),
+                tts_prompt,
+                stream=stream,
+                max_concurrency=TTS_MAX_CONCURRENCY if parallel else 1,
+                silence_ms=TURN_SILENCE_MS,
+                cache=get_audio_cache(),
+                output_format=output_format,
+            )
+
+        except Exception as e:
+            error_msg = str(e)[:200]
+            return {"status": "error", "message": f"Audio generation failed: {error_msg}"}
+
+    return generate_podcast_audio
+
+
+def report_tools(templates: Mapping[str, str]) -> Tuple[Callable[..., Any], Callable[..., Any]]:
+    """Builds the `add_news_story` and `save_news_report` tools, rendering with the given report templates."""
+
+    async def add_news_story(story: NewsStory, tool_context: ToolContext) -> Dict[str, str]:
+        """
+        Appends one structured news story to the research report and saves it right away,
+        so a partial report is visible before all stories are done.
+
+        Args:
+            story: The structured news story to add.
+            tool_context: The ADK tool context.
+
+        Returns:
+            A dictionary with the status of the operation.
+        """
+        try:
+            if isinstance(story, dict):
+                story = NewsStory.model_validate(story)
+            renderer = session_renderer(report_writer, session_id_of(tool_context), templates=templates)
+            renderer.add_story(story)
+            return await renderer.flush_async()
+        except Exception as e:
+            return {"status": "error", "message": f"Failed to save story: {str(e)[:200]}"}
+
+    async def save_news_report(report: AINewsReport, tool_context: ToolContext) -> Dict[str, str]:
+        """
+        Renders the structured AINewsReport to Markdown (including the Data Sourcing Notes) and JSON,
+        and saves both as the session's `ai_research_report`. Calling it again with an updated report only
+        re-renders the stories that changed.
+
+        Args:
+            report: The structured report.
+            tool_context: The ADK tool context.
+
+        Returns:
+            A dictionary with the status of the operation and the saved file paths.
+        """
+        try:
+            if isinstance(report, dict):
+                report = AINewsReport.model_validate(report)
+            renderer = session_renderer(report_writer, session_id_of(tool_context), templates=templates)
+            renderer.update(report)
+            return await renderer.flush_async()
+        except Exception as e:
+            return {"status": "error", "message": f"Failed to save report: {str(e)[:200]}"}
+
+    return add_news_story, save_news_report
@@ -0,0 +1,118 @@
+"""
+Streaming WAV writer.
+
+`WavWriter` writes the RIFF header up front with zero sizes, passes each
+PCM chunk straight through to the file and patches the sizes when it is
+closed, so an episode never has to be held in memory as one buffer. Chunks
+may be any bytes-like object (bytes, memoryview, mmap); they are written
+through a `memoryview` without being copied into an intermediate buffer.
+
+With `use_mmap=True` the output file is memory-mapped and grown in large
+steps, which turns each chunk into a single memcpy into the page cache.
+"""
+import mmap
+import struct
+from typing import Any, Optional
+
+_HEADER_SIZE = 44
+# Growth step for mmap-backed output.
+_MMAP_GROW_BYTES = 16 * 1024 * 1024
+
+
+def _header(data_size: int, channels: int, rate: int, sample_width: int) -> bytes:
+    """Builds a 44-byte PCM WAV header for the given data size."""
+    block_align = channels * sample_width
+    riff_size = 36 + data_size + (data_size & 1)
+    return (
+        b"RIFF" + struct.pack("<I", riff_size) + b"WAVE"
+        + b"fmt " + struct.pack(
+            "<IHHIIHH", 16, 1, channels, rate, rate * block_align, block_align, sample_width * 8
+        )
+        + b"data" + struct.pack("<I", data_size)
+    )
+
+
+class WavWriter:
+    """Write-through WAV sink that patches the header sizes on close."""
+
+    def __init__(
+        self,
+        filename: str,
+        channels: int = 1,
+        rate: int = 24000,
+        sample_width: int = 2,
+        use_mmap: bool = False,
+    ):
+        self.filename = str(filename)
+        self.channels = channels
+        self.rate = rate
+        self.sample_width = sample_width
+        self.data_size = 0
+        self._use_mmap = use_mmap
+        self._map: Optional[mmap.mmap] = None
+        # Unbuffered, so writes go straight from the caller's buffer to the OS
+        self._file = open(self.filename, "w+b" if use_mmap else "wb", buffering=0)
+        self._file.write(_header(0, channels, rate, sample_width))
+
+    def write(self, chunk: Any) -> int:
+        """Appends a chunk of PCM and returns the number of bytes written."""
+        data = memoryview(chunk).cast("B")
+        size = data.nbytes
+        if not size:
+            return 0
+        if self._use_mmap:
+            end = _HEADER_SIZE + self.data_size + size
+            self._ensure_mapped(end)
+            self._map[end - size:end] = data
+        else:
+            written = 0
+            while written < size:
+                written += self._file.write(data[written:])
+        self.data_size += size
+        return size
+
+    def _ensure_mapped(self, end: int) -> None:
+        """Grows the file and the mapping so that `end` bytes are addressable."""
+        if self._map is not None and len(self._map) >= end:
+            return
+        new_size = max(end, (len(self._map) if self._map else 0) + _MMAP_GROW_BYTES)
+        self._file.truncate(new_size)
+        if self._map is None:
+            self._map = mmap.mmap(self._file.fileno(), new_size)
+        else:
+            self._map.resize(new_size)
+
+    def close(self) -> None:
+        """Trims the file, pads odd-sized data and writes the final RIFF sizes."""
+        if self._file.closed:
+            return
+        try:
+            if self._map is not None:
+                self._map.flush()
+                self._map.close()
+                self._map = None
+            end = _HEADER_SIZE + self.data_size
+            if self.data_size & 1:
+                # RIFF chunks are word aligned
+                self._file.seek(end)
+                self._file.write(b"\0")
+                end += 1
+            self._file.truncate(end)
+            self._file.seek(0)
+            self._file.write(
+                _header(self.data_size, self.channels, self.rate, self.sample_width)
+            )
+        finally:
+            self._file.close()
+
+    def __enter__(self) -> "WavWriter":
+        return self
+
+    def __exit__(self, *exc_info: Any) -> None:
+        self.close()
+
+
+def wave_file(filename, pcm, channels=1, rate=24000, sample_width=2):
+    """Helper function to save audio data as a wave file"""
+    with WavWriter(filename, channels, rate, sample_width) as wf:
+        wf.write(pcm)
@@ -0,0 +1,110 @@
+"""
+Shared fixtures: the repository root on `sys.path`, minimal stand-ins for
+the ADK modules the agent packages import, and a loader for the agent
+packages (whose directory names are not valid module names).
+
+The ADK stand-ins are only installed when `google.adk` is not importable.
+They record constructor arguments and nothing else, which is all the
+conformance tests need: they check how the agents are wired, not how ADK
+runs them.
+"""
+import importlib.util
+import pathlib
+import sys
+import types
+
+import pytest
+
+REPO_ROOT = pathlib.Path(__file__).resolve().parent.parent
+if str(REPO_ROOT) not in sys.path:
+    sys.path.insert(0, str(REPO_ROOT))
+
+
+class _Recorder:
+    """Keeps every keyword argument as an attribute."""
+
+    def __init__(self, *args, **kwargs):
+        self.args = args
+        self.__dict__.update(kwargs)
+
+
+class _Agent(_Recorder):
+    tools = ()
+    instruction = ""
+    before_tool_callback = None
+    after_tool_callback = None
+
+
+class _AgentTool(_Recorder):
+    def __init__(self, agent, **kwargs):
+        super().__init__(agent=agent, **kwargs)
+        self.name = agent.name
+
+
+class _BaseToolset:
+    def __init__(self, *, tool_filter=None, **kwargs):
+        self.tool_filter = tool_filter
+
+
+class _ToolContext:
+    pass
+
+
+def _module(name, **attributes):
+    module = types.ModuleType(name)
+    module.__dict__.update(attributes)
+    return module
+
+
+def _install_adk_stubs():
+    google_search = types.SimpleNamespace(name="google_search")
+    modules = {
+        "google": _module("google", __path__=[]),
+        "google.adk": _module("google.adk", __path__=[]),
+        "google.adk.agents": _module("google.adk.agents", __path__=[], Agent=_Agent, LlmAgent=_Agent),
+        "google.adk.agents.llm_agent": _module("google.adk.agents.llm_agent", Agent=_Agent),
+        "google.adk.tools": _module(
+            "google.adk.tools", __path__=[], ToolContext=_ToolContext, google_search=google_search
+        ),
+        "google.adk.tools.agent_tool": _module("google.adk.tools.agent_tool", AgentTool=_AgentTool),
+        "google.adk.tools.base_toolset": _module("google.adk.tools.base_toolset", BaseToolset=_BaseToolset),
+        "google.adk.tools.mcp_tool": _module("google.adk.tools.mcp_tool", __path__=[]),
+        "google.adk.tools.mcp_tool.mcp_toolset": _module(
+            "google.adk.tools.mcp_tool.mcp_toolset",
+            MCPToolset=_Recorder,
+            StreamableHTTPConnectionParams=_Recorder,
+        ),
+        "google.adk.tools.mcp_tool.mcp_session_manager": _module(
+            "google.adk.tools.mcp_tool.mcp_session_manager", MCPSessionManager=_Recorder
+        ),
+        "google.adk.tools.mcp_tool.mcp_tool": _module("google.adk.tools.mcp_tool.mcp_tool", MCPTool=_Recorder),
+    }
+    for name, module in modules.items():
+        sys.modules.setdefault(name, module)
+
+
+try:
+    import google.adk  # noqa: F401
+except ImportError:
+    _install_adk_stubs()
+
+
+def load_agent_package(directory: str) -> types.ModuleType:
+    """Imports an agent package by directory name and returns its `agent` module."""
+    module_name = "agent_pkg_" + directory.replace("-", "_")
+    if module_name + ".agent" in sys.modules:
+        return sys.modules[module_name + ".agent"]
+    path = REPO_ROOT / directory
+    spec = importlib.util.spec_from_file_location(
+        module_name, path / "__init__.py", submodule_search_locations=[str(path)]
+    )
+    package = importlib.util.module_from_spec(spec)
+    sys.modules[module_name] = package
+    try:
+        spec.loader.exec_module(package)
+    except ModuleNotFoundError as e:
+        del sys.modules[module_name]
+        if (e.name or "").split(".")[0] in ("news_tools", module_name):
+            raise
+        pytest.skip(f"{directory} needs {e.name}, which is not installed")
+    return sys.modules[module_name + ".agent"]
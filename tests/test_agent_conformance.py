@@ -0,0 +1,169 @@
+"""
+Conformance of every agent package with the shared tool library.
+
+For each agent the tests check the tool list, that shared tools are the
+`news_tools` functions themselves (not local copies), the tool signatures
+ADK builds declarations from, the order of the tool callbacks, and that
+instructions contain no `{name}` placeholders ADK would try to fill from
+session state.
+"""
+import inspect
+import re
+
+import pytest
+
+from conftest import load_agent_package
+
+# package directory -> agent attribute -> tool names, in order
+EXPECTED_TOOLS = {
+    "my_agent_voice": {
+        "root_agent": [],
+    },
+    "my_agent_voice_tools_Google_Search": {
+        "root_agent": ["google_search"],
+    },
+    "my_agent_voice_yfinance": {
+        "root_agent": ["google_search", "get_financial_context", "analyze_news_sentiment"],
+    },
+    "my_agent_voice_Research_Agent": {
+        "root_agent": ["start_research_report", "get_research_report_status", "cancel_research_report"],
+        "report_builder_agent": ["ai_news_report_searcher", "get_financial_context", "save_news_to_markdown"],
+        "news_search_agent": ["google_search"],
+    },
+    "voice_Research_Agent_callback": {
+        "prompt_driven_agent": ["google_search", "get_financial_context", "save_news_to_markdown"],
+        "news_search_agent": ["google_search"],
+        "pipeline_agent": ["run_research_pipeline"],
+    },
+    "multi-agentet": {
+        "prompt_driven_agent": [
+            "google_search", "get_financial_context", "add_news_story", "save_news_report", "podcaster_agent",
+        ],
+        "podcaster_agent": ["generate_podcast_audio"],
+        "news_search_agent": ["google_search"],
+        "pipeline_agent": ["run_podcast_pipeline"],
+    },
+    "multi-agent_spanish": {
+        "root_agent": [
+            "google_search", "get_financial_context", "add_news_story", "save_news_report", "podcaster_agent",
+        ],
+        "podcaster_agent": ["generate_podcast_audio"],
+    },
+    "Bot_mcp_whatapps": {
+        "root_agent": ["PooledMCPToolset", "send_bulk_whatsapp"],
+    },
+}
+
+# Tools every agent must take from news_tools.tools rather than define locally
+SHARED_TOOLS = ("get_financial_context", "analyze_news_sentiment", "save_news_to_markdown")
+
+# tool name -> parameter names, in order
+SIGNATURES = {
+    "get_financial_context": ["tickers"],
+    "analyze_news_sentiment": ["headlines"],
+    "save_news_to_markdown": ["filename", "content", "tool_context"],
+    "generate_podcast_audio": ["podcast_script", "tool_context", "filename", "stream", "parallel", "output_format"],
+    "add_news_story": ["story", "tool_context"],
+    "save_news_report": ["report", "tool_context"],
+    "start_research_report": ["request", "tool_context"],
+    "get_research_report_status": ["job_id"],
+    "cancel_research_report": ["job_id"],
+    "run_research_pipeline": ["request", "tool_context"],
+    "run_podcast_pipeline": ["request", "tool_context"],
+    "send_bulk_whatsapp": ["recipients", "message", "campaign"],
+}
+
+# Agents that register tools but predate the metrics callbacks, or whose only tool is the
+# model-side google_search, for which ADK never calls tool callbacks
+UNMEASURED = {
+    ("my_agent_voice_tools_Google_Search", "root_agent"),
+    ("my_agent_voice_Research_Agent", "news_search_agent"),
+    ("Bot_mcp_whatapps", "root_agent"),
+}
+
+# What ADK treats as a session-state placeholder in a string instruction
+STATE_PLACEHOLDER = re.compile(r"\{+\s*([A-Za-z_][A-Za-z0-9_]*)\s*\}+")
+
+AGENTS = [
+    (directory, attribute)
+    for directory, agents in EXPECTED_TOOLS.items()
+    for attribute in agents
+]
+
+
+def _tool_name(tool):
+    if inspect.isfunction(tool):
+        return tool.__name__
+    return getattr(tool, "name", None) or type(tool).__name__
+
+
+def _function_tools(agent):
+    return [tool for tool in agent.tools if inspect.isfunction(tool)]
+
+
+@pytest.fixture(params=AGENTS, ids=[f"{d}.{a}" for d, a in AGENTS])
+def agent_case(request):
+    directory, attribute = request.param
+    module = load_agent_package(directory)
+    return directory, attribute, module, getattr(module, attribute)
+
+
+@pytest.mark.parametrize("directory", sorted(EXPECTED_TOOLS))
+def test_package_exposes_root_agent(directory):
+    module = load_agent_package(directory)
+    assert module.root_agent is not None
+
+
+def test_tool_list(agent_case):
+    directory, attribute, _, agent = agent_case
+    assert [_tool_name(tool) for tool in agent.tools] == EXPECTED_TOOLS[directory][attribute]
+
+
+def test_shared_tools_are_not_copied(agent_case):
+    _, _, _, agent = agent_case
+    tools = [tool for tool in _function_tools(agent) if tool.__name__ in SHARED_TOOLS]
+    if not tools:
+        return
+    from news_tools import tools as shared
+
+    for tool in tools:
+        assert tool is getattr(shared, tool.__name__)
+
+
+def test_tool_signatures_and_docstrings(agent_case):
+    _, _, _, agent = agent_case
+    for tool in _function_tools(agent):
+        parameters = list(inspect.signature(tool).parameters)
+        assert parameters == SIGNATURES[tool.__name__], tool.__name__
+        # ADK describes each parameter to the model from the docstring
+        doc = inspect.getdoc(tool) or ""
+        for parameter in parameters:
+            assert f"{parameter}:" in doc, f"{tool.__name__} does not document {parameter}"
+
+
+def test_callback_wiring(agent_case):
+    from news_tools.metrics import tool_metrics
+
+    directory, attribute, module, agent = agent_case
+    before = list(agent.before_tool_callback or [])
+    after = list(agent.after_tool_callback or [])
+    if not agent.tools or (directory, attribute) in UNMEASURED:
+        return
+    # Metrics go first, so short-circuited calls and replaced responses are measured too
+    assert before[0] == tool_metrics.before_tool
+    assert after[0] == tool_metrics.after_tool
+
+    single_flight = getattr(module, "single_flight", None)
+    if single_flight is not None and single_flight.before_tool in before:
+        # Coalescing sees the final arguments and the raw response
+        assert before[-1] == single_flight.before_tool
+        assert after[1] == single_flight.after_tool
+    if any(callback.__name__ == "inject_process_log_after_search" for callback in after):
+        # It replaces the response, which ends the after-tool chain
+        assert after[-1].__name__ == "inject_process_log_after_search"
+
+
+def test_instruction_has_no_state_placeholders(agent_case):
+    _, _, _, agent = agent_case
+    instruction = agent.instruction if isinstance(agent.instruction, str) else ""
+    assert STATE_PLACEHOLDER.findall(instruction) == []
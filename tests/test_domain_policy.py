@@ -0,0 +1,68 @@
+"""Compiled domain lists, and hot reloads that never block the caller."""
+import os
+import threading
+
+from news_tools import domain_policy
+from news_tools.domain_policy import DomainPolicy, DomainPolicyFile
+
+
+def test_mentions_and_parent_domains():
+    policy = DomainPolicy(["reddit.com", "https://www.Wikipedia.org/wiki"], match_bare_names=True)
+    assert policy.find_mention("best ai posts on reddit") == "reddit.com"
+    assert policy.find_mention("site:wikipedia.org nvidia") == "wikipedia.org"
+    assert policy.find_mention("nvidia earnings") is None
+    assert policy.covers("old.reddit.com")
+    assert not policy.covers("notreddit.com")
+    assert policy.site_filter == "site:reddit.com OR site:wikipedia.org"
+
+
+def _gated_policy(monkeypatch):
+    """Makes compiling any list containing 'slow.example' wait until the returned event is set."""
+    release = threading.Event()
+
+    class GatedPolicy(DomainPolicy):
+        def __init__(self, domains, match_bare_names=False):
+            domains = list(domains)
+            if "slow.example" in domains:
+                release.wait(5)
+            super().__init__(domains, match_bare_names)
+
+    monkeypatch.setattr(domain_policy, "DomainPolicy", GatedPolicy)
+    return release
+
+
+def test_file_is_compiled_in_the_background(tmp_path, monkeypatch):
+    release = _gated_policy(monkeypatch)
+    path = tmp_path / "blocked.txt"
+    path.write_text("slow.example\nreddit.com  # forums\n", encoding="utf-8")
+
+    policies = DomainPolicyFile(str(path), defaults=["wikipedia.org"])
+    # Construction did not wait for the file; the defaults serve meanwhile
+    assert policies.get().domains == ("wikipedia.org",)
+
+    release.set()
+    assert policies.wait_for_rebuild(5).domains == ("slow.example", "reddit.com")
+
+
+def test_changed_file_is_swapped_in_after_the_rebuild(tmp_path, monkeypatch):
+    release = _gated_policy(monkeypatch)
+    path = tmp_path / "whitelist.txt"
+    path.write_text("reuters.com\n", encoding="utf-8")
+    policies = DomainPolicyFile(str(path), check_interval=0.0)
+    old = policies.wait_for_rebuild(5)
+    assert old.domains == ("reuters.com",)
+
+    path.write_text("reuters.com\nslow.example\n", encoding="utf-8")
+    os.utime(path, (1, 1))  # A distinct mtime, however coarse the file system clock
+    # The rebuild is stuck compiling, yet get() returns at once with the old policy
+    assert policies.get() is old
+    assert policies.get() is old
+
+    release.set()
+    assert policies.wait_for_rebuild(5).domains == ("reuters.com", "slow.example")
+    assert policies.get().domains == ("reuters.com", "slow.example")
+
+
+def test_unreadable_file_keeps_the_previous_policy(tmp_path):
+    policies = DomainPolicyFile(str(tmp_path / "missing.txt"), defaults=["cnbc.com"])
+    assert policies.wait_for_rebuild(5).domains == ("cnbc.com",)
@@ -0,0 +1,112 @@
+"""
+`JobQueue` lifecycle with stubbed work: jobs that finish, fail, or are
+cancelled while still queued or while running.
+"""
+import asyncio
+
+from news_tools.jobs import CANCELLED, DONE, FAILED, QUEUED, RUNNING, JobQueue
+
+
+async def _wait_until(predicate, timeout=2.0):
+    async def poll():
+        while not predicate():
+            await asyncio.sleep(0.001)
+
+    await asyncio.wait_for(poll(), timeout)
+
+
+def test_finished_job_keeps_its_result_and_calls_back():
+    async def scenario():
+        queue = JobQueue(max_workers=1)
+        completed = []
+
+        async def work():
+            await asyncio.sleep(0.01)
+            return "reports/session/ai_research_report.md"
+
+        job = await queue.submit("report", work, on_complete=completed.append)
+        assert job.status == QUEUED
+        await _wait_until(lambda: job.finished)
+        await queue.shutdown()
+        return job, completed
+
+    job, completed = asyncio.run(scenario())
+    assert job.status == DONE
+    assert job.to_dict()["result"] == "reports/session/ai_research_report.md"
+    assert completed == [job]
+
+
+def test_failed_job_records_the_error():
+    async def scenario():
+        queue = JobQueue(max_workers=1)
+
+        async def work():
+            raise RuntimeError("search worker failed")
+
+        job = await queue.submit("report", work)
+        await _wait_until(lambda: job.finished)
+        await queue.shutdown()
+        return job
+
+    job = asyncio.run(scenario())
+    assert job.status == FAILED
+    assert job.to_dict()["error"] == "search worker failed"
+    assert "result" not in job.to_dict()
+
+
+def test_cancelling_a_queued_job_skips_its_work():
+    async def scenario():
+        queue = JobQueue(max_workers=1)
+        release = asyncio.Event()
+        started = []
+
+        async def blocker():
+            await release.wait()
+
+        async def work():
+            started.append(True)
+
+        first = await queue.submit("first", blocker)
+        second = await queue.submit("second", work)
+        await _wait_until(lambda: first.status == RUNNING)
+        assert queue.cancel(second.id)
+        release.set()
+        await _wait_until(lambda: first.finished)
+        await asyncio.sleep(0.01)  # Lets the worker take the cancelled job off the queue
+        await queue.shutdown()
+        return first, second, started
+
+    first, second, started = asyncio.run(scenario())
+    assert first.status == DONE
+    assert second.status == CANCELLED
+    assert started == []
+
+
+def test_cancelling_a_running_job_cancels_its_task():
+    async def scenario():
+        queue = JobQueue(max_workers=1)
+        cancelled = asyncio.Event()
+
+        async def work():
+            try:
+                await asyncio.sleep(10)
+            except asyncio.CancelledError:
+                cancelled.set()
+                raise
+
+        job = await queue.submit("report", work)
+        await _wait_until(lambda: job.status == RUNNING)
+        assert queue.cancel(job.id)
+        await _wait_until(lambda: job.finished)
+        # A finished job cannot be cancelled again
+        assert not queue.cancel(job.id)
+        # The worker survives and serves the next job
+        follow_up = await queue.submit("next", lambda: asyncio.sleep(0, result="ok"))
+        await _wait_until(lambda: follow_up.finished)
+        await queue.shutdown()
+        return job, cancelled.is_set(), follow_up
+
+    job, work_saw_cancel, follow_up = asyncio.run(scenario())
+    assert job.status == CANCELLED
+    assert work_saw_cancel
+    assert follow_up.status == DONE and follow_up.result == "ok"
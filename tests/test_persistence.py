@@ -0,0 +1,30 @@
+"""`ReportWriter` file layout, and that a save touches no file but its own."""
+import asyncio
+import types
+
+from news_tools.persistence import ReportWriter, session_id_of
+
+
+def test_save_writes_in_place_and_leaves_other_files_alone(tmp_path):
+    neighbour = tmp_path / "ai_research_report-0123456789ab.md"
+    neighbour.write_text("the user's own file", encoding="utf-8")
+    writer = ReportWriter(tmp_path)
+
+    first = asyncio.run(writer.save("ai_research_report.md", "# One"))
+    second = asyncio.run(writer.save("ai_research_report.md", "# Two"))
+
+    assert first["file_path"] == second["file_path"] == str((tmp_path / "ai_research_report.md").resolve())
+    assert (tmp_path / "ai_research_report.md").read_text(encoding="utf-8") == "# Two"
+    assert neighbour.read_text(encoding="utf-8") == "the user's own file"
+
+
+def test_session_reports_go_under_the_session_directory(tmp_path):
+    writer = ReportWriter(tmp_path)
+    result = asyncio.run(writer.save("report", "# Report", session_id="live/42"))
+    assert result["file_path"] == str((tmp_path / "reports" / "live_42" / "report.md").resolve())
+
+
+def test_session_id_comes_from_the_public_session():
+    tool_context = types.SimpleNamespace(session=types.SimpleNamespace(id="session-1"))
+    assert session_id_of(tool_context) == "session-1"
+    assert session_id_of(None) is None
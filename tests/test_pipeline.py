@@ -0,0 +1,74 @@
+"""`run_news_pipeline` with a stubbed search worker, and the sources it reads from grounding metadata."""
+import asyncio
+import json
+from types import SimpleNamespace
+
+import pytest
+
+from news_tools import pipeline
+from news_tools.agent_runner import AgentReply
+from news_tools.process_log import grounding_domains
+
+STORIES = [
+    {"headline": "Nvidia beats estimates", "company": "Nvidia", "ticker": "NVDA", "summary": "Record demand."},
+    {"headline": "Anthropic raises funds", "company": "Anthropic", "ticker": "N/A", "summary": "New round."},
+]
+
+
+def _chunk(uri="", title="", domain=None):
+    return SimpleNamespace(web=SimpleNamespace(uri=uri, title=title, domain=domain))
+
+
+@pytest.fixture(autouse=True)
+def offline_enrichment(monkeypatch):
+    async def fetch_quotes_async(tickers):
+        return {ticker: "$100.00 (+1.50%)" for ticker in tickers}
+
+    monkeypatch.setattr(pipeline, "fetch_quotes_async", fetch_quotes_async)
+    monkeypatch.setattr(pipeline, "analyze_headlines", lambda headlines: {})
+
+
+def _run(sources):
+    saved = {}
+
+    async def search(request):
+        return AgentReply(json.dumps(STORIES), 1, sources)
+
+    async def save(filename, content):
+        saved[filename] = content
+        return {"status": "success", "message": "saved", "file_path": filename}
+
+    result = asyncio.run(pipeline.run_news_pipeline("AI news", search, save, "report.md"))
+    return result, saved["report.md"]
+
+
+def test_sourcing_notes_list_the_grounding_domains():
+    result, markdown = _run(["reuters.com", "techcrunch.com"])
+
+    assert "## Data Sourcing Notes" in markdown
+    assert "Sourced news from the following domains: reuters.com, techcrunch.com." in markdown
+    assert result["model_calls"] == 1
+    assert "$100.00 (+1.50%)" in markdown
+
+
+def test_sourcing_notes_are_left_out_without_grounding():
+    _, markdown = _run([])
+
+    assert "Data Sourcing Notes" not in markdown
+
+
+def test_grounding_domains_prefers_domain_then_title_then_uri_host():
+    metadata = [
+        SimpleNamespace(grounding_chunks=[
+            _chunk(uri="https://vertexaisearch.cloud.google.com/grounding-api-redirect/abc", title="Reuters.com"),
+            _chunk(uri="https://vertexaisearch.cloud.google.com/grounding-api-redirect/def", title="Story",
+                   domain="www.bloomberg.com"),
+            _chunk(uri="https://www.techcrunch.com/2026/ai", title="TechCrunch"),
+            _chunk(uri="https://vertexaisearch.cloud.google.com/grounding-api-redirect/ghi", title="No domain"),
+            SimpleNamespace(web=None),
+        ]),
+        SimpleNamespace(grounding_chunks=None),
+        SimpleNamespace(grounding_chunks=[_chunk(title="reuters.com")]),
+    ]
+
+    assert grounding_domains(metadata) == ["bloomberg.com", "reuters.com", "techcrunch.com"]
@@ -0,0 +1,135 @@
+"""
+Podcast synthesis against a local fake TTS client.
+
+The fake answers `models.generate_content` like the Gemini TTS model, with
+PCM that identifies the turn it was asked for, and records how many
+requests were in flight at once. No network or `google.genai` is needed.
+"""
+import threading
+import time
+import types
+import wave
+
+import pytest
+
+from news_tools import podcast
+from news_tools.audio_cache import AudioCache
+
+SCRIPT = "Joe: Welcome to AI Today.\nJane: Chips are in demand.\nJoe: And models keep shipping.\nJane: Bye!"
+PROMPT = "TTS the following conversation between Joe and Jane:"
+# The backoff tests patch time.sleep; the fake's latency must not show up there
+_sleep = time.sleep
+
+
+def _pcm(text):
+    """Distinct, even-length PCM for a turn's text."""
+    return text.encode("utf-8").ljust(64, b".") * 4
+
+
+class FakeModels:
+    def __init__(self, delays=None, failures=0):
+        self.delays = delays or {}
+        self.failures = failures
+        self.calls = []
+        self.in_flight = 0
+        self.peak_in_flight = 0
+        self._lock = threading.Lock()
+
+    def generate_content(self, model, contents, config):
+        with self._lock:
+            self.calls.append(contents)
+            self.in_flight += 1
+            self.peak_in_flight = max(self.peak_in_flight, self.in_flight)
+            fail = self.failures > 0
+            self.failures -= fail
+        try:
+            text = contents.rsplit(": ", 1)[-1]
+            _sleep(self.delays.get(text, 0.0))
+            if fail:
+                raise ConnectionError("TTS unavailable")
+            part = types.SimpleNamespace(inline_data=types.SimpleNamespace(data=_pcm(text)))
+            return types.SimpleNamespace(candidates=[types.SimpleNamespace(content=types.SimpleNamespace(parts=[part]))])
+        finally:
+            with self._lock:
+                self.in_flight -= 1
+
+
+class FakeClient:
+    def __init__(self, **kwargs):
+        self.models = FakeModels(**kwargs)
+
+
+@pytest.fixture(autouse=True)
+def no_genai_config(monkeypatch):
+    # The fake ignores the config, so the google.genai types are not needed
+    monkeypatch.setattr(podcast, "speech_config", lambda voices=None: object())
+
+
+@pytest.fixture
+def backoffs(monkeypatch):
+    delays = []
+    monkeypatch.setattr(podcast.time, "sleep", delays.append)
+    return delays
+
+
+def _read_frames(path):
+    with wave.open(str(path), "rb") as wav:
+        return wav.readframes(wav.getnframes())
+
+
+def test_turns_are_written_in_script_order_under_max_concurrency(tmp_path):
+    turns = [turn.text for turn in podcast.split_turns(SCRIPT)]
+    # Earlier turns take longest, so they finish last
+    client = FakeClient(delays={text: 0.2 - 0.05 * index for index, text in enumerate(turns)})
+
+    result = podcast.generate_podcast(SCRIPT, tmp_path / "episode.wav", PROMPT, client=client, max_concurrency=3)
+
+    assert result["status"] == "success"
+    assert _read_frames(tmp_path / "episode.wav") == b"".join(_pcm(text) for text in turns)
+    assert 1 < client.models.peak_in_flight <= 3
+    assert len(client.models.calls) == len(turns)
+
+
+def test_turns_are_separated_by_silence(tmp_path):
+    turns = [turn.text for turn in podcast.split_turns(SCRIPT)]
+
+    podcast.generate_podcast(SCRIPT, tmp_path / "episode.wav", PROMPT, client=FakeClient(), stream=True, silence_ms=10)
+
+    gap = podcast.silence(10)
+    assert len(gap) == podcast.SAMPLE_RATE * 10 // 1000 * podcast.SAMPLE_WIDTH
+    assert _read_frames(tmp_path / "episode.wav") == gap.join(_pcm(text) for text in turns)
+
+
+def test_synthesis_retries_with_exponential_backoff(backoffs):
+    client = FakeClient(failures=2)
+
+    pcm = podcast.synthesize_with_retry(client, f"{PROMPT}\n\nJoe: Hello", object(), attempts=3)
+
+    assert pcm == _pcm("Hello")
+    assert len(client.models.calls) == 3
+    assert backoffs == [podcast.TTS_RETRY_BACKOFF_SECONDS, podcast.TTS_RETRY_BACKOFF_SECONDS * 2]
+
+
+def test_synthesis_gives_up_after_the_last_attempt(backoffs):
+    client = FakeClient(failures=5)
+
+    with pytest.raises(ConnectionError):
+        podcast.synthesize_with_retry(client, f"{PROMPT}\n\nJoe: Hello", object(), attempts=3)
+
+    assert len(client.models.calls) == 3
+    # No wait after the final failure
+    assert len(backoffs) == 2
+
+
+def test_cached_synthesize_serves_hits_without_a_request(tmp_path):
+    cache = AudioCache(tmp_path / "tts")
+    client = FakeClient()
+    contents = f"{PROMPT}\n\nJane: Bye!"
+
+    first = podcast.cached_synthesize(client, contents, object(), "segment-key", cache)
+    second = podcast.cached_synthesize(client, contents, object(), "segment-key", cache)
+    other = podcast.cached_synthesize(client, contents, object(), "other-key", cache)
+
+    assert bytes(first) == bytes(second) == bytes(other) == _pcm("Bye!")
+    assert len(client.models.calls) == 2
+    assert cache.stats()["hits"] == 1 and cache.stats()["misses"] == 2
@@ -0,0 +1,77 @@
+"""
+Event-loop responsiveness of `fetch_quotes_async`.
+
+A live voice session shares its event loop with the tool calls, so a
+quote lookup must never hold the loop for a network round trip. The test
+stubs `fetch_info` with a blocking sleep standing in for yfinance, fetches
+20 tickers, and probes the loop's scheduling lag meanwhile.
+"""
+import asyncio
+import time
+
+import pytest
+
+from news_tools import quotes
+
+TICKERS = [f"T{index:02d}" for index in range(20)]
+# Per-ticker network round trip of the stubbed lookup
+ROUND_TRIP_SECONDS = 0.2
+PROBE_INTERVAL_SECONDS = 0.005
+# Far below one round trip; a blocked loop would show at least ROUND_TRIP_SECONDS
+MAX_LOOP_LAG_SECONDS = 0.05
+
+
+@pytest.fixture(autouse=True)
+def stub_fetch_info(monkeypatch):
+    def fetch_info(ticker_symbol):
+        time.sleep(ROUND_TRIP_SECONDS)  # Blocking, like yfinance
+        return {"symbol": ticker_symbol, "currentPrice": 100.0, "regularMarketChangePercent": 0.015}
+
+    monkeypatch.setattr(quotes, "fetch_info", fetch_info)
+    quotes.quote_cache.clear()
+    quotes.invalid_ticker_cache.clear()
+    yield
+    quotes.quote_cache.clear()
+    quotes.invalid_ticker_cache.clear()
+
+
+async def _probe_lag(stop: asyncio.Event, lags: list) -> None:
+    """Records how late each short sleep wakes up."""
+    while not stop.is_set():
+        started = time.perf_counter()
+        await asyncio.sleep(PROBE_INTERVAL_SECONDS)
+        lags.append(time.perf_counter() - started - PROBE_INTERVAL_SECONDS)
+
+
+async def _fetch_with_probe():
+    stop = asyncio.Event()
+    lags: list = []
+    probe = asyncio.create_task(_probe_lag(stop, lags))
+    await asyncio.sleep(0)
+    started = time.perf_counter()
+    result = await quotes.fetch_quotes_async(TICKERS)
+    elapsed = time.perf_counter() - started
+    stop.set()
+    await probe
+    return result, elapsed, lags
+
+
+def test_fetching_20_tickers_does_not_block_the_event_loop():
+    result, elapsed, lags = asyncio.run(_fetch_with_probe())
+
+    assert list(result) == TICKERS
+    assert set(result.values()) == {"$100.00 (+1.50%)"}
+    # The lookups ran concurrently on the pool rather than one after another
+    serial_seconds = len(TICKERS) * ROUND_TRIP_SECONDS
+    assert elapsed < serial_seconds / 2
+    # The probe kept running throughout, and never waited anywhere near a round trip
+    assert len(lags) > elapsed / (PROBE_INTERVAL_SECONDS * 4)
+    assert max(lags) < MAX_LOOP_LAG_SECONDS
+
+
+def test_cached_quotes_are_served_without_a_lookup():
+    asyncio.run(quotes.fetch_quotes_async(TICKERS[:3]))
+    started = time.perf_counter()
+    result = asyncio.run(quotes.fetch_quotes_async(TICKERS[:3]))
+    assert time.perf_counter() - started < ROUND_TRIP_SECONDS
+    assert list(result) == TICKERS[:3]
@@ -0,0 +1,59 @@
+"""`SearchCache` around a stubbed search worker, and the metrics it records for google_search."""
+import asyncio
+
+import pytest
+
+from news_tools.agent_runner import AgentReply
+from news_tools.metrics import ToolMetrics
+from news_tools.search_cache import SEARCH_TOOL_NAME, SearchCache, normalize_query
+
+
+def _worker(calls):
+    async def search(request):
+        calls.append(request)
+        return AgentReply(f"results for {request}", 1, [])
+
+    return search
+
+
+def test_repeated_request_is_served_from_the_cache_and_measured_as_a_hit():
+    metrics = ToolMetrics()
+    cache = SearchCache(metrics=metrics)
+    calls = []
+
+    first = asyncio.run(cache.run("AI chips  site:reuters.com", _worker(calls)))
+    second = asyncio.run(cache.run("site:reuters.com ai CHIPS", _worker(calls)))
+
+    assert calls == ["AI chips  site:reuters.com"]
+    assert first.model_calls == 1 and second.model_calls == 0
+    assert second.text == first.text
+    assert metrics.snapshot()[SEARCH_TOOL_NAME]["cache"] == {"miss": 1, "hit": 1}
+
+
+def test_namespaces_do_not_share_entries():
+    cache = SearchCache(metrics=None)
+    calls = []
+    asyncio.run(cache.run("ai news", _worker(calls), namespace="blocklist"))
+    asyncio.run(cache.run("ai news", _worker(calls), namespace="whitelist"))
+    assert len(calls) == 2
+
+
+def test_failed_search_is_measured_as_an_error_and_not_cached():
+    metrics = ToolMetrics()
+    cache = SearchCache(metrics=metrics)
+
+    async def failing(request):
+        raise RuntimeError("model unavailable")
+
+    with pytest.raises(RuntimeError):
+        asyncio.run(cache.run("ai news", failing))
+    calls = []
+    asyncio.run(cache.run("ai news", _worker(calls)))
+
+    assert calls == ["ai news"]
+    assert metrics.snapshot()[SEARCH_TOOL_NAME]["errors"] == 1
+
+
+def test_boolean_operators_keep_their_neighbours_in_place():
+    assert normalize_query("site:b.com OR site:a.com ai") == ("site:b.com OR site:a.com ai", ())
+    assert normalize_query("ai site:b.com site:a.com") == ("ai", ("site:a.com", "site:b.com"))
@@ -1,72 +1,16 @@
-import pathlib
-from typing import Dict, List
-import yfinance as yf
+import os
+from typing import Any, Dict
 
 from google.adk.agents import Agent
-from google.adk.tools import google_search
+from google.adk.tools import google_search, ToolContext
 
-
-def get_financial_context(tickers: List[str]) -> Dict[str, str]:
-    """
-    Fetches the current stock price and daily change for a list of stock tickers
-    using the yfinance library.  
-
-    Args:
-        tickers: A list of stock market tickers (e.g., ["NVDA", "MSFT"]).
-
-    Returns:
-        A dictionary mapping each ticker to its formatted financial data string.
-    """
-    financial_data: Dict[str, str] = {}
-    for ticker_symbol in tickers:
-        try:
-            # Create a Ticker object
-            stock = yf.Ticker(ticker_symbol)
-            
-            # Fetch the info dictionary
-            info = stock.info
-            
-            # Safely access the required data points
-            price = info.get("currentPrice") or info.get("regularMarketPrice")
-            change_percent = info.get("regularMarketChangePercent")
-            
-            if price is not None and change_percent is not None:
-                # Format the percentage and the final string
-                change_str = f"{change_percent * 100:+.2f}%"
-                financial_data[ticker_symbol] = f"\${price:.2f} ({change_str})"
-            else:
-                # Handle cases where the ticker is valid but data is missing
-                financial_data[ticker_symbol] = "Price data not available."
-
-        except Exception:
-            # This handles invalid tickers or other yfinance errors gracefully
-            financial_data[ticker_symbol] = "Invalid Ticker or Data Error"
-            
-    return financial_data
-
-def save_news_to_markdown(filename: str, content: str) -> Dict[str, str]:
-    """
-    Saves the given content to a Markdown file in the current directory.
-
-    Args:
-        filename: The name of the file to save (e.g., 'ai_news.md').
-        content: The Markdown-formatted string to write to the file.
-
-    Returns:
-        A dictionary with the status of the operation.
-    """
-    try:
-        if not filename.endswith(".md"):
-            filename += ".md"
-        current_directory = pathlib.Path.cwd()
-        file_path = current_directory / filename
-        file_path.write_text(content, encoding="utf-8")
-        return {
-            "status": "success",
-            "message": f"Successfully saved news to {file_path.resolve()}",
-        }
-    except Exception as e:
-        return {"status": "error", "message": f"Failed to save file: {str(e)}"}
+from news_tools.agent_runner import AgentReply, run_agent
+from news_tools.domain_policy import DomainPolicyFile
+from news_tools.metrics import tool_metrics
+from news_tools.pipeline import SEARCH_INSTRUCTION, run_news_pipeline
+from news_tools.search_cache import search_cache
+from news_tools.search_callbacks import block_domains_callback, inject_process_log_after_search
+from news_tools.tools import get_financial_context, save_news_to_markdown
 
 BLOCKED_DOMAINS = [
     "wikipedia.org",      # General info, not latest news
@@ -77,59 +21,13 @@ BLOCKED_DOMAINS = [
     "quora.com",          # Q&A site, opinions not reports
 ]
 
-def filter_news_sources_callback(tool, args, tool_context):
-    """
-    Callback: Blocks search requests that target certain domains which are not necessarily news sources.
-    Demonstrates content quality enforcement through request blocking.
-    """
-    if tool.name == "google_search":
-        query = args.get("query", "").lower()
-
-        # Check if query explicitly targets blocked domains
-        for domain in BLOCKED_DOMAINS:
-            if f"site:{domain}" in query or domain.replace(".org", "").replace(".com", "") in query:
-                print(f"BLOCKED: Domains from blocked list detected: '{query}'")
-                return {
-                    "error": "blocked_source",
-                    "reason": f"Searches targeting {domain} or similar are not allowed. Please search for professional news sources."
-                }
+# Compiled once; set BLOCKED_DOMAINS_FILE to load (and hot-reload) a larger list from a file.
+blocked_sources = DomainPolicyFile(
+    os.environ.get("BLOCKED_DOMAINS_FILE"), defaults=BLOCKED_DOMAINS, match_bare_names=True
+)
+filter_news_sources_callback = block_domains_callback(blocked_sources)
 
-        print(f"ALLOWED: Professional source query: '{query}'")
-        return None
-
-from google.adk.tools import ToolContext
-
-def initialize_process_log(tool_context: ToolContext):
-    """Helper to ensure the process_log list exists in the state."""
-    if 'process_log' not in tool_context.state:
-        tool_context.state['process_log'] = []
-
-def inject_process_log_after_search(tool, args, tool_context, tool_response):
-    """
-    Callback: After a successful search, this injects the process_log into the response
-    and adds a specific note about which domains were sourced. This makes the callbacks'
-    actions visible to the LLM.
-    """
-    if tool.name == "google_search" and isinstance(tool_response, str):
-        # Extract source domains from the search results
-        urls = re.findall(r'https?://[^\s/]+', tool_response)
-        unique_domains = sorted(list(set(urlparse(url).netloc for url in urls)))
-        
-        if unique_domains:
-            sourcing_log = f"Action: Sourced news from the following domains: {', '.join(unique_domains)}."
-            # Prepend the new log to the existing one for better readability in the report
-            current_log = tool_context.state.get('process_log', [])
-            tool_context.state['process_log'] = [sourcing_log] + current_log
-
-        final_log = tool_context.state.get('process_log', [])
-        print(f"CALLBACK LOG: Injecting process log into tool response: {final_log}")
-        return {
-            "search_results": tool_response,
-            "process_log": final_log
-        }
-    return tool_response
-
-root_agent = Agent(
+prompt_driven_agent = Agent(
     name="ai_news_research_coordinator",
     model="gemini-2.0-flash-live-001",
     tools=[google_search, get_financial_context, save_news_to_markdown],
@@ -150,7 +48,8 @@ root_agent = Agent(
             formatted Markdown content.
 
     2.  **After `save_news_to_markdown` succeeds, your final response to the user MUST be:** "All done. 
-        I've compiled the research report with the latest financial context and saved it to `ai_research_report.md`."
+        I've compiled the research report with the latest financial context and saved it to <file_path>.", where
+        <file_path> is the `file_path` returned by `save_news_to_markdown`.
 
     **Required Report Schema:**
     ```markdown
@@ -189,9 +88,88 @@ root_agent = Agent(
     Your entire operation is a background pipeline that should culminate in a single, clean final answer.  
     """,
     before_tool_callback=[
+        tool_metrics.before_tool,             # First, so short-circuited calls are measured too
         filter_news_sources_callback,         # Exclude certain domains
     ],
     after_tool_callback=[
+        tool_metrics.after_tool,
         inject_process_log_after_search,
     ]
-)
\ No newline at end of file
+)
+
+# Deterministic pipeline mode: the model is used for the search (with the
+# same callbacks) and for talking to the user; every other step is Python.
+news_search_agent = Agent(
+    name="ai_news_search_worker",
+    model="gemini-2.0-flash",
+    instruction=SEARCH_INSTRUCTION,
+    tools=[google_search],
+    before_tool_callback=[
+        tool_metrics.before_tool,             # First, so short-circuited calls are measured too
+        filter_news_sources_callback,
+    ],
+    after_tool_callback=[
+        tool_metrics.after_tool,
+        inject_process_log_after_search,
+    ]
+)
+
+
+async def _search_news(request: str) -> AgentReply:
+    # google_search runs model-side, so cache the whole worker run instead.
+    # Keyed by module, since each agent's worker applies its own source policy.
+    return await search_cache.run(request, lambda text: run_agent(news_search_agent, text), namespace=__name__)
+
+
+async def run_research_pipeline(request: str, tool_context: ToolContext) -> Dict[str, Any]:
+    """
+    Finds recent AI news, enriches it with market data and sentiment, and saves the report
+    in a single step.
+
+    Args:
+        request: What to search for, e.g. '5 recent AI news articles about US-listed companies'.
+        tool_context: The ADK tool context.
+
+    Returns:
+        A dictionary with the status of the operation, the saved report's path and the number of stories.
+    """
+    try:
+        result = await run_news_pipeline(
+            request,
+            _search_news,
+            lambda filename, content: save_news_to_markdown(filename, content, tool_context),
+        )
+    except Exception as e:
+        return {"status": "error", "message": f"Research pipeline failed: {str(e)[:200]}"}
+    print(f"PIPELINE: {result['model_calls']} model calls, timings {result['timings']}")
+    return {
+        "status": result["status"],
+        "message": result["message"],
+        "file_path": result.get("file_path", ""),
+        "stories": len(result["stories"]),
+    }
+
+
+pipeline_agent = Agent(
+    name="ai_news_research_pipeline",
+    model="gemini-2.0-flash-live-001",
+    tools=[run_research_pipeline],
+    before_tool_callback=[tool_metrics.before_tool],
+    after_tool_callback=[tool_metrics.after_tool],
+    instruction="""
+    **Your Core Identity and Sole Purpose:**
+    You are a specialized AI News Assistant. Your sole and exclusive purpose is to find and summarize recent news
+    about Artificial Intelligence into a research report.
+
+    **Execution Plan:**
+    1.  Call `run_research_pipeline` once with a request for 5 recent AI news articles about US-listed companies.
+        It searches, fetches the financial context, formats and saves the report for you.
+    2.  **After `run_research_pipeline` succeeds, your final response to the user MUST be:** "All done. 
+        I've compiled the research report with the latest financial context and saved it to <file_path>.", where
+        <file_path> is the `file_path` returned by `run_research_pipeline`.
+    3.  If it fails, tell the user briefly and offer to try again.
+    """,
+)
+
+# Set RESEARCH_PIPELINE_MODE=1 to serve the deterministic pipeline instead of the prompt-driven flow.
+root_agent = pipeline_agent if os.environ.get("RESEARCH_PIPELINE_MODE") == "1" else prompt_driven_agent